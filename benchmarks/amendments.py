@@ -0,0 +1,38 @@
+""" Time reading and writing the amendment history of an act with many amendment events.
+
+    python -m benchmarks.amendments [events]
+"""
+import sys
+import timeit
+from datetime import date, timedelta
+
+from cobalt import Act, AmendmentEvent
+
+
+def amendment_events(count):
+    return [
+        AmendmentEvent(date=date(1901, 1, 1) + timedelta(days=i), amending_uri=f'/akn/za/act/1901/{i}',
+                       amending_title=f'Amendment Act {i}')
+        for i in range(count)
+    ]
+
+
+def main(events=500):
+    act = Act()
+    act.frbr_uri = '/akn/za/act/1900/1'
+    amendments = amendment_events(events)
+    act.amendments = amendments
+
+    def set_amendments():
+        act.amendments = amendments
+
+    for name, func in [
+        ('get amendments', lambda: act.amendments),
+        ('set amendments', set_amendments),
+    ]:
+        n, total = timeit.Timer(func).autorange()
+        print(f'{name:>20}: {total / n * 1000:.3f} ms for {events} events')
+
+
+if __name__ == '__main__':
+    main(*(int(x) for x in sys.argv[1:]))
@@ -0,0 +1,203 @@
+""" A deterministic generator of synthetic Akoma Ntoso documents for benchmarks.
+
+The same arguments always produce the same documents, so that timings can be compared across commits. The text
+is random words drawn from a seeded generator, and all dates are fixed.
+
+    python -m benchmarks.corpus DIRECTORY [count]
+
+writes a corpus of `count` documents of each type to DIRECTORY, for use with the ``cobalt`` command line tool.
+"""
+import os
+import random
+import re
+import sys
+from datetime import date, timedelta
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from cobalt import Act, AmendmentEvent, CollectionBuilder, Debate, Document, Judgment, OfficialGazette
+
+WORDS = """
+    the minister may by notice in gazette prescribe any matter which is required or permitted to be prescribed
+    under this act and generally all matters necessary for carrying out its objects person shall not without
+    written permission of board any owner animal livestock land water fee penalty court order section
+""".split()
+
+# (element, eId prefix) of the levels of a section, from the outside in
+LEVELS = [('subsection', 'subsec'), ('paragraph', 'para'), ('subparagraph', 'subpara'), ('clause', 'clause')]
+
+EXPRESSION_DATE = date(2020, 1, 1)
+
+
+def sentence(rng, words=20):
+    return escape(' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.')
+
+
+def _level(rng, eid, depth, width, level=0):
+    """ The content of a hierarchical element with `depth` levels of `width` children beneath it.
+    """
+    if depth == 0:
+        return f'<content><p eId="{eid}__p_1">{sentence(rng)}</p></content>'
+
+    name, prefix = LEVELS[level]
+    return ''.join(
+        f'<{name} eId="{eid}__{prefix}_{i}"><num>({i})</num>'
+        f'{_level(rng, f"{eid}__{prefix}_{i}", depth - 1, width, level + 1)}</{name}>'
+        for i in range(1, width + 1))
+
+
+def _with_main_content(cls, content, before=''):
+    """ An empty document of class `cls` with the given XML as its main content, preceded by `before`.
+    """
+    tag = cls.main_content_tag
+    xml = re.sub(f'<{tag}(/>|.*</{tag}>)', lambda m: f'{before}<{tag}>{content}</{tag}>', cls.empty_document(),
+                 flags=re.S)
+    return cls(xml)
+
+
+def _component(document):
+    """ Remove the references from a document that will be a component of another document, because their eIds
+    would clash with those of the outer document.
+    """
+    document.meta.remove(document.meta.references)
+    return document
+
+
+def make_act(sections=100, depth=2, width=3, chapters=0, attachments=0, amendments=0, seed=0,
+             frbr_uri='/akn/za/act/2009-05-01/1'):
+    """ Generate an act.
+
+    :param sections: number of sections
+    :param depth: number of levels beneath each section (up to 4), such as subsections and paragraphs
+    :param width: number of children of each level
+    :param chapters: number of chapters to divide the sections between, or zero for no chapters
+    :param attachments: number of schedules
+    :param amendments: number of amendment events
+    :param seed: seed for the random text
+    """
+    rng = random.Random(seed)
+
+    body = []
+    per_chapter = -(-sections // chapters) if chapters else sections
+    for i in range(1, sections + 1):
+        if chapters and i % per_chapter == 1 % per_chapter:
+            if i > 1:
+                body.append('</chapter>')
+            chapter = (i - 1) // per_chapter + 1
+            body.append(f'<chapter eId="chp_{chapter}"><num>{chapter}</num><heading>{sentence(rng, 3)}</heading>')
+        body.append(f'<section eId="sec_{i}"><num>{i}.</num><heading>{sentence(rng, 4)}</heading>'
+                    f'{_level(rng, f"sec_{i}", depth, width)}</section>')
+    if chapters:
+        body.append('</chapter>')
+
+    act = _with_main_content(Act, ''.join(body))
+    act.title = f'Act {seed}'
+    act.frbr_uri = frbr_uri
+    act.expression_date = EXPRESSION_DATE
+
+    if attachments:
+        E = act.maker
+        container = E.attachments()
+        for i in range(1, attachments + 1):
+            schedule = _with_main_content(Document, ''.join(
+                f'<paragraph eId="att_{i}__para_{j}"><num>{j}.</num><content><p>{sentence(rng)}</p></content>'
+                f'</paragraph>' for j in range(1, width * 3 + 1)))
+            schedule.main.set('name', 'schedule')
+            schedule.title = f'Schedule {i}'
+            uri = act.expression_frbr_uri()
+            uri.work_component = f'schedule_{i}'
+            schedule._update_identification(schedule.meta.identification, uri)
+            container.append(E.attachment(_component(schedule).main, eId=f'att_{i}'))
+        act.main.append(container)
+        # give the attachments the same expression details as the act
+        act.expression_date = EXPRESSION_DATE
+
+    if amendments:
+        act.amendments = [
+            AmendmentEvent(date=date(2010, 1, 1) + timedelta(days=i), amending_uri=f'/akn/za/act/2010/{i + 1}',
+                           amending_title=f'Amendment Act {i + 1}')
+            for i in range(amendments)
+        ]
+
+    return act
+
+
+def make_judgment(paragraphs=100, seed=0, frbr_uri='/akn/za/judgment/zacc/2020-03-01/1'):
+    """ Generate a judgment with `paragraphs` numbered paragraphs, divided between its introduction, background,
+    motivation and decision.
+    """
+    rng = random.Random(seed)
+    blocks = ['introduction', 'background', 'motivation', 'decision']
+    per_block = -(-paragraphs // len(blocks))
+
+    content = []
+    for b, block in enumerate(blocks):
+        numbers = range(b * per_block + 1, min(paragraphs, (b + 1) * per_block) + 1)
+        content.append(f'<{block}>' + ''.join(
+            f'<paragraph eId="para_{i}"><num>{i}.</num><content><p>{sentence(rng, 40)}</p></content></paragraph>'
+            for i in numbers) + (f'<p>{sentence(rng)}</p>' if not numbers else '') + f'</{block}>')
+
+    judgment = _with_main_content(Judgment, ''.join(content), before=f'<header><p>{sentence(rng, 10)}</p></header>')
+    judgment.title = f'Judgment {seed}'
+    judgment.frbr_uri = frbr_uri
+    judgment.expression_date = EXPRESSION_DATE
+    return judgment
+
+
+def make_debate(sections=10, speeches=10, seed=0, frbr_uri='/akn/za/debate/2020-01-01/1'):
+    """ Generate a debate with `sections` debate sections of `speeches` speeches each.
+    """
+    rng = random.Random(seed)
+    content = []
+    for i in range(1, sections + 1):
+        content.append(f'<debateSection name="debate" eId="dbsect_{i}"><heading>{sentence(rng, 4)}</heading>')
+        for j in range(1, speeches + 1):
+            speaker = rng.randrange(10)
+            content.append(
+                f'<speech by="#speaker_{speaker}" eId="dbsect_{i}__speech_{j}"><from>Speaker {speaker}</from>'
+                f'<p>{sentence(rng, 40)}</p></speech>')
+        content.append('</debateSection>')
+
+    debate = _with_main_content(Debate, ''.join(content))
+    debate.title = f'Debate {seed}'
+    debate.frbr_uri = frbr_uri
+    debate.expression_date = EXPRESSION_DATE
+    return debate
+
+
+def make_gazette(notices=10, acts=1, seed=0, frbr_uri='/akn/za/officialGazette/2020-01-01/1', **act_options):
+    """ Generate an official gazette with `notices` short notices and `acts` acts, which are generated with
+    :func:`make_act` and `act_options`.
+    """
+    rng = random.Random(seed)
+    f = BytesIO()
+    with CollectionBuilder(f, frbr_uri, expression_date=EXPRESSION_DATE, title=f'Gazette {seed}') as builder:
+        for i in range(1, notices + 1):
+            notice = _with_main_content(Document, f'<p>{sentence(rng, 60)}</p>')
+            builder.add_component(_component(notice), name=f'notice_{i}')
+        for i in range(1, acts + 1):
+            builder.add_component(_component(make_act(seed=seed + i, frbr_uri=f'/akn/za/act/2020-01-01/{i}', **act_options)),
+                                  name=f'act_{i}')
+    return OfficialGazette(f.getvalue())
+
+
+def corpus(count, seed=0, **act_options):
+    """ Generate `count` documents of each type, as `(name, document)` tuples.
+    """
+    for i in range(count):
+        yield f'act-{i + 1}', make_act(seed=seed + i, frbr_uri=f'/akn/za/act/2009-05-01/{i + 1}', **act_options)
+        yield f'judgment-{i + 1}', make_judgment(seed=seed + i, frbr_uri=f'/akn/za/judgment/zacc/2020-03-01/{i + 1}')
+        yield f'debate-{i + 1}', make_debate(seed=seed + i, frbr_uri=f'/akn/za/debate/2020-01-01/{i + 1}')
+        yield f'gazette-{i + 1}', make_gazette(seed=seed + i, frbr_uri=f'/akn/za/officialGazette/2020-01-01/{i + 1}')
+
+
+def main(path, count=10):
+    os.makedirs(path, exist_ok=True)
+    for name, document in corpus(count):
+        with open(os.path.join(path, f'{name}.xml'), 'wb') as f:
+            f.write(document.to_xml(xml_declaration=True))
+    print(f'wrote {count * 4} documents to {path}')
+
+
+if __name__ == '__main__':
+    main(sys.argv[1], *(int(x) for x in sys.argv[2:]))
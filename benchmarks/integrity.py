@@ -0,0 +1,31 @@
+""" Compare checking the integrity of documents with validating them against the schema.
+
+    python -m benchmarks.integrity [sections]
+"""
+import sys
+import timeit
+
+from cobalt.schemas import check_integrity, validate
+
+from .memory import documents
+
+
+def main(sections=1000):
+    for name, document in documents(sections).items():
+        # check that both are timing a clean document
+        assert validate(document)[0], name
+        assert check_integrity(document) == [], name
+
+        times = {}
+        for operation, func in [
+            ('validate', lambda: validate(document)),
+            ('check_integrity', lambda: check_integrity(document)),
+        ]:
+            n, total = timeit.Timer(func).autorange()
+            times[operation] = total / n
+            print(f'{name + " " + operation:>25}: {times[operation] * 1000:.3f} ms')
+        print(f'{name + " ratio":>25}: {times["check_integrity"] / times["validate"]:.2f}')
+
+
+if __name__ == '__main__':
+    main(*(int(x) for x in sys.argv[1:]))
@@ -0,0 +1,179 @@
+""" Measure the memory used by constructing, walking, validating and serializing large documents.
+
+    python -m benchmarks.memory [sections]
+
+Most of a document's memory is allocated by libxml2, which tracemalloc can't see, so two measurements are made for
+each operation:
+
+* ``py``: Python allocations, from tracemalloc
+* ``rss``: the resident set size of the process, sampled in a background thread while the operation runs
+
+Each is reported as the peak increase during the operation, and the increase that is retained while its result is
+still referenced. Each operation is measured in a new process, so that memory freed by earlier operations doesn't
+hide the cost of later ones.
+"""
+import gc
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import tracemalloc
+
+from cobalt import StructuredDocument
+from cobalt.schemas import get_schema, validate
+
+from . import corpus
+
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+
+def rss():
+    """ The resident set size of this process in bytes, or None if it isn't available.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except OSError:
+        return None
+
+
+class RSSSampler(threading.Thread):
+    """ Samples the RSS of the process until stopped, recording the maximum.
+    """
+    def __init__(self, interval=0.001):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = rss()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, rss())
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+        self.peak = max(self.peak, rss())
+        return self.peak
+
+
+def measure(func):
+    """ Measure the memory used by calling `func`. Returns a dict of byte counts.
+    """
+    gc.collect()
+    tracemalloc.start()
+    py_before = tracemalloc.get_traced_memory()[0]
+    rss_before = rss()
+    sampler = RSSSampler() if rss_before is not None else None
+    if sampler:
+        sampler.start()
+
+    result = func()
+
+    py_after, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    info = {'py_peak': py_peak - py_before, 'py_retained': py_after - py_before}
+    if sampler:
+        info['rss_peak'] = sampler.stop() - rss_before
+        info['rss_retained'] = rss() - rss_before
+
+    del result
+    return info
+
+
+def _components(document):
+    return document.components()
+
+
+def _to_xml(document):
+    return document.to_xml()
+
+
+def _memory_estimate(document):
+    return document.memory_estimate()
+
+
+# operations on a parsed document
+OPERATIONS = {
+    'components': _components,
+    'validate': validate,
+    'to_xml': _to_xml,
+    'memory_estimate': _memory_estimate,
+}
+
+
+def _measure_in_child(fname, document_type, operation, conn):
+    with open(fname, 'rb') as f:
+        xml = f.read()
+    cls = StructuredDocument.for_document_type(document_type)
+
+    if operation == 'parse':
+        info = measure(lambda: cls(xml))
+    else:
+        document = cls(xml)
+        # load the schema first, which is only done once per process
+        get_schema(document.namespace, False)
+        info = measure(lambda: OPERATIONS[operation](document))
+    conn.send(info)
+    conn.close()
+
+
+def measure_isolated(fname, document_type, operation):
+    """ Measure an operation on a document in a new process. `operation` is `parse` or one of :data:`OPERATIONS`.
+    """
+    ctx = multiprocessing.get_context('spawn')
+    parent, child = ctx.Pipe()
+    process = ctx.Process(target=_measure_in_child, args=(fname, document_type, operation, child))
+    process.start()
+    result = parent.recv()
+    process.join()
+    return result
+
+
+def documents(sections=1000, **act_options):
+    """ The documents to measure, by name. `act_options` are passed to :func:`benchmarks.corpus.make_act`.
+    """
+    act_options = {'chapters': sections // 20, 'attachments': 5, 'amendments': 50, **act_options}
+    return {
+        'act': corpus.make_act(sections, **act_options),
+        'judgment': corpus.make_judgment(sections),
+        'debate': corpus.make_debate(sections // 10 or 1),
+        'gazette': corpus.make_gazette(sections // 100 or 1, acts=sections // 100 or 1),
+    }
+
+
+def run(sections=1000, **act_options):
+    """ Measure each operation on each document, returning a dict from name to the measurements. The size of the
+    XML and the result of :meth:`cobalt.akn.AkomaNtosoDocument.memory_estimate` are included for parsing.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, document in documents(sections, **act_options).items():
+            fname = os.path.join(tmp, f'{name}.xml')
+            with open(fname, 'wb') as f:
+                f.write(document.to_xml())
+
+            for operation in ['parse'] + list(OPERATIONS):
+                results[f'{name}.{operation}'] = measure_isolated(fname, document.document_type, operation)
+            results[f'{name}.parse']['xml_size'] = os.path.getsize(fname)
+            results[f'{name}.parse']['estimate'] = document.memory_estimate()
+    return results
+
+
+def format_bytes(n):
+    for unit in ['B', 'KB', 'MB']:
+        if abs(n) < 1024 or unit == 'MB':
+            return f'{n:.0f} {unit}' if unit == 'B' else f'{n:.1f} {unit}'
+        n /= 1024
+
+
+def main(sections=1000):
+    columns = ['xml_size', 'py_peak', 'py_retained', 'rss_peak', 'rss_retained', 'estimate']
+    print(f'{"":<28}' + ''.join(f'{c:>14}' for c in columns))
+    for name, info in run(sections).items():
+        print(f'{name:<28}' + ''.join(f'{format_bytes(info[c]) if c in info else "":>14}' for c in columns))
+
+
+if __name__ == '__main__':
+    main(*(int(x) for x in sys.argv[1:]))
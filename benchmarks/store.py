@@ -0,0 +1,54 @@
+""" Time looking up documents in a DocumentStore with many documents. The store is created in a temporary directory.
+
+    python -m benchmarks.store [documents]
+"""
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+from datetime import date
+from itertools import islice
+
+from cobalt import Act
+from cobalt.store import DocumentStore
+
+
+def documents(count):
+    """ Generate `count` acts. The same object is re-used, to save time.
+    """
+    act = Act()
+    act.expression_date = date(2020, 1, 1)
+    for i in range(count):
+        act.frbr_uri = f'/akn/za/act/{1900 + i % 100}/{i}'
+        act.title = f'Act {i}'
+        yield act
+
+
+def main(count=100000):
+    path = tempfile.mkdtemp()
+    try:
+        store = DocumentStore(path)
+        start = time.perf_counter()
+        docs = documents(count)
+        while store.put_many(islice(docs, 1000)):
+            pass
+        print(f'ingested {len(store)} documents in {time.perf_counter() - start:.1f} s')
+
+        i = count // 2
+        for name, func in [
+            ('expression uri', lambda: store.metadata(f'/akn/za/act/{1900 + i % 100}/{i}/eng@2020-01-01')),
+            ('work uri', lambda: store.metadata(f'/akn/za/act/{1900 + i % 100}/{i}')),
+            ('find by number', lambda: store.find(number=str(i))),
+            ('get xml', lambda: store.get_xml(f'/akn/za/act/{1900 + i % 100}/{i}')),
+        ]:
+            assert func()
+            n, total = timeit.Timer(func).autorange()
+            print(f'{name:>20}: {total / n * 1000000:.1f} µs')
+        store.close()
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main(*(int(x) for x in sys.argv[1:]))
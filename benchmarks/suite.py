@@ -0,0 +1,228 @@
+""" Time the core operations of cobalt on synthetic documents from :mod:`benchmarks.corpus`, and save the results so
+that they can be compared across commits.
+
+    python -m benchmarks.suite [--filter TEXT] [--save] [--compare RESULTS] [--sections N] ...
+
+With ``--memory``, the memory used by the main operations is measured with :mod:`benchmarks.memory` instead of
+timing them. With ``--save``, results are written to ``benchmarks/results/<commit>.json``. ``--compare`` takes a results file or
+a commit, and shows how each timing has changed since then. Each benchmark is run with timeit, and the minimum and
+median of several repeats are recorded.
+"""
+import argparse
+import glob
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import timeit
+from datetime import date, datetime, timezone
+
+from lxml import etree
+
+import cobalt
+from cobalt import FrbrUri, RepealEvent, streaming
+from cobalt.schemas import validate
+
+from . import corpus, memory
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+URIS = [
+    '/akn/za/act/2009-05-01/1',
+    '/akn/za-cpt/act/by-law/2020/5/eng@2021-01-01/!schedule_1',
+    '/akn/za/judgment/zacc/2020-03-01/12/eng@2020-03-01',
+    '/akn/za/act/2009/1/eng@2015-01-01/~chp_2__sec_3',
+    '/akn/za/officialGazette/2020-01-01/1/eng@2020-01-01/!notice_1',
+]
+
+
+def benchmarks(options):
+    """ Yield `(name, function)` tuples for each benchmark.
+    """
+    act = corpus.make_act(options.sections, options.depth, options.width, options.chapters, options.attachments,
+                          options.amendments)
+    # give the optional metadata properties something to read
+    act.publication_name = 'Government Gazette'
+    act.publication_date = date(2009, 5, 1)
+    act.publication_number = '1234'
+    act.repeal = RepealEvent(date(2020, 1, 1), repealing_title='Repeal Act, 2020', repealing_uri='/akn/za/act/2020/1')
+    documents = {
+        'act': act,
+        'judgment': corpus.make_judgment(options.sections),
+        'debate': corpus.make_debate(options.sections // 10 or 1),
+        'gazette': corpus.make_gazette(options.sections // 10 or 1),
+    }
+    xml = {name: doc.to_xml() for name, doc in documents.items()}
+
+    parsed_uris = [FrbrUri.parse(uri) for uri in URIS]
+    yield 'uri.parse', lambda: [FrbrUri.parse(uri) for uri in URIS]
+    yield 'uri.expression_uri', lambda: [uri.expression_uri() for uri in parsed_uris]
+
+    for name, doc in documents.items():
+        cls = type(doc)
+        yield f'{name}.parse', lambda cls=cls, xml=xml[name]: cls(xml)
+        yield f'{name}.to_xml', doc.to_xml
+        yield f'{name}.validate', lambda doc=doc: validate(doc)
+        yield f'{name}.components', doc.components
+
+        # every metadata property
+        for prop, _ in inspect.getmembers(cls, lambda m: isinstance(m, property)):
+            if prop not in ['main', 'main_content', 'meta']:
+                yield f'{name}.get.{prop}', lambda doc=doc, prop=prop: getattr(doc, prop)
+
+    # setters, on copies so that the other benchmarks aren't affected
+    doc = type(act)(xml['act'])
+    amendments = act.amendments
+    yield 'act.set.title', setter(doc, 'title', 'A new title')
+    yield 'act.set.expression_date', setter(doc, 'expression_date', date(2021, 1, 1))
+    yield 'act.set.manifestation_date', setter(doc, 'manifestation_date', date(2021, 1, 1))
+    yield 'act.set.language', setter(doc, 'language', 'afr')
+    yield 'act.set.frbr_uri', setter(doc, 'frbr_uri', '/akn/za/act/2010-01-01/2')
+    yield 'act.set.amendments', setter(doc, 'amendments', amendments)
+    yield 'act.renumber_eids', doc.renumber_eids
+
+    middle = f'sec_{options.sections // 2 or 1}'
+    yield 'act.get_portion_element', lambda: act.get_portion_element(middle)
+    yield 'judgment.get_portion_element', lambda: documents['judgment'].get_portion_element('para_1')
+    yield 'act.extract_portion', lambda: streaming.extract_portion(xml['act'], middle)[0]
+    if options.chapters:
+        # ranges of portions are only supported when streaming
+        yield 'act.extract_portion.range', \
+            lambda: streaming.extract_portion(xml['act'], f'chp_1->chp_{options.chapters}')[0]
+
+
+def setter(doc, prop, value):
+    """ A benchmark that sets a property of a document, and returns the document.
+    """
+    return lambda: setattr(doc, prop, value) or doc
+
+
+def run(func, repeat):
+    """ Time a function, returning a dict with the minimum and median time per call in seconds.
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    times = [t / number for t in timer.repeat(repeat, number)]
+    return {'min': min(times), 'median': statistics.median(times), 'number': number}
+
+
+def run_timings(options, baseline):
+    results = {}
+    for name, func in benchmarks(options):
+        if options.filter and options.filter not in name:
+            continue
+        # a benchmark that returns None has probably failed to find what it's looking for
+        if func() is None:
+            raise SystemExit(f"Benchmark {name} returned None")
+        results[name] = result = run(func, options.repeat)
+
+        line = f'{name:<40} {format_time(result["median"]):>12}'
+        old = baseline and baseline.get('results', {}).get(name)
+        if old:
+            line += f'  {result["median"] / old["median"]:6.2f}x'
+        print(line)
+    return results
+
+
+def run_memory(options, baseline):
+    results = {}
+    for name, info in memory.run(options.sections, **{
+            k: getattr(options, k) for k in ['depth', 'width', 'chapters', 'attachments', 'amendments']}).items():
+        if options.filter and options.filter not in name:
+            continue
+        results[name] = info
+
+        line = f'{name:<40} {"peak":>6} {memory.format_bytes(info.get("rss_peak", info["py_peak"])):>10}' \
+               f' {"retained":>10} {memory.format_bytes(info.get("rss_retained", info["py_retained"])):>10}'
+        old = baseline and baseline.get('memory', {}).get(name)
+        if old and old.get('rss_peak') and info.get('rss_peak'):
+            line += f'  {info["rss_peak"] / old["rss_peak"]:6.2f}x'
+        print(line)
+    return results
+
+
+def commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def load_results(ref):
+    """ Load results from a file, or from the results directory by commit.
+    """
+    if not os.path.exists(ref):
+        matches = glob.glob(os.path.join(RESULTS_DIR, f'{ref}*.json'))
+        if len(matches) != 1:
+            raise SystemExit(f"No single results file for {ref} in {RESULTS_DIR}")
+        ref = matches[0]
+    with open(ref) as f:
+        return json.load(f)
+
+
+def format_time(seconds):
+    for unit, scale in [('s', 1), ('ms', 1e-3), ('µs', 1e-6)]:
+        if seconds >= scale:
+            return f'{seconds / scale:.3f} {unit}'
+    return f'{seconds / 1e-9:.1f} ns'
+
+
+def make_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.suite', description=__doc__.split('\n')[0])
+    parser.add_argument('--filter', help="only run benchmarks whose names contain this text")
+    parser.add_argument('--repeat', type=int, default=5, help="number of times to repeat each benchmark")
+    parser.add_argument('--save', nargs='?', const='', metavar='FILE',
+                        help="save results to FILE, or to the results directory by commit")
+    parser.add_argument('--compare', metavar='RESULTS', help="results file or commit to compare against")
+    parser.add_argument('--memory', action='store_true', help="measure memory use instead of time")
+
+    group = parser.add_argument_group('document options')
+    group.add_argument('--sections', type=int, default=100)
+    group.add_argument('--depth', type=int, default=2)
+    group.add_argument('--width', type=int, default=3)
+    group.add_argument('--chapters', type=int, default=5)
+    group.add_argument('--attachments', type=int, default=2)
+    group.add_argument('--amendments', type=int, default=20)
+    return parser
+
+
+def main(argv=None):
+    options = make_parser().parse_args(argv)
+    params = {k: getattr(options, k) for k in ['sections', 'depth', 'width', 'chapters', 'attachments', 'amendments']}
+
+    baseline = None
+    if options.compare:
+        baseline = load_results(options.compare)
+        if baseline['params'] != params:
+            print(f"warning: {options.compare} used different document options: {baseline['params']}",
+                  file=sys.stderr)
+
+    if options.memory:
+        results = run_memory(options, baseline)
+    else:
+        results = run_timings(options, baseline)
+
+    if options.save is not None:
+        sha = commit()
+        fname = options.save or os.path.join(RESULTS_DIR, f'{sha}.json')
+        os.makedirs(os.path.dirname(os.path.abspath(fname)), exist_ok=True)
+        with open(fname, 'w') as f:
+            json.dump({
+                'commit': sha,
+                'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'cobalt': cobalt.__version__,
+                'python': platform.python_version(),
+                'lxml': '.'.join(str(x) for x in etree.LXML_VERSION),
+                'machine': platform.machine(),
+                'params': params,
+                'memory' if options.memory else 'results': results,
+            }, f, indent=2)
+        print(f'saved results to {fname}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
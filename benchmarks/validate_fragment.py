@@ -0,0 +1,32 @@
+""" Compare validating an entire large act with validating just one changed section.
+
+    python -m benchmarks.validate_fragment [sections]
+"""
+import sys
+import timeit
+
+from cobalt.schemas import validate, validate_fragment
+
+from . import corpus
+
+
+def large_act(sections):
+    return corpus.make_act(sections, depth=1, width=5)
+
+
+def main(sections=2000):
+    act = large_act(sections)
+    section = act.body.section[sections // 2]
+    print(f'{len(act.to_xml()) / 1024 / 1024:.1f} MB act with {sections} sections')
+
+    for name, func in [
+        ('validate', lambda: validate(act)),
+        ('validate_fragment', lambda: validate_fragment(act, section)),
+    ]:
+        assert func()[0]
+        n, total = timeit.Timer(func).autorange()
+        print(f'{name:>20}: {total / n * 1000:.3f} ms')
+
+
+if __name__ == '__main__':
+    main(*(int(x) for x in sys.argv[1:]))
@@ -0,0 +1,77 @@
+""" Compare running several analyses of a large act with one traversal each, with running them all in a single
+traversal with TreeWalker.
+
+    python -m benchmarks.walker [sections]
+"""
+import sys
+import timeit
+
+from cobalt import TreeConsumer, TreeWalker
+
+from .validate_fragment import large_act
+
+
+class EidCollector(TreeConsumer):
+    def __init__(self):
+        self.eids = set()
+
+    def start(self, elem):
+        eid = elem.get('eId')
+        if eid:
+            self.eids.add(eid)
+
+
+class SectionCounter(TreeConsumer):
+    tags = ['section']
+
+    def __init__(self):
+        self.count = 0
+
+    def start(self, elem):
+        self.count += 1
+
+
+class TextLength(TreeConsumer):
+    tags = ['p']
+
+    def __init__(self):
+        self.length = 0
+
+    def start(self, elem):
+        self.length += len(elem.text or '')
+        return TreeWalker.SKIP
+
+
+class NumHarvester(TreeConsumer):
+    tags = ['num']
+
+    def __init__(self):
+        self.nums = []
+
+    def end(self, elem):
+        self.nums.append(elem.text)
+
+
+CONSUMERS = [EidCollector, SectionCounter, TextLength, NumHarvester]
+
+
+def main(sections=2000):
+    act = large_act(sections)
+
+    def separately():
+        for consumer in CONSUMERS:
+            TreeWalker([consumer()]).walk(act)
+
+    def together():
+        TreeWalker([consumer() for consumer in CONSUMERS]).walk(act)
+
+    for name, func in [
+        (f'{len(CONSUMERS)} traversals', separately),
+        ('1 traversal', together),
+    ]:
+        n, total = timeit.Timer(func).autorange()
+        print(f'{name:>20}: {total / n * 1000:.3f} ms for {sections} sections')
+
+
+if __name__ == '__main__':
+    main(*(int(x) for x in sys.argv[1:]))
@@ -1,25 +1,57 @@
-from .akn import AkomaNtosoDocument, StructuredDocument, datestring
-from .amendment import AmendmentStructure, Amendment, AmendmentList
-from .collection import CollectionStructure, Collection, OfficialGazette
-from .debate import DebateStructure, Debate
-from .hierarchical import HierarchicalStructure, Act, AmendmentEvent, RepealEvent, Bill
-from .judgment import JudgmentStructure, Judgment
-from .openstructure import OpenStructure, DebateReport, Document, Statement
-from .portion import PortionStructure, Portion
-from .uri import FrbrUri
+import importlib
 
 __version__ = '9.0.2'
 
+# the module in which each public name is defined. Modules are only imported when one of their names is first used,
+# so that lightweight uses (like FrbrUri) don't pay for importing lxml.
+_exports = {
+    'AkomaNtosoDocument': 'akn', 'StructuredDocument': 'akn', 'TOCEntry': 'akn', 'TreeConsumer': 'akn',
+    'TreeWalker': 'akn', 'datestring': 'akn',
+    'AmendmentStructure': 'amendment', 'Amendment': 'amendment', 'AmendmentList': 'amendment',
+    'CollectionStructure': 'collection', 'Collection': 'collection', 'CollectionBuilder': 'collection',
+    'OfficialGazette': 'collection',
+    'DebateStructure': 'debate', 'Debate': 'debate',
+    'HierarchicalStructure': 'hierarchical', 'Act': 'hierarchical', 'AmendmentEvent': 'hierarchical',
+    'RepealEvent': 'hierarchical', 'Bill': 'hierarchical',
+    'JudgmentStructure': 'judgment', 'Judgment': 'judgment',
+    'OpenStructure': 'openstructure', 'DebateReport': 'openstructure', 'Document': 'openstructure',
+    'Statement': 'openstructure',
+    'PortionStructure': 'portion', 'Portion': 'portion',
+    'LazyDocument': 'streaming',
+    'FrbrUri': 'uri',
+}
+
+_submodules = ['aio', 'akn', 'amendment', 'collection', 'debate', 'eids', 'graph', 'hierarchical', 'instrumentation', 'judgment',
+               'openstructure', 'portion', 'reidentify', 'resolver', 'schemas', 'search', 'store', 'streaming', 'uri']
+
 __all__ = [
     'Act', 'AkomaNtosoDocument', 'Amendment', 'AmendmentEvent', 'AmendmentList', 'AmendmentStructure',
     'Bill',
-    'Collection', 'CollectionStructure',
+    'Collection', 'CollectionBuilder', 'CollectionStructure',
     'Debate', 'DebateReport', 'DebateStructure', 'Document', 'datestring',
     'FrbrUri',
     'HierarchicalStructure',
     'Judgment', 'JudgmentStructure',
+    'LazyDocument',
     'OfficialGazette', 'OpenStructure',
     'Portion', 'PortionStructure',
     'RepealEvent',
     'Statement', 'StructuredDocument',
+    'TOCEntry', 'TreeConsumer', 'TreeWalker',
 ]
+
+
+def __getattr__(name):
+    if name in _exports:
+        value = getattr(importlib.import_module(f'.{_exports[name]}', __name__), name)
+    elif name in _submodules:
+        value = importlib.import_module(f'.{name}', __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__) | set(_submodules))
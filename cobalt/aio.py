@@ -0,0 +1,250 @@
+"""
+Coroutines for using cobalt from asyncio applications, such as web servers, without blocking the event loop.
+
+    >>> from cobalt import aio
+    >>> act = await aio.load(xml)
+    >>> valid, errors = await aio.validate(act)
+    >>> xml = await aio.to_xml(act)
+
+The work is done in a :class:`WorkerPool` of threads. lxml releases the GIL while it parses and serializes, so
+several documents can be parsed, serialized and have portions extracted at once. Validations against the same schema
+are done one at a time (see below), so only validations against different schemas run in parallel.
+
+To stop a burst of large documents from using too much memory, the pool limits the total size of the XML of the
+documents being worked on; further calls wait until there is room. The size of a document is only known if it was
+loaded by the same pool. Other documents count as size 0, so validating or serializing them is never held back by the
+limit and doesn't count towards it.
+
+Cancelling a call that is still waiting means its work is never done. Work that has already started can't be
+interrupted: it runs to completion in its thread and the result is discarded.
+
+The module-level coroutines use a shared pool, which can be changed with :func:`configure`.
+
+Documents must not be changed while work on them is in progress. Otherwise, these are safe to use concurrently:
+
+* each thread parses documents and extracted portions with its own copy of :data:`cobalt.akn.objectify_parser`,
+  because an lxml parser can only parse one document at a time
+* schemas are loaded once into the cache in :mod:`cobalt.schemas`, and validations against the same schema are done
+  one at a time, because the schema's error log is shared
+"""
+import asyncio
+import os
+import threading
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .akn import StructuredDocument, objectify_parser
+from .schemas import get_schema, validate_xml
+from .streaming import document_type as _document_type, extract_portion as _extract_portion
+
+# default limit on the total size of the XML being worked on at once. A parsed document uses about six times the
+# size of its XML.
+MAX_BYTES = 64 * 1024 * 1024
+
+_local = threading.local()
+_schema_lock = threading.Lock()
+# (namespace, strict) -> lock held while validating against that schema
+_validate_locks = {}
+
+
+def _parser():
+    """ This thread's copy of the shared objectify parser.
+    """
+    if not hasattr(_local, 'parser'):
+        _local.parser = objectify_parser.copy()
+    return _local.parser
+
+
+def _size(source):
+    return len(source) if isinstance(source, bytes) else os.path.getsize(source)
+
+
+def _load(source, document_type=None):
+    if not isinstance(source, bytes):
+        with open(source, 'rb') as f:
+            source = f.read()
+
+    document_type = document_type or _document_type(source)
+    cls = StructuredDocument.for_document_type(document_type)
+    if cls is None:
+        raise ValueError(f"Unknown document type: {document_type}")
+
+    # parse with this thread's parser instead of the class's shared one
+    document = cls.__new__(cls)
+    document._parser = _parser()
+    document.__init__(source)
+    del document._parser
+    return document
+
+
+def _validate(document, strict=False):
+    with _schema_lock:
+        schema = get_schema(document.namespace, strict)
+    with _validate_locks.setdefault((document.namespace, strict), threading.Lock()):
+        # the error log is copied from the schema before the lock is released
+        return validate_xml(document.root, schema)
+
+
+def _portion(source, eid_or_range, component=None):
+    if isinstance(source, bytes):
+        return _extract_portion(source, eid_or_range, component, _parser())
+    # the file may not be read to the end, so close it ourselves
+    with open(source, 'rb') as f:
+        return _extract_portion(f, eid_or_range, component, _parser())
+
+
+class WorkerPool:
+    """ Runs work on documents in a pool of threads, limiting the total size of the documents being worked on.
+
+    A pool must only be used from one event loop at a time.
+
+    :param max_workers: number of threads (default: the number of CPUs)
+    :param max_bytes: limit on the total size of the XML being worked on at once. A document larger than this is
+                      worked on by itself.
+    """
+    def __init__(self, max_workers=None, max_bytes=MAX_BYTES):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_bytes = max_bytes
+        self.executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix='cobalt-aio')
+        # bytes of XML currently being worked on
+        self.used = 0
+        # [size, future] of the calls waiting for room, in order
+        self._waiters = deque()
+        # the size of the XML of documents loaded by this pool
+        self._sizes = weakref.WeakKeyDictionary()
+
+    async def load(self, source, document_type=None):
+        """ Parse a document as the :class:`cobalt.akn.StructuredDocument` subclass for its document type.
+
+        :param source: filename or bytes of the XML document
+        :param document_type: the document type, such as ``act``; by default, it's read from the document
+        """
+        size = _size(source)
+        document = await self._run(size, _load, source, document_type)
+        self._sizes[document] = size
+        return document
+
+    async def validate(self, document, strict=False):
+        """ Validate a document against its schema, like :func:`cobalt.schemas.validate`. Returns a
+        `(validates, errors)` tuple. Validations against the same schema wait for each other.
+        """
+        return await self._run(self._sizes.get(document, 0), _validate, document, strict)
+
+    async def to_xml(self, document, *args, **kwargs):
+        """ Serialize a document, like :meth:`cobalt.akn.AkomaNtosoDocument.to_xml`.
+        """
+        return await self._run(self._sizes.get(document, 0), document.to_xml, *args, **kwargs)
+
+    async def extract_portion(self, source, eid_or_range, component=None):
+        """ Extract a portion from a document without parsing all of it, like
+        :func:`cobalt.streaming.extract_portion`. Only the portion is kept in memory, so this doesn't count
+        towards the size limit.
+        """
+        return await self._run(0, _portion, source, eid_or_range, component)
+
+    def shutdown(self, wait=True):
+        """ Stop the threads, cancelling work that hasn't started.
+        """
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+
+    async def _run(self, size, func, *args, **kwargs):
+        """ Run `func` in a thread once there is room for `size` more bytes.
+        """
+        loop = asyncio.get_running_loop()
+        size = await self._acquire(size)
+        try:
+            future = self.executor.submit(func, *args, **kwargs)
+        except BaseException:
+            self._release(size)
+            raise
+        # release the room only once the work is done, even if the caller is cancelled before then
+        future.add_done_callback(lambda f: self._release_threadsafe(loop, size))
+        return await asyncio.wrap_future(future)
+
+    async def _acquire(self, size):
+        size = min(size, self.max_bytes)
+        if not size:
+            return 0
+        if not self._waiters and self.used + size <= self.max_bytes:
+            self.used += size
+            return size
+
+        waiter = [size, asyncio.get_running_loop().create_future()]
+        self._waiters.append(waiter)
+        try:
+            await waiter[1]
+        except asyncio.CancelledError:
+            if waiter[1].done() and not waiter[1].cancelled():
+                # the room was given to us just as we were cancelled
+                self._release(size)
+            else:
+                self._waiters.remove(waiter)
+                self._wake()
+            raise
+        return size
+
+    def _release(self, size):
+        if size:
+            self.used -= size
+            self._wake()
+
+    def _release_threadsafe(self, loop, size):
+        if size:
+            try:
+                loop.call_soon_threadsafe(self._release, size)
+            except RuntimeError:
+                # the loop has been closed, so nothing is waiting
+                self._release(size)
+
+    def _wake(self):
+        """ Give room to the waiters that fit, in order.
+        """
+        while self._waiters and self.used + self._waiters[0][0] <= self.max_bytes:
+            size, future = self._waiters.popleft()
+            if not future.done():
+                self.used += size
+                future.set_result(None)
+
+
+_pool = None
+
+
+def configure(max_workers=None, max_bytes=MAX_BYTES):
+    """ Replace the pool used by the module-level coroutines with a new :class:`WorkerPool`, and return it.
+    """
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False)
+    _pool = WorkerPool(max_workers, max_bytes)
+    return _pool
+
+
+def get_pool():
+    """ The pool used by the module-level coroutines, which is created when first needed.
+    """
+    return _pool or configure()
+
+
+async def load(source, document_type=None):
+    """ Parse a document in the shared pool. See :meth:`WorkerPool.load`.
+    """
+    return await get_pool().load(source, document_type)
+
+
+async def validate(document, strict=False):
+    """ Validate a document in the shared pool. See :meth:`WorkerPool.validate`.
+    """
+    return await get_pool().validate(document, strict)
+
+
+async def to_xml(document, *args, **kwargs):
+    """ Serialize a document in the shared pool. See :meth:`WorkerPool.to_xml`.
+    """
+    return await get_pool().to_xml(document, *args, **kwargs)
+
+
+async def extract_portion(source, eid_or_range, component=None):
+    """ Extract a portion of a document in the shared pool. See :meth:`WorkerPool.extract_portion`.
+    """
+    return await get_pool().extract_portion(source, eid_or_range, component)
@@ -5,19 +5,22 @@ such as hierarchicalStructure, debateStructure, etc. Finally, there is a class f
 document type (act, bill, judgment, etc.) that extends the corresponding structure type.
 """
 from collections import OrderedDict
+import importlib
 import re
 from datetime import date
+from functools import lru_cache, wraps
 
 from lxml import etree, objectify
-from lxml.builder import ElementMaker
-from iso8601 import parse_date
 
+from .instrumentation import argument_size, instrumented
+from .schemas import AkomaNtoso30
 from .uri import FrbrUri
 
 
 ENCODING_RE = re.compile(r'encoding="[\w-]+"')
 
 DATE_FORMAT = "%Y-%m-%d"
+DATE_RE = re.compile(r'(\d{4})(?:-(\d{2})(?:-(\d{2}))?)?')
 
 AKN_NAMESPACES = {
     '2.0': 'http://www.akomantoso.org/2.0',
@@ -25,10 +28,43 @@ AKN_NAMESPACES = {
 }
 DEFAULT_VERSION = '3.0'
 
+# serialize elements this many levels below the root one at a time when streaming, in chunks of this many bytes
+STREAM_DEPTH = 3
+STREAM_CHUNK_SIZE = 64 * 1024
+
+# approximate sizes in bytes of libxml2 tree nodes on a 64-bit platform, including allocator overhead, for
+# memory_estimate(). Attributes include their value node and a typical value.
+ELEMENT_BYTES = 128
+ATTRIBUTE_BYTES = 264
+TEXT_BYTES = 136
+
+# modules with StructuredDocument subclasses, which are imported lazily by the cobalt package
+STRUCTURE_MODULES = ['amendment', 'collection', 'debate', 'hierarchical', 'judgment', 'openstructure', 'portion']
+
+# elements whose text isn't included in text_chunks() by default
+TEXT_EXCLUDE = ('meta', 'remark', 'authorialNote')
+# elements with quoted content, which isn't part of the structure of the document
+QUOTED_STRUCTURES = ['quotedStructure', 'embeddedStructure']
+# elements containing the components of a document
+COMPONENT_PARENTS = ['attachments', 'components', 'collectionBody']
+
 # a placeholder date that indicates a null date, used in the XML where a date is required by may not be known
 NULL_DATE = '0001-01-01'
 
 
+def changes_document(method):
+    """ Decorate a method (or property setter) of a document that changes it, so that the document's cached
+    table of contents is discarded.
+    """
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            self.invalidate_toc()
+    return wrapper
+
+
 def datestring(value):
     """ Format a date as an XML-suitable string. If the date is None, uses NULL_DATE.
     """
@@ -37,7 +73,15 @@ def datestring(value):
     elif isinstance(value, str):
         return value
     else:
-        return "%04d-%02d-%02d" % (value.year, value.month, value.day)
+        return format_date(value)
+
+
+@lru_cache(maxsize=4096)
+def format_date(value):
+    """ Format a date (or datetime) as a YYYY-MM-DD string. Results are cached, since documents tend to
+    use the same few dates over and over.
+    """
+    return "%04d-%02d-%02d" % (value.year, value.month, value.day)
 
 
 def parsedate(value):
@@ -45,7 +89,32 @@ def parsedate(value):
     """
     if value == NULL_DATE:
         return None
-    return parse_date(value).date()
+    return _parse_date(value)
+
+
+@lru_cache(maxsize=4096)
+def _parse_date(value):
+    """ Parse an XML date string into a real date. Year-only and year-month dates default to the first month and day.
+    Results are cached, since documents tend to use the same few dates over and over.
+    """
+    # fast path for the date formats allowed in AKN: YYYY, YYYY-MM and YYYY-MM-DD
+    match = DATE_RE.fullmatch(value) if isinstance(value, str) else None
+    if match:
+        year, month, day = match.groups()
+        return date(int(year), int(month or 1), int(day or 1))
+
+    # fall back to a full ISO8601 parser, which is only imported if needed
+    import iso8601
+    return iso8601.parse_date(value).date()
+
+
+def __getattr__(name):
+    # parse_date used to be imported from iso8601 here; keep it working for code that imports it from this
+    # module, without importing iso8601 until it's needed
+    if name == 'parse_date':
+        import iso8601
+        return iso8601.parse_date
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Create a new objectify parser that doesn't remove blank text nodes
@@ -53,7 +122,66 @@ objectify_parser = etree.XMLParser()
 objectify_parser.set_element_class_lookup(objectify.ObjectifyElementClassLookup())
 
 
+def _escape_text(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('\r', '&#13;')
+
+
+def _strip_inherited_namespaces(xml, nsmap):
+    """ Remove the namespace declarations that lxml adds to the first tag of a serialized subtree, for namespaces
+    which are already declared by its ancestors.
+    """
+    end = xml.find('>')
+    head = xml[:end]
+    for prefix, uri in nsmap.items():
+        uri = uri.replace('&', '&amp;').replace('<', '&lt;').replace('"', '&quot;')
+        head = head.replace(f' xmlns:{prefix}="{uri}"' if prefix else f' xmlns="{uri}"', '', 1)
+    return head + xml[end:]
+
+
+def _serialize(node, depth, indent, level, parent_nsmap):
+    """ Serialize node (without its tail) as a sequence of strings, descending at most `depth` levels before
+    serializing entire subtrees. If `indent` is not None, the output is indented like etree.indent.
+    """
+    children = node.getchildren() if isinstance(node.tag, str) else None
+
+    if not children or depth == 0:
+        xml = etree.tostring(node, encoding='unicode', with_tail=False)
+        if indent is not None and children:
+            # indent a plain (non-objectify) copy, because etree.indent doesn't work with objectify elements
+            node = etree.fromstring(xml)
+            etree.indent(node, space=indent, level=level)
+            xml = etree.tostring(node, encoding='unicode')
+        yield _strip_inherited_namespaces(xml, parent_nsmap) if parent_nsmap else xml
+        return
+
+    # write the start tag
+    nsmap = node.nsmap
+    start = etree.tostring(etree.Element(node.tag, dict(node.attrib), nsmap=nsmap), encoding='unicode')
+    start = _strip_inherited_namespaces(start, parent_nsmap)
+    name = start[1:].split(' ', 1)[0].split('/', 1)[0]
+    yield start[:-2] + '>'
+
+    child_indent = None if indent is None else '\n' + indent * (level + 1)
+    text = node.text
+    if indent is not None and (not text or not text.strip()):
+        text = child_indent
+    if text:
+        yield _escape_text(text)
+
+    for i, child in enumerate(children):
+        yield from _serialize(child, depth - 1, indent, level + 1, nsmap)
+        tail = child.tail
+        if indent is not None and (not tail or not tail.strip()):
+            tail = child_indent if i < len(children) - 1 else '\n' + indent * level
+        if tail:
+            yield _escape_text(tail)
+
+    yield f'</{name}>'
+
+
 def get_maker(version=DEFAULT_VERSION):
+    from lxml.builder import ElementMaker
+
     ns = AKN_NAMESPACES[version]
     return ElementMaker(nsmap={None: ns}, namespace=ns)
 
@@ -75,6 +203,8 @@ class AkomaNtosoDocument:
         self.parse(xml)
         self.maker = objectify.ElementMaker(annotate=False, namespace=self.namespace, nsmap=self.root.nsmap)
 
+    @instrumented('AkomaNtosoDocument.parse', before=argument_size(1, 'xml'),
+                  after=lambda result, args, kwargs: {'tree': args[0].root})
     def parse(self, xml, document_type=None):
         """ Parse XML and ensure it's Akoma Ntoso with a known namespace. Raises ValueError on error.
         """
@@ -87,9 +217,56 @@ class AkomaNtosoDocument:
 
         self.namespace = self.get_namespace()
 
+    @instrumented('AkomaNtosoDocument.to_xml',
+                  after=lambda result, args, kwargs: {'size': len(result), 'tree': args[0].root})
     def to_xml(self, *args, encoding='utf-8', **kwargs):
         return etree.tostring(self.root, *args, encoding=encoding, **kwargs)
 
+    def iter_xml(self, encoding='utf-8', pretty=False, chunk_size=STREAM_CHUNK_SIZE, depth=STREAM_DEPTH,
+                 xml_declaration=False):
+        """ Serialize this document incrementally, yielding encoded chunks of `chunk_size` bytes (the last chunk
+        may be shorter). Elements `depth` levels below the root are serialized one at a time, so that memory use
+        is bounded by the largest of those elements, rather than the size of the entire document.
+
+        Without `pretty`, the result is identical to :meth:`to_xml`. With `pretty`, the result is indented in
+        the same way as :func:`lxml.etree.indent`.
+        """
+        buf = bytearray()
+        if xml_declaration:
+            buf += f"<?xml version='1.0' encoding='{encoding}'?>\n".encode(encoding)
+
+        for piece in _serialize(self.root, depth, '  ' if pretty else None, 0, {}):
+            buf += piece.encode(encoding, 'xmlcharrefreplace')
+            while len(buf) >= chunk_size:
+                yield bytes(buf[:chunk_size])
+                del buf[:chunk_size]
+
+        if buf:
+            yield bytes(buf)
+
+    def write_to(self, fileobj, encoding='utf-8', pretty=False, chunk_size=STREAM_CHUNK_SIZE, **kwargs):
+        """ Write this document as XML to a binary file-like object (such as a file, socket file or HTTP response)
+        using :meth:`iter_xml`, without building the entire serialized document in memory.
+        """
+        for chunk in self.iter_xml(encoding=encoding, pretty=pretty, chunk_size=chunk_size, **kwargs):
+            fileobj.write(chunk)
+
+    def memory_estimate(self):
+        """ Estimate the memory used by this document's XML tree in bytes, from the numbers of elements, attributes
+        and text nodes and the length of the text. This is quick, because no Python objects are created for the
+        nodes, but it is only a rough guide and tends to be low. Measured with :mod:`benchmarks.memory`, it is a few
+        percent below the memory retained after parsing large acts and gazettes, but it can be 30% below it for
+        judgments and debates, depending on the platform's memory allocator. Python objects for elements that are
+        still referenced aren't included.
+        """
+        xpath = self.root.xpath
+        return int(sum([
+            xpath('count(//*)') * ELEMENT_BYTES,
+            xpath('count(//@*)') * ATTRIBUTE_BYTES,
+            xpath('count(//text())') * TEXT_BYTES,
+            xpath('string-length(/)'),
+        ]))
+
     def get_namespace(self):
         akn_namespaces = [ns[1] for ns in sorted(list(AKN_NAMESPACES.items()), reverse=True)]
         namespaces = list(self.root.nsmap.values())
@@ -99,17 +276,31 @@ class AkomaNtosoDocument:
 
         raise ValueError(f"Expected to find one of the following Akoma Ntoso XML namespaces: {', '.join(akn_namespaces)}. Only these namespaces were found: {', '.join(namespaces)}")
 
-    def ensure_element(self, name, after, at=None, attribs=None):
+    def ensure_element(self, name, after=None, at=None, attribs=None):
         """ Helper to get an element if it exists, or create it if it doesn't.
 
-        :param name: dotted path from `self` or `at`
-        :param after: element after which to place the new element if it doesn't exist
+        :param name: dotted path from `self` or `at`. A name without a dot is a child of `at`, or of the main
+                     document element if `at` is None.
+        :param after: element after which to place the new element if it doesn't exist. If None, the new element
+                      is placed according to the order of children required by the Akoma Ntoso schema.
         :param at: element at which to start looking, (defaults to self if None)
+        :raises ValueError: if the parent of a new element doesn't exist
         """
+        if at is None and '.' not in name:
+            at = self.main
+
         node = self.get_element(name, root=at)
         if node is None:
-            # TODO: what if nodes in the path don't exist?
-            node = self.make_element(name.split('.')[-1], attribs)
+            parts = name.rsplit('.', 1)
+            node = self.make_element(parts[-1], attribs)
+            if after is None:
+                parent = self.get_element(parts[0], root=at) if len(parts) > 1 else at
+                if parent is None:
+                    raise ValueError(f"Can't create {name} because {parts[0]} doesn't exist")
+                after = AkomaNtoso30.insertion_point(parent, parts[-1])
+                if after is None:
+                    parent.insert(0, node)
+                    return node
             after.addnext(node)
 
         return node
@@ -170,6 +361,10 @@ class StructuredDocument(AkomaNtosoDocument):
                 if x:
                     return x
 
+        # ensure all subclasses have been imported
+        for module in STRUCTURE_MODULES:
+            importlib.import_module(f'.{module}', __package__)
+
         document_type = document_type.lower()
         return check_subclasses(cls)
 
@@ -280,6 +475,8 @@ class StructuredDocument(AkomaNtosoDocument):
         if doc_root is None:
             raise ValueError(f"Expected {self.document_type} as a child of root element")
 
+        self.invalidate_toc()
+
     @property
     def main(self):
         """ Get the main document element (normally the first child of the root element).
@@ -310,6 +507,7 @@ class StructuredDocument(AkomaNtosoDocument):
         return title
 
     @title.setter
+    @changes_document
     def title(self, value):
         # set the title on an alias attribute with name="title"
         aliases = self.meta.identification.FRBRWork.xpath('a:FRBRalias[@name="title"]', namespaces={'a': self.namespace})
@@ -326,19 +524,20 @@ class StructuredDocument(AkomaNtosoDocument):
         date string stored in the FRBRdate element. In particular, if the date is just a year, the month and day
         both default to 1.
         """
-        return parse_date(self.meta.identification.FRBRWork.FRBRdate.get('date')).date()
+        return _parse_date(self.meta.identification.FRBRWork.FRBRdate.get('date'))
 
     @property
     def expression_date(self):
         """ Date from the FRBRExpression element """
-        return parse_date(self.meta.identification.FRBRExpression.FRBRdate.get('date')).date()
+        return _parse_date(self.meta.identification.FRBRExpression.FRBRdate.get('date'))
 
     @expression_date.setter
+    @changes_document
     def expression_date(self, value):
         self.meta.identification.FRBRExpression.FRBRdate.set('date', datestring(value))
         # set expression date of the components
-        for component, element in list(self.components().items())[1:]:
-            element.doc.meta.identification.FRBRExpression.FRBRdate.set('date', datestring(value))
+        for root in list(self._component_roots().values())[1:]:
+            root.meta.identification.FRBRExpression.FRBRdate.set('date', datestring(value))
 
         # update the URI
         self.frbr_uri = self.frbr_uri
@@ -346,9 +545,10 @@ class StructuredDocument(AkomaNtosoDocument):
     @property
     def manifestation_date(self):
         """ Date from the FRBRManifestation element """
-        return parse_date(self.meta.identification.FRBRManifestation.FRBRdate.get('date')).date()
+        return _parse_date(self.meta.identification.FRBRManifestation.FRBRdate.get('date'))
 
     @manifestation_date.setter
+    @changes_document
     def manifestation_date(self, value):
         self.meta.identification.FRBRManifestation.FRBRdate.set('date', datestring(value))
         # set expression date of the components
@@ -362,6 +562,7 @@ class StructuredDocument(AkomaNtosoDocument):
         return self.meta.identification.FRBRExpression.FRBRlanguage.get('language', 'eng')
 
     @language.setter
+    @changes_document
     def language(self, value):
         self.meta.identification.FRBRExpression.FRBRlanguage.set('language', value)
         # update the URI
@@ -376,6 +577,7 @@ class StructuredDocument(AkomaNtosoDocument):
             return FrbrUri.parse(uri)
 
     @frbr_uri.setter
+    @changes_document
     def frbr_uri(self, uri):
         if not isinstance(uri, FrbrUri):
             uri = FrbrUri.parse(uri)
@@ -388,32 +590,37 @@ class StructuredDocument(AkomaNtosoDocument):
         for component, element in self.components().items():
             uri.work_component = component or work_component
             ident = element.find(f'.//{{{self.namespace}}}meta/{{{self.namespace}}}identification')
+            self._update_identification(ident, uri)
 
-            ident.FRBRWork.FRBRuri.set('value', uri.uri())
-            ident.FRBRWork.FRBRthis.set('value', uri.work_uri())
-            ident.FRBRWork.FRBRcountry.set('value', uri.place)
-            ident.FRBRWork.FRBRdate.set('date', uri.date)
-
-            if uri.subtype:
-                self.ensure_element('FRBRsubtype', at=ident.FRBRWork, after=ident.FRBRWork.FRBRcountry).set('value', uri.subtype)
-                after = ident.FRBRWork.FRBRsubtype
-            else:
-                after = ident.FRBRWork.FRBRcountry
-                try:
-                    # remove existing subtype
-                    ident.FRBRWork.remove(ident.FRBRWork.FRBRsubtype)
-                except AttributeError:
-                    pass
+    def _update_identification(self, ident, uri):
+        """ Update the FRBR elements of an identification element to match an FrbrUri, which must include the
+        work component, language and expression date.
+        """
+        ident.FRBRWork.FRBRuri.set('value', uri.uri())
+        ident.FRBRWork.FRBRthis.set('value', uri.work_uri())
+        ident.FRBRWork.FRBRcountry.set('value', uri.place)
+        ident.FRBRWork.FRBRdate.set('date', uri.date)
+
+        if uri.subtype:
+            self.ensure_element('FRBRsubtype', at=ident.FRBRWork, after=ident.FRBRWork.FRBRcountry).set('value', uri.subtype)
+            after = ident.FRBRWork.FRBRsubtype
+        else:
+            after = ident.FRBRWork.FRBRcountry
+            try:
+                # remove existing subtype
+                ident.FRBRWork.remove(ident.FRBRWork.FRBRsubtype)
+            except AttributeError:
+                pass
 
-            # this must come after subtype if it exists, otherwise country
-            self.ensure_element('FRBRnumber', at=ident.FRBRWork, after=after).set('value', uri.number)
+        # this must come after subtype if it exists, otherwise country
+        self.ensure_element('FRBRnumber', at=ident.FRBRWork, after=after).set('value', uri.number)
 
-            ident.FRBRExpression.FRBRuri.set('value', uri.expression_uri(False))
-            ident.FRBRExpression.FRBRthis.set('value', uri.expression_uri())
-            ident.FRBRExpression.FRBRlanguage.set('language', uri.language)
+        ident.FRBRExpression.FRBRuri.set('value', uri.expression_uri(False))
+        ident.FRBRExpression.FRBRthis.set('value', uri.expression_uri())
+        ident.FRBRExpression.FRBRlanguage.set('language', uri.language)
 
-            ident.FRBRManifestation.FRBRuri.set('value', uri.expression_uri(False))
-            ident.FRBRManifestation.FRBRthis.set('value', uri.expression_uri())
+        ident.FRBRManifestation.FRBRuri.set('value', uri.expression_uri(False))
+        ident.FRBRManifestation.FRBRthis.set('value', uri.expression_uri())
 
     def expression_frbr_uri(self):
         """ The FRBR Expression URI as a :class:`cobalt.uri.FrbrUri` instance that uniquely identifies this document
@@ -425,22 +632,98 @@ class StructuredDocument(AkomaNtosoDocument):
         else:
             return FrbrUri.empty()
 
+    @instrumented('StructuredDocument.components', after=lambda result, args, kwargs: {'elements': len(result)})
     def components(self):
         """ Get an `OrderedDict` of component name to :class:`lxml.objectify.ObjectifiedElement`
-        objects. Components are this document, and `<component>` and `<attachment>` elements inside this document.
+        objects. Components are this document, and `<component>` and `<attachment>` elements inside this document,
+        including the components in the body of a collection.
+        """
+        main = self.main
+        return OrderedDict(
+            (name, root if root is main else root.getparent())
+            for name, root in self._component_roots().items()
+        )
+
+    def _component_roots(self):
+        """ Like :meth:`components`, but with the document element of each component (such as `<doc>`) rather than
+        its `<component>` or `<attachment>` container.
         """
         components = OrderedDict()
-        frbr_uri = FrbrUri.parse(self.meta.identification.FRBRWork.FRBRthis.get('value'))
-        components[frbr_uri.work_component] = self.main
+        work_uri = FrbrUri.parse(self.meta.identification.FRBRWork.FRBRthis.get('value'))
+        main_name = work_uri.work_component
+        components[main_name] = self.main
 
         xpath = './a:attachments/a:attachment/a:*/a:meta | ./a:components/a:component/a:*/a:meta'
         for meta in self.main.xpath(xpath, namespaces={'a': self.namespace}):
             frbr_uri = FrbrUri.parse(meta.identification.FRBRWork.FRBRthis.get('value'))
-            name = frbr_uri.work_component
-            components[name] = meta.getparent().getparent()
+            if frbr_uri.work_component != main_name:
+                components[frbr_uri.work_component] = meta.getparent()
+
+        # the body of a collection can embed other works (such as an act in a gazette), which aren't components of
+        # this document; only those that are named as components of this work are included
+        for meta in self.main.xpath('./a:collectionBody/a:component/a:*/a:meta', namespaces={'a': self.namespace}):
+            frbr_uri = FrbrUri.parse(meta.identification.FRBRWork.FRBRthis.get('value'))
+            if frbr_uri.uri() == work_uri.uri() and frbr_uri.work_component not in (None, main_name):
+                components[frbr_uri.work_component] = meta.getparent()
 
         return components
 
+    def toc(self):
+        """ Get the table of contents of this document, as an `OrderedDict` from component name to a list of
+        top-level :class:`TOCEntry` objects. The table of contents is built from the hierarchical elements in
+        :attr:`cobalt.schemas.AkomaNtoso30.hier_elements`, ignoring those in quoted and embedded structures.
+
+        The result is cached. Cobalt's own methods and setters discard it when they change the document; call
+        :meth:`invalidate_toc` after changing the XML tree directly.
+        """
+        if self._toc is None:
+            toc = OrderedDict()
+            for name, root in self._component_roots().items():
+                builder = TOCBuilder(self.namespace)
+                TreeWalker([builder]).walk(root, self.namespace)
+                toc[name] = builder.entries
+            self._toc = toc
+        return self._toc
+
+    def invalidate_toc(self):
+        """ Discard the cached table of contents.
+        """
+        self._toc = None
+
+    def renumber_eids(self, wids=False):
+        """ Renumber the eIds of this document's elements after its structure has changed, following the naming
+        convention, with :class:`cobalt.eids.EidGenerator`. References to renamed eIds are changed to match.
+        Returns a dict from the `component` element of each component of a collection, or None for the rest of the
+        document, to a dict of its renamed eIds, from old to new.
+
+        :param wids: keep the old eId of each renamed element in its `wId` attribute, if it doesn't have one.
+                     wIds aren't generated for elements that had no eId.
+        """
+        from .eids import EidGenerator
+        renamed = EidGenerator(self.namespace).renumber(self.root, wids)
+        if renamed:
+            self.invalidate_toc()
+        return renamed
+
+    def text_chunks(self, normalize=True, exclude=TEXT_EXCLUDE):
+        """ Generate `(component, eId, text)` tuples with the text of each hierarchical element in
+        :attr:`cobalt.schemas.AkomaNtoso30.hier_elements`, for each component of the document.
+
+        The text of an element doesn't include the text of its hierarchical descendants, which have their own
+        chunks, so every node is visited exactly once. Hierarchical elements in quoted and embedded structures
+        are part of the text of the element that contains them. Text that isn't in a hierarchical element, such
+        as a preamble, is in a chunk for the component with an eId of None. Chunks are generated as their elements
+        end, so nested elements come before their parents.
+
+        :param normalize: collapse runs of whitespace into a single space and strip leading and trailing
+                          whitespace, or a function to apply to each chunk's text, or False to leave the text as is
+        :param exclude: names of elements whose text is excluded
+        """
+        for name, root in self._component_roots().items():
+            yield from _text_chunks(root, name, self.namespace, normalize, exclude)
+
+    @instrumented('StructuredDocument.get_portion_element',
+                  after=lambda result, args, kwargs: {'elements': 0 if result is None else 1})
     def get_portion_element(self, portion, component=None):
         """ Get a single portion of this document. The `portion` is usually an eId, as specified by
         https://docs.oasis-open.org/legaldocml/akn-nc/v1.0/os/akn-nc-v1.0-os.html#_Toc531692279.
@@ -477,11 +760,302 @@ class StructuredDocument(AkomaNtosoDocument):
     def _ensure_reference(self, elem, name, id, href):
         references = self.ensure_element('meta.references', after=self._ensure_lifecycle())
 
-        ref = references.find(f'./{{{self.namespace}}}{elem}[@eId="{id}"]')
-        if ref is None:
+        ref = self._reference_index(references).get(id)
+        if ref is None or ref.tag != f'{{{self.namespace}}}{elem}':
             ref = self.make_element(elem)
             ref.set('eId', id)
             ref.set('href', href)
             ref.set('showAs', name)
             references.insert(0, ref)
         return ref
+
+    def _reference_index(self, references=None):
+        """ Build a dict from eId to the children of the `references` element (or the meta references element
+        if None), in a single pass.
+        """
+        if references is None:
+            references = self.meta.find(f'./{{{self.namespace}}}references')
+            if references is None:
+                return {}
+
+        index = {}
+        for ref in references.iterchildren(etree.Element):
+            index.setdefault(ref.get('eId'), ref)
+        return index
+
+    def _remove_references(self, eids, elem='passiveRef'):
+        """ Remove `elem` children of the meta references element with the given eIds, in a single pass.
+        """
+        references = self.meta.find(f'./{{{self.namespace}}}references')
+        if references is not None and eids:
+            tag = f'{{{self.namespace}}}{elem}'
+            for ref in references.findall(tag):
+                if ref.get('eId') in eids:
+                    references.remove(ref)
+
+
+class TreeConsumer:
+    """ Base class for consumers of the events generated by a :class:`TreeWalker`.
+
+    Subclasses set :attr:`tags` to limit the elements they're told about, and define `start(elem)` and/or
+    `end(elem)` methods. If `start` returns :attr:`TreeWalker.SKIP`, the consumer isn't told about the
+    descendants of that element, but is still told when it ends.
+    """
+    tags = None
+    """ Names of the elements this consumer handles, or None for all elements. Plain names are in the document's
+    namespace; use `{namespace}name` for elements in other namespaces.
+    """
+
+    start = None
+    end = None
+
+
+class TreeWalker:
+    """ Walks a tree once, dispatching start and end events to many consumers, so that several analyses
+    of a document cost a single traversal.
+
+    Consumers are called in the order in which they were added. They don't have to be subclasses of
+    :class:`TreeConsumer`, but must have the same attributes. When all consumers have skipped an element's subtree,
+    the walker doesn't visit it at all.
+
+        >>> walker = TreeWalker([SectionCounter(), TermHarvester()])
+        >>> walker.walk(act)
+    """
+    SKIP = True
+    """ Returned by a consumer's `start` method to skip the subtree of the element.
+    """
+
+    def __init__(self, consumers=None):
+        self.consumers = list(consumers or [])
+
+    def add(self, consumer):
+        """ Add a consumer, and return it.
+        """
+        self.consumers.append(consumer)
+        return consumer
+
+    def dispatch_table(self, namespace):
+        """ Build a dict from element tag to `(start handlers, end handlers, consumers)` for the elements the
+        consumers have named. The entry for `None` is used for all other elements.
+        """
+        tags = {
+            c: None if c.tags is None else {t if t.startswith('{') else f'{{{namespace}}}{t}' for t in c.tags}
+            for c in self.consumers
+        }
+
+        table = {}
+        for tag in set().union(*(t for t in tags.values() if t)) | {None}:
+            consumers = [c for c in self.consumers if tags[c] is None or tag in tags[c]]
+            table[tag] = (
+                [(c, c.start) for c in consumers if c.start is not None],
+                [(c, c.end) for c in consumers if c.end is not None],
+                consumers,
+            )
+
+        # comments and processing instructions aren't elements
+        for tag in [etree.Comment, etree.ProcessingInstruction, etree.Entity]:
+            table[tag] = ([], [], [])
+
+        return table
+
+    def walk(self, root, namespace=None):
+        """ Walk the tree of a document or element, calling the consumers for each element.
+
+        :param root: :class:`AkomaNtosoDocument` or element to walk
+        :param namespace: namespace of plain tag names; defaults to the namespace of the document or of `root`
+        """
+        if isinstance(root, AkomaNtosoDocument):
+            namespace = namespace or root.namespace
+            root = root.root
+        elif namespace is None:
+            namespace = etree.QName(root).namespace
+
+        table = self.dispatch_table(namespace)
+        default = table[None]
+        # consumer -> element whose subtree it is skipping
+        skipping = {}
+        count = len(self.consumers)
+
+        # when every consumer has named its tags, let lxml filter the other elements out
+        tags = None
+        if self.consumers and all(c.tags is not None for c in self.consumers):
+            tags = [t for t in table if isinstance(t, str)]
+        walker = etree.iterwalk(root, events=('start', 'end'), tag=tags)
+        # not available in older versions of lxml
+        skip_subtree = getattr(walker, 'skip_subtree', None)
+
+        for event, elem in walker:
+            starts, ends, consumers = table.get(elem.tag, default)
+
+            if event == 'start':
+                for consumer, start in starts:
+                    if consumer not in skipping and start(elem) is self.SKIP:
+                        skipping[consumer] = elem
+                if skipping and len(skipping) == count and skip_subtree is not None:
+                    skip_subtree()
+
+            else:
+                for consumer, end in ends:
+                    skipped = skipping.get(consumer)
+                    if skipped is None or skipped is elem:
+                        end(elem)
+                if skipping:
+                    for consumer in consumers:
+                        if skipping.get(consumer) is elem:
+                            del skipping[consumer]
+
+
+def _text(elem, exclude=()):
+    """ Get the text of an element, excluding the content (but not the tails) of descendants with tags in `exclude`.
+    """
+    parts = [elem.text or '']
+    for child in elem.iterchildren():
+        if isinstance(child.tag, str) and child.tag not in exclude:
+            parts.append(_text(child, exclude))
+        parts.append(child.tail or '')
+    return ''.join(parts)
+
+
+def _normalize(text, normalize):
+    if normalize is True:
+        return ' '.join(text.split())
+    return normalize(text) if normalize else text
+
+
+def _text_chunks(root, component, namespace, normalize=True, exclude=TEXT_EXCLUDE):
+    """ Generate the text chunks for a component, for :meth:`StructuredDocument.text_chunks`.
+    """
+    hier = {f'{{{namespace}}}{t}' for t in AkomaNtoso30.hier_elements}
+    quotes = {f'{{{namespace}}}{t}' for t in QUOTED_STRUCTURES}
+    skip = {f'{{{namespace}}}{t}' for t in list(exclude) + COMPONENT_PARENTS}
+
+    # (element, eId, text parts) of the open chunks
+    stack = [(root, None, [root.text or ''])]
+    quoted = 0
+    skipped = None
+
+    # comments and processing instructions are reported so that their tails are included
+    walker = etree.iterwalk(root, events=('start', 'end', 'comment', 'pi'))
+    # not available in older versions of lxml
+    skip_subtree = getattr(walker, 'skip_subtree', None)
+    next(walker)
+
+    for event, elem in walker:
+        if skipped is not None:
+            # inside an excluded element
+            if event == 'end' and elem is skipped:
+                skipped = None
+                stack[-1][2].append(elem.tail or '')
+            continue
+
+        tag = elem.tag
+        if event == 'start':
+            if tag in skip:
+                skipped = elem
+                if skip_subtree is not None:
+                    skip_subtree()
+                continue
+
+            if tag in quotes:
+                quoted += 1
+            elif tag in hier and not quoted:
+                stack.append((elem, elem.get('eId'), []))
+            stack[-1][2].append(elem.text or '')
+
+        elif event == 'end':
+            if tag in quotes:
+                quoted -= 1
+            if elem is stack[-1][0]:
+                _, eid, parts = stack.pop()
+                if elem is root:
+                    text = _normalize(''.join(parts), normalize)
+                    if text.strip():
+                        yield component, None, text
+                    break
+                yield component, eid, _normalize(''.join(parts), normalize)
+            stack[-1][2].append(elem.tail or '')
+
+        else:
+            # a comment or processing instruction
+            stack[-1][2].append(elem.tail or '')
+
+
+class TOCEntry:
+    """ An entry in a table of contents.
+
+    :ivar type: element name, such as `section`
+    :ivar eid: eId of the element
+    :ivar num: text of the element's `<num>`, or None
+    :ivar heading: text of the element's `<heading>`, or None
+    :ivar children: list of child entries
+    """
+    __slots__ = ('type', 'eid', 'num', 'heading', 'children')
+
+    def __init__(self, type, eid, num=None, heading=None, children=None):
+        self.type = type
+        self.eid = eid
+        self.num = num
+        self.heading = heading
+        self.children = children if children is not None else []
+
+    def __repr__(self):
+        return f'<TOCEntry {self.type} {self.eid}>'
+
+    def to_dict(self):
+        """ Get the entry and its children as nested dicts, suitable for JSON.
+        """
+        return {
+            'type': self.type,
+            'eid': self.eid,
+            'num': self.num,
+            'heading': self.heading,
+            'children': [c.to_dict() for c in self.children],
+        }
+
+
+class TOCBuilder(TreeConsumer):
+    """ Builds a table of contents for a single component.
+
+    The builder keeps track of skipped subtrees itself, so that it can also be given every event from a stream of
+    elements, as it is by :func:`cobalt.streaming.toc_from_file`. The text of an entry's num and heading are read
+    when those elements end.
+
+    :ivar entries: list of top-level :class:`TOCEntry` objects
+    """
+    skip_tags = ['meta'] + QUOTED_STRUCTURES + COMPONENT_PARENTS
+    """ Elements whose contents aren't included. """
+
+    def __init__(self, namespace):
+        self.hier = {f'{{{namespace}}}{t}' for t in AkomaNtoso30.hier_elements}
+        self.skip = {f'{{{namespace}}}{t}' for t in self.skip_tags}
+        self.num = f'{{{namespace}}}num'
+        self.heading = f'{{{namespace}}}heading'
+        self.exclude = {f'{{{namespace}}}{t}' for t in ['authorialNote', 'remark']}
+        self.tags = list(self.hier | self.skip | {self.num, self.heading})
+        self.entries = []
+        # (element, entry) pairs of the open hierarchical elements
+        self.stack = []
+        self.skipping = 0
+
+    def start(self, elem):
+        if self.skipping or elem.tag in self.skip:
+            self.skipping += 1
+            return TreeWalker.SKIP
+
+        if elem.tag in self.hier:
+            entry = TOCEntry(elem.tag.split('}', 1)[1], elem.get('eId'))
+            (self.stack[-1][1].children if self.stack else self.entries).append(entry)
+            self.stack.append((elem, entry))
+
+    def end(self, elem):
+        if self.skipping:
+            self.skipping -= 1
+        elif self.stack:
+            parent, entry = self.stack[-1]
+            if elem is parent:
+                self.stack.pop()
+            elif elem.getparent() is parent:
+                if elem.tag == self.num:
+                    entry.num = _text(elem, self.exclude).strip()
+                elif elem.tag == self.heading:
+                    entry.heading = _text(elem, self.exclude).strip()
@@ -0,0 +1,294 @@
+"""
+A command line tool for working with many Akoma Ntoso documents at once.
+
+    $ cobalt validate --strict --jobs 8 'acts/**/*.xml'
+    $ cobalt meta acts/ | jq -r .title
+    $ cobalt set-uri --set locality=cpt acts/cpt/*.xml
+    $ cobalt set-date --date 2021-01-01 act.xml
+    $ cobalt reidentify --where locality=wc011 --set locality=cpt --jobs 8 corpus/
+
+Each command takes files, directories (which are searched for ``.xml`` files) or glob patterns, and writes one JSON
+object per file to standard output (JSON Lines), in the order the files were given. Files that can't be processed
+are reported with an ``error`` key. A summary with the throughput is written to standard error at the end, and the
+exit status is 1 if any file failed.
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from functools import partial
+
+from lxml import etree
+
+from .akn import StructuredDocument, datestring
+from .reidentify import UriMapping, reidentify
+from .schemas import validate
+from .streaming import document_type, extract_portion
+from .uri import FrbrUri
+
+# FrbrUri fields that can be changed with set-uri --set
+URI_FIELDS = ['prefix', 'country', 'locality', 'doctype', 'subtype', 'actor', 'date', 'number']
+
+
+def expand_files(patterns):
+    """ Expand a list of filenames, directories and glob patterns into a list of filenames.
+    """
+    files = []
+    for pattern in patterns:
+        if glob.has_magic(pattern):
+            files.extend(sorted(glob.glob(pattern, recursive=True)))
+        elif os.path.isdir(pattern):
+            files.extend(sorted(glob.glob(os.path.join(pattern, '**', '*.xml'), recursive=True)))
+        else:
+            files.append(pattern)
+    return files
+
+
+def load(fname):
+    """ Parse a file as the :class:`cobalt.akn.StructuredDocument` subclass for its document type.
+    """
+    with open(fname, 'rb') as f:
+        xml = f.read()
+
+    name = document_type(xml)
+    cls = StructuredDocument.for_document_type(name)
+    if cls is None:
+        raise ValueError(f"Unknown document type: {name}")
+    return cls(xml)
+
+
+def save(document, fname):
+    """ Write a document back to a file atomically, keeping the XML declaration if the file has one, and the
+    file's permissions.
+    """
+    with open(fname, 'rb') as f:
+        declaration = f.read(5) == b'<?xml'
+
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(fname)))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(document.to_xml(xml_declaration=declaration))
+        # mkstemp creates files that only the owner can read
+        shutil.copymode(fname, tmp)
+        os.replace(tmp, fname)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def do_validate(fname, args):
+    document = load(fname)
+    valid, errors = validate(document, args.strict)
+    return {'valid': bool(valid), 'errors': [str(e) for e in errors]}
+
+
+def do_meta(fname, args):
+    document = load(fname)
+    uri = document.expression_frbr_uri()
+    return {
+        'frbr_uri': uri.expression_uri(),
+        'work_uri': uri.work_uri(),
+        'document_type': document.document_type,
+        'title': document.title,
+        'language': document.language,
+        'work_date': uri.date,
+        'expression_date': datestring(document.expression_date),
+        'components': list(document.components()),
+    }
+
+
+def do_set_uri(fname, args):
+    document = load(fname)
+    old = document.expression_frbr_uri().expression_uri()
+
+    uri = FrbrUri.parse(args.uri) if args.uri else document.expression_frbr_uri()
+    for field, value in args.set:
+        setattr(uri, field, value or None)
+    document.frbr_uri = uri
+
+    if not args.dry_run:
+        save(document, fname)
+    return {'old_frbr_uri': old, 'frbr_uri': document.expression_frbr_uri().expression_uri()}
+
+
+def do_set_date(fname, args):
+    document = load(fname)
+    old = document.expression_frbr_uri().expression_uri()
+    document.expression_date = args.date
+
+    if not args.dry_run:
+        save(document, fname)
+    return {'old_frbr_uri': old, 'frbr_uri': document.expression_frbr_uri().expression_uri()}
+
+
+def do_reidentify(fname, args):
+    document = load(fname)
+    report = reidentify(document, args.mapping)
+
+    if (report['changed'] or report['refs']) and not args.dry_run:
+        save(document, fname)
+    return report
+
+
+def do_components(fname, args):
+    document = load(fname)
+    ns = document.namespace
+    components = []
+    for name, element in document.components().items():
+        meta = element.find(f'.//{{{ns}}}meta')
+        components.append({
+            'name': name,
+            'document_type': etree.QName(meta.getparent()).localname,
+            'frbr_uri': meta.identification.FRBRExpression.FRBRthis.get('value'),
+        })
+    return {'components': components}
+
+
+def do_portion(fname, args):
+    with open(fname, 'rb') as f:
+        element, _ = extract_portion(f, args.eid, args.component)
+    if element is None:
+        raise ValueError(f"Portion not found: {args.eid}")
+    elements = element if isinstance(element, list) else [element]
+    return {'eid': args.eid, 'xml': ''.join(etree.tostring(e, encoding='unicode', with_tail=False) for e in elements)}
+
+
+def run_one(func, args, fname):
+    """ Run a command on a single file, returning a dict for the output. Exceptions are reported in the dict rather
+    than raised, so that one bad file doesn't stop the others.
+    """
+    try:
+        result = func(fname, args)
+    except Exception as e:
+        return {'file': fname, 'error': f'{type(e).__name__}: {e}'}
+    return {'file': fname, **result}
+
+
+def run(func, args, files, jobs=1):
+    """ Run a command on each file, in `jobs` processes if it's more than 1. Yields a result dict for each file, in
+    the same order as `files`.
+    """
+    task = partial(run_one, func, args)
+    if jobs > 1 and len(files) > 1:
+        pool = ProcessPoolExecutor(jobs)
+        try:
+            yield from pool.map(task, files, chunksize=max(1, min(64, len(files) // (jobs * 4))))
+        finally:
+            # if the caller stops early, don't start work on the remaining files
+            pool.shutdown(cancel_futures=True)
+    else:
+        yield from map(task, files)
+
+
+def reidentify_files(files, mapping, jobs=1, dry_run=False):
+    """ Re-identify a corpus of files with :func:`cobalt.reidentify.reidentify` in `jobs` processes, saving the files
+    that change. `mapping` must be picklable if `jobs` is more than 1, such as a module-level function or a
+    :class:`cobalt.reidentify.UriMapping`. Yields a report dict for each file, in the same order as `files`.
+    """
+    return run(do_reidentify, argparse.Namespace(mapping=mapping, dry_run=dry_run), files, jobs)
+
+
+def uri_field(value):
+    field, sep, value = value.partition('=')
+    if not sep or field not in URI_FIELDS:
+        raise argparse.ArgumentTypeError(f"expected FIELD=VALUE, where FIELD is one of: {', '.join(URI_FIELDS)}")
+    return field, value
+
+
+def iso_date(value):
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a YYYY-MM-DD date, got {value!r}")
+
+
+def make_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('files', nargs='+', metavar='FILE', help="files, directories or glob patterns")
+    common.add_argument('-j', '--jobs', type=int, default=1, help="number of processes to use (default: 1)")
+    common.add_argument('-q', '--quiet', action='store_true', help="don't print a summary to stderr")
+
+    writes = argparse.ArgumentParser(add_help=False)
+    writes.add_argument('-n', '--dry-run', action='store_true', help="report the changes without changing files")
+
+    parser = argparse.ArgumentParser(prog='cobalt', description="Work with Akoma Ntoso documents.")
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND', required=True)
+
+    p = commands.add_parser('validate', parents=[common], help="validate documents against the schema")
+    p.add_argument('--strict', action='store_true', help="also check that eIds are unique")
+    p.set_defaults(func=do_validate)
+
+    p = commands.add_parser('meta', parents=[common], help="describe documents")
+    p.set_defaults(func=do_meta)
+
+    p = commands.add_parser('set-uri', parents=[common, writes], help="change the FRBR URIs of documents")
+    p.add_argument('--uri', help="new work FRBR URI")
+    p.add_argument('--set', type=uri_field, action='append', default=[], metavar='FIELD=VALUE',
+                   help=f"change one part of the existing FRBR URI; one of: {', '.join(URI_FIELDS)}")
+    p.set_defaults(func=do_set_uri)
+
+    p = commands.add_parser('set-date', parents=[common, writes], help="change the expression dates of documents")
+    p.add_argument('--date', type=iso_date, required=True, help="new expression date, as YYYY-MM-DD")
+    p.set_defaults(func=do_set_date)
+
+    p = commands.add_parser('reidentify', parents=[common, writes],
+                            help="change the FRBR URIs of documents and the references to them")
+    p.add_argument('--set', type=uri_field, action='append', required=True, metavar='FIELD=VALUE',
+                   help=f"change one part of matching URIs; one of: {', '.join(URI_FIELDS)}")
+    p.add_argument('--where', type=uri_field, action='append', default=[], metavar='FIELD=VALUE',
+                   help="only change URIs with this value")
+    p.set_defaults(func=do_reidentify)
+
+    p = commands.add_parser('components', parents=[common], help="list the components of documents")
+    p.set_defaults(func=do_components)
+
+    p = commands.add_parser('portion', parents=[common], help="extract a portion of documents")
+    p.add_argument('--eid', required=True, help="eId of the portion, or a range such as chp_1->chp_3")
+    p.add_argument('--component', help="name of the component that contains the portion")
+    p.set_defaults(func=do_portion)
+
+    return parser
+
+
+def main(argv=None, stdout=None, stderr=None):
+    """ Run the command line tool. Returns the exit status.
+    """
+    stdout = stdout or sys.stdout
+    stderr = stderr or sys.stderr
+    parser = make_parser()
+    args = parser.parse_args(argv)
+    if args.command == 'set-uri' and not (args.uri or args.set):
+        parser.error("set-uri requires --uri or --set")
+    if args.command == 'reidentify':
+        args.mapping = UriMapping(args.set, args.where)
+
+    files = expand_files(args.files)
+    start = time.perf_counter()
+    failed = 0
+    results = run(args.func, args, files, args.jobs)
+    try:
+        for result in results:
+            if 'error' in result or result.get('valid') is False:
+                failed += 1
+            stdout.write(json.dumps(result) + '\n')
+            stdout.flush()
+    except BrokenPipeError:
+        # the reader went away (eg. head); stop quietly without working on the remaining files, and stop Python
+        # complaining when it flushes stdout on exit
+        results.close()
+        if stdout is sys.stdout:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 1
+
+    if not args.quiet:
+        elapsed = time.perf_counter() - start
+        rate = len(files) / elapsed if elapsed else 0
+        stderr.write(f"{args.command}: {len(files)} files, {failed} failed in {elapsed:.2f}s ({rate:.1f} files/s)\n")
+
+    return 1 if failed else 0
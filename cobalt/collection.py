@@ -1,4 +1,9 @@
-from .akn import StructuredDocument
+from contextlib import ExitStack
+
+from lxml import etree
+
+from .akn import StructuredDocument, DEFAULT_VERSION
+from .uri import FrbrUri
 
 
 class CollectionStructure(StructuredDocument):
@@ -12,3 +17,76 @@ class Collection(CollectionStructure):
 
 class OfficialGazette(CollectionStructure):
     document_type = "officialGazette"
+
+
+class CollectionBuilder:
+    """ Incrementally writes a collection document (such as an :class:`OfficialGazette`) to a binary file,
+    one component at a time, so that only the component being written needs to be in memory.
+
+    The collection's FRBR URI, language and expression date are applied to each component in the same way as
+    setting :attr:`StructuredDocument.frbr_uri` on the full collection, so the output can be loaded and
+    used like any other collection document.
+
+    Example::
+
+        with CollectionBuilder(f, '/akn/za/officialGazette/2020-01-31/123', expression_date='2020-01-31') as builder:
+            for i, notice in enumerate(notices):
+                builder.add_component(Document(notice), name=f'notice_{i + 1}')
+
+    :ivar document: the (empty) collection document whose `meta` element is written to the file
+    """
+
+    def __init__(self, fileobj, frbr_uri, document_class=OfficialGazette, expression_date=None, language=None,
+                 title=None, version=DEFAULT_VERSION, encoding='utf-8', xml_declaration=False):
+        self.fileobj = fileobj
+        self.encoding = encoding
+        self.xml_declaration = xml_declaration
+        self.count = 0
+
+        # use an empty document to build the meta element for the collection
+        self.document = document_class(document_class.empty_document(version))
+        if language:
+            self.document.language = language
+        if expression_date:
+            self.document.expression_date = expression_date
+        if title:
+            self.document.title = title
+        self.document.frbr_uri = frbr_uri
+
+        # the component URIs are based on this URI, which includes the language and expression date
+        self.frbr_uri = FrbrUri.parse(self.document.meta.identification.FRBRExpression.FRBRthis.get('value'))
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        xf = self._xf = self._stack.enter_context(etree.xmlfile(self.fileobj, encoding=self.encoding))
+        if self.xml_declaration:
+            xf.write_declaration()
+
+        root = self.document.root
+        main = self.document.main
+        self._stack.enter_context(xf.element(root.tag, dict(root.attrib), nsmap=root.nsmap))
+        self._stack.enter_context(xf.element(main.tag, dict(main.attrib)))
+        xf.write(self.document.meta, with_tail=False)
+        self._stack.enter_context(xf.element(self.document.main_content.tag))
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._stack.__exit__(*exc_info)
+
+    def add_component(self, document, name=None):
+        """ Write a :class:`StructuredDocument` to the collection as a new component. Its FRBR details are updated
+        in place to match the collection.
+
+        :param document: the document to add as a component
+        :param name: the work component name, such as ``notice_1``; defaults to ``component_N``
+        """
+        self.count += 1
+        uri = self.frbr_uri.clone()
+        uri.work_component = name or f'component_{self.count}'
+
+        document._update_identification(document.meta.identification, uri)
+        document.meta.identification.FRBRExpression.FRBRdate.set(
+            'date', self.document.meta.identification.FRBRExpression.FRBRdate.get('date'))
+
+        with self._xf.element(f'{{{self.document.namespace}}}component', {'eId': f'cmp_{self.count}'}):
+            self._xf.write(document.main, with_tail=False)
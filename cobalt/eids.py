@@ -0,0 +1,188 @@
+"""
+Generate the eIds of a document's elements, following the Akoma Ntoso naming convention
+(https://docs.oasis-open.org/legaldocml/akn-nc/v1.0/os/akn-nc-v1.0-os.html#_Toc531692277), such as after
+its structure has been edited.
+
+An element's eId is the eId of its closest ancestor with an eId, followed by ``__``, a prefix for the element (eg.
+``sec`` for a section) and a number:
+
+* elements with a `num` child are numbered from it, so ``<section><num>2.</num>`` becomes ``sec_2``
+* hierarchical elements without a `num` are numbered among their siblings with the same prefix as ``nn_1``, ``nn_2``
+* other elements are numbered among their siblings with the same prefix, so paragraphs of text are ``p_1``, ``p_2``
+
+Repeated eIds are made unique with a suffix, as in ``sec_2_2``.
+"""
+import re
+
+from lxml import etree
+
+from .akn import QUOTED_STRUCTURES
+from .schemas import AkomaNtoso30
+
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+class EidGenerator:
+    """ Renumbers the eIds of a document in a single pass over it.
+
+    Hierarchical elements (:attr:`cobalt.schemas.AkomaNtoso30.hier_elements`) are always given eIds, and other
+    elements are renumbered if they already have one. The `meta` elements, and the content of quoted structures,
+    are left as they are. The content of an attachment is numbered beneath the attachment's eId (eg. ``att_1__sec_1``),
+    while each component of a collection is numbered as a document of its own.
+
+        >>> EidGenerator().renumber(act.root)
+        {None: {'sec_3': 'sec_2', 'sec_3__p_1': 'sec_2__p_1'}}
+    """
+    prefixes = {
+        'alinea': 'al', 'amendmentBody': 'body', 'article': 'art', 'attachment': 'att', 'blockList': 'list',
+        'chapter': 'chp', 'citation': 'cit', 'citations': 'cits', 'clause': 'cl', 'component': 'cmp',
+        'components': 'cmpnts', 'componentRef': 'cref', 'debateBody': 'body', 'debateSection': 'dbsect',
+        'division': 'dvs', 'documentRef': 'dref', 'eventRef': 'eref', 'judgmentBody': 'body',
+        'listIntroduction': 'intro', 'listWrapUp': 'wrap', 'mainBody': 'body', 'paragraph': 'para',
+        'quotedStructure': 'qstr', 'quotedText': 'qtext', 'recital': 'rec', 'recitals': 'recs', 'section': 'sec',
+        'subchapter': 'subchp', 'subclause': 'subcl', 'subdivision': 'subdvs', 'subparagraph': 'subpara',
+        'subsection': 'subsec', 'temporalGroup': 'tmpg', 'wrapUp': 'wrapup',
+    }
+    """ The eId prefix of each element that doesn't use its own name, from the naming convention. """
+
+    def __init__(self, namespace=AkomaNtoso30.namespace):
+        self.namespace = namespace
+        self.hier = {f'{{{namespace}}}{t}' for t in AkomaNtoso30.hier_elements}
+        self.documents = {f'{{{namespace}}}{t}' for t in AkomaNtoso30.document_elements}
+        self.skipped = {f'{{{namespace}}}{t}' for t in ['meta'] + QUOTED_STRUCTURES}
+        self.num = f'{{{namespace}}}num'
+        self.component = f'{{{namespace}}}component'
+
+    def clean_num(self, num):
+        """ Turn the text of a `num` element into the number part of an eId, such as ``a`` for ``(a)``.
+        """
+        num = num.strip().strip('()[]').rstrip('.').strip()
+        return WHITESPACE_RE.sub('-', num)
+
+    def renumber(self, root, wids=False):
+        """ Renumber the eIds of `root` and its descendants, and change the `href` attributes that refer to
+        renamed eIds (eg. ``#sec_2``) to match.
+
+        Each component of a collection is numbered as a document of its own, so the same eId can be renamed
+        differently in different components, and an `href` only refers to an eId in its own component. New eIds are
+        never the same as the eIds that are left as they are, in `meta` elements and the content of quoted
+        structures.
+
+        :param root: the root element of a document, or another element to number from
+        :param wids: set the `wId` of each renamed element that doesn't have one to its old eId, so that it
+                     still identifies the element's original position, as described by the Akoma Ntoso schema.
+                     Only existing eIds are kept like this; wIds aren't generated for elements that had no eId.
+        :return: dict from the `component` element of each component of a collection, or None for the rest of the
+                 document, to a dict of its renamed eIds, from old to new. Only components with renamed eIds are
+                 included.
+        """
+        reserved = self.reserved_eids(root)
+        # the component that root is in, if any
+        top = next(root.iterancestors(self.component), None)
+        # component -> (renamed eIds, elements with hrefs to eIds) of each document that is numbered separately
+        scopes = {top: ({}, [])}
+        # (element, eId, {prefix: count of children numbered so far}, eIds used in the document, scope) of the
+        # elements eIds are made beneath
+        stack = [(None, '', {}, set(reserved.get(top, ())), scopes[top])]
+
+        walker = etree.iterwalk(root, events=('start', 'end'))
+        # not available in older versions of lxml
+        skip_subtree = getattr(walker, 'skip_subtree', None)
+        skipped = None
+
+        for event, elem in walker:
+            if skipped is not None:
+                # inside an element that is left as it is
+                if event == 'end' and elem is skipped:
+                    skipped = None
+                continue
+
+            if not isinstance(elem.tag, str):
+                continue
+
+            if event == 'end':
+                if stack[-1][0] is elem:
+                    stack.pop()
+                continue
+
+            renamed, hrefs = stack[-1][4]
+
+            if elem.tag in self.skipped:
+                if elem.get('eId') is not None:
+                    self.rename(elem, self.make_eid(elem, stack[-1]), renamed, wids)
+                skipped = elem
+                if skip_subtree is not None:
+                    skip_subtree()
+                continue
+
+            if elem.tag in self.documents and elem.getparent() is not None \
+                    and elem.getparent().tag == self.component:
+                # the component of a collection is a document in its own right
+                component = elem.getparent()
+                scope = scopes[component] = ({}, [])
+                stack.append((elem, '', {}, set(reserved.get(component, ())), scope))
+                continue
+
+            href = elem.get('href')
+            if href and href.startswith('#'):
+                hrefs.append(elem)
+
+            if elem.tag in self.hier or elem.get('eId') is not None:
+                eid = self.make_eid(elem, stack[-1])
+                self.rename(elem, eid, renamed, wids)
+                stack.append((elem, eid, {}, stack[-1][3], stack[-1][4]))
+
+        for renamed, hrefs in scopes.values():
+            for elem in hrefs:
+                eid = renamed.get(elem.get('href')[1:])
+                if eid:
+                    elem.set('href', '#' + eid)
+
+        return {component: renamed for component, (renamed, hrefs) in scopes.items() if renamed}
+
+    def reserved_eids(self, root):
+        """ Find the eIds beneath `root` that aren't renumbered, in `meta` elements and the content of quoted
+        structures. Returns a dict from the `component` element of each component of a collection, or None for the
+        rest of the document, to a set of eIds.
+        """
+        reserved = {}
+        for elem in root.iter(*self.skipped):
+            component = next(elem.iterancestors(self.component), None)
+            reserved.setdefault(component, set()).update(
+                e.get('eId') for e in elem.iterdescendants(etree.Element) if e.get('eId') is not None)
+        return reserved
+
+    def make_eid(self, elem, parent):
+        """ Make an unused eId for an element, beneath its parent's `(element, eId, counts, used, scope)` tuple.
+        """
+        _, scope, counts, used, _ = parent
+        name = elem.tag.split('}', 1)[-1]
+        prefix = self.prefixes.get(name, name)
+
+        num = elem.find(self.num)
+        num = self.clean_num(''.join(num.itertext())) if num is not None else ''
+        if num:
+            eid = f'{prefix}_{num}'
+        else:
+            key = f'{prefix}_nn' if elem.tag in self.hier else prefix
+            counts[key] = count = counts.get(key, 0) + 1
+            eid = f'{key}_{count}'
+
+        if scope:
+            eid = f'{scope}__{eid}'
+
+        unique, n = eid, 1
+        while unique in used:
+            n += 1
+            unique = f'{eid}_{n}'
+        used.add(unique)
+        return unique
+
+    def rename(self, elem, eid, renamed, wids=False):
+        old = elem.get('eId')
+        if old != eid:
+            elem.set('eId', eid)
+            if old is not None:
+                renamed[old] = eid
+                if wids and elem.get('wId') is None:
+                    elem.set('wId', old)
@@ -0,0 +1,145 @@
+"""
+A graph of citations between works, harvested from the references in Akoma Ntoso documents.
+"""
+from array import array
+from io import BytesIO
+
+from lxml import etree
+
+from .akn import StructuredDocument
+from .uri import FrbrUri
+
+# elements whose href attributes are citations
+CITATION_ELEMENTS = ['ref', 'passiveRef', 'activeRef']
+
+
+def _work_uri(href):
+    """ Normalise an href to a work URI with an `akn` prefix, or None if it isn't an FRBR URI.
+    """
+    try:
+        uri = FrbrUri.parse(href)
+    except ValueError:
+        return None
+    uri.prefix = 'akn'
+    return uri.work_uri(work_component=False)
+
+
+def extract_citations(source):
+    """ Get the work URI of a document and the set of work URIs that it cites, in a single pass over the document.
+
+    Citations are the `href` attributes of `<ref>` elements and of the `<passiveRef>` and `<activeRef>` elements
+    in the document's references, that are FRBR URIs. Citations of the document itself are ignored.
+
+    :param source: a :class:`cobalt.akn.StructuredDocument`, or the filename, file-like object or bytes of the XML
+                   of a document, which is parsed incrementally without loading the entire document
+    :returns: `(work_uri, set of work URIs)` tuple
+    """
+    hrefs = []
+
+    if isinstance(source, StructuredDocument):
+        work_uri = _work_uri(source.frbr_uri.work_uri())
+        tags = [f'{{{source.namespace}}}{t}' for t in CITATION_ELEMENTS]
+        hrefs = [elem.get('href') for elem in source.root.iter(*tags)]
+
+    else:
+        work_uri = None
+        for _, elem in etree.iterparse(BytesIO(source) if isinstance(source, bytes) else source):
+            name = etree.QName(elem).localname
+            if name in CITATION_ELEMENTS:
+                hrefs.append(elem.get('href'))
+            elif work_uri is None and name == 'FRBRuri' and etree.QName(elem.getparent()).localname == 'FRBRWork':
+                work_uri = _work_uri(elem.get('value'))
+
+            # discard everything that has already been parsed
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+    targets = {_work_uri(href) for href in hrefs if href}
+    targets.discard(None)
+    targets.discard(work_uri)
+    return work_uri, targets
+
+
+class CitationGraph:
+    """ A directed graph of citations between works.
+
+    Work URIs are interned as integer ids, and each work's outgoing and incoming edges are stored as compact
+    arrays of ids, so that both "what does this work cite" and "what cites this work" take time proportional to the
+    number of edges of the work. Adding a document replaces the citations of its work, so the graph can be
+    updated incrementally as documents change.
+
+        >>> graph = CitationGraph()
+        >>> for fname in files:
+        ...     graph.add_document(fname)
+        >>> graph.cited_by('/akn/za/act/2009/1')
+        ['/akn/za/act/2012/5', '/akn/za/act/2015/3']
+
+    :ivar uris: list of interned work URIs, indexed by id
+    """
+    def __init__(self):
+        self.uris = []
+        self.ids = {}
+        # id -> array of ids
+        self.outgoing = []
+        self.incoming = []
+
+    def __len__(self):
+        return len(self.uris)
+
+    def __contains__(self, work_uri):
+        return work_uri in self.ids
+
+    def edge_count(self):
+        return sum(len(edges) for edges in self.outgoing)
+
+    def intern(self, work_uri):
+        """ Get the id of a work URI, adding it to the graph if necessary.
+        """
+        id = self.ids.get(work_uri)
+        if id is None:
+            id = self.ids[work_uri] = len(self.uris)
+            self.uris.append(work_uri)
+            self.outgoing.append(array('I'))
+            self.incoming.append(array('I'))
+        return id
+
+    def add_document(self, source):
+        """ Harvest the citations of a document with :func:`extract_citations` and replace the citations of its work.
+        Returns the work URI.
+        """
+        work_uri, targets = extract_citations(source)
+        self.set_citations(work_uri, targets)
+        return work_uri
+
+    def set_citations(self, work_uri, targets):
+        """ Replace the works cited by a work.
+        """
+        id = self.intern(work_uri)
+        self.remove_citations(work_uri)
+
+        outgoing = array('I', sorted({self.intern(t) for t in targets} - {id}))
+        self.outgoing[id] = outgoing
+        for target in outgoing:
+            self.incoming[target].append(id)
+
+    def remove_citations(self, work_uri):
+        """ Remove the citations made by a work. Citations of the work by other works are kept.
+        """
+        id = self.ids.get(work_uri)
+        if id is not None:
+            for target in self.outgoing[id]:
+                self.incoming[target].remove(id)
+            self.outgoing[id] = array('I')
+
+    def cites(self, work_uri):
+        """ Work URIs cited by a work.
+        """
+        id = self.ids.get(work_uri)
+        return [] if id is None else [self.uris[i] for i in self.outgoing[id]]
+
+    def cited_by(self, work_uri):
+        """ Work URIs of the works that cite a work.
+        """
+        id = self.ids.get(work_uri)
+        return [] if id is None else [self.uris[i] for i in self.incoming[id]]
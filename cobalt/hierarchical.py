@@ -1,4 +1,4 @@
-from .akn import StructuredDocument, datestring, NULL_DATE, parsedate
+from .akn import StructuredDocument, changes_document, datestring, NULL_DATE, parsedate
 
 
 class HierarchicalStructure(StructuredDocument):
@@ -29,6 +29,7 @@ class Act(HierarchicalStructure):
         return pub.get('name') if pub is not None else None
 
     @publication_name.setter
+    @changes_document
     def publication_name(self, value):
         value = value or ""
         pub = self.ensure_publication()
@@ -45,6 +46,7 @@ class Act(HierarchicalStructure):
         return None
 
     @publication_date.setter
+    @changes_document
     def publication_date(self, value):
         self.ensure_publication().set('date', datestring(value))
 
@@ -56,73 +58,192 @@ class Act(HierarchicalStructure):
         return pub.get('number') if pub is not None else None
 
     @publication_number.setter
+    @changes_document
     def publication_number(self, value):
         self.ensure_publication().set('number', value or "")
 
     @property
     def amendments(self):
         amendments = []
+        passive_ref = f'{{{self.namespace}}}passiveRef'
+        references = self._reference_index()
 
         for e in self.meta.iterfind(f'.//{{{self.namespace}}}lifecycle/{{{self.namespace}}}eventRef[@type="amendment"]'):
             date = parsedate(e.get('date'))
             event = AmendmentEvent(date=date)
             amendments.append(event)
 
-            eid = e.get('source')[1:]
-            source = self.meta.findall(f'.//{{{self.namespace}}}references/{{{self.namespace}}}passiveRef[@eId="{eid}"]')
-            if source:
-                event.amending_title = source[0].get('showAs')
-                event.amending_uri = source[0].get('href')
+            source = references.get(e.get('source')[1:])
+            if source is not None and source.tag == passive_ref:
+                event.amending_title = source.get('showAs')
+                event.amending_uri = source.get('href')
 
         amendments.sort(key=lambda a: a.date)
         return amendments
 
     @amendments.setter
+    @changes_document
     def amendments(self, value):
         # delete existing entries
         lifecycle = self.meta.find(f'{{{self.namespace}}}lifecycle')
         if lifecycle is not None:
-            for e in lifecycle.findall(f'./{{{self.namespace}}}eventRef[@type="amendment"]'):
-                # delete the passive ref elements
-                eid = e.get('source')[1:]
-                for node in self.meta.iterfind(f'.//{{{self.namespace}}}references/{{{self.namespace}}}passiveRef[@eId="{eid}"]'):
-                    node.getparent().remove(node)
-                # delete the event
+            events = lifecycle.findall(f'./{{{self.namespace}}}eventRef[@type="amendment"]')
+            # delete the passive ref elements
+            self._remove_references({e.get('source')[1:] for e in events})
+            # delete the events
+            for e in events:
                 lifecycle.remove(e)
 
         if not value:
-            # no amendments, default is originalVersion so it doesn't need to be set explicitly
-            if 'contains' in self.act.attrib:
-                del self.act.attrib['contains']
-            # lifecycle cannot be empty§
-            if lifecycle is not None and not lifecycle.getchildren():
-                lifecycle.getparent().remove(lifecycle)
+            self._tidy_amendments(lifecycle)
 
         else:
-            self.act.set('contains', 'singleVersion')
-            lifecycle = self._ensure_lifecycle()
-            references = self.ensure_element('meta.references', after=lifecycle)
-            if not references.get('source'):
-                references.set('source', '#' + self.source[1])
-
-            for i, event in enumerate(value):
-                date = datestring(event.date)
-                ref = f'amendment-{i}-source'
-
-                # create the lifecycle element
-                node = self.make_element('eventRef')
-                node.set('eId', 'amendment-' + date)
-                node.set('date', date)
-                node.set('type', 'amendment')
-                node.set('source', '#' + ref)
-                lifecycle.append(node)
-
-                # create the passive ref
-                node = self.make_element('passiveRef')
-                node.set('eId', ref)
-                node.set('href', event.amending_uri)
-                node.set('showAs', event.amending_title)
-                references.append(node)
+            lifecycle, references = self._prepare_amendments()
+            eids = {e.get('eId') for e in lifecycle.iterchildren(f'{{{self.namespace}}}eventRef')}
+            nodes = [self._make_amendment(references, event, f'amendment-{i}-source', eids)
+                     for i, event in enumerate(value)]
+            nodes.sort(key=lambda node: node.get('date'))
+            self._insert_events(lifecycle, nodes)
+
+    @changes_document
+    def add_amendment(self, event):
+        """ Add a single :class:`AmendmentEvent` to this act, without changing existing amendments.
+        """
+        lifecycle, references = self._prepare_amendments()
+
+        # find an unused source eId
+        existing = self._reference_index(references)
+        i = 0
+        while f'amendment-{i}-source' in existing:
+            i += 1
+
+        eids = {e.get('eId') for e in lifecycle.iterchildren(f'{{{self.namespace}}}eventRef')}
+        self._insert_events(lifecycle, [self._make_amendment(references, event, f'amendment-{i}-source', eids)])
+
+    @changes_document
+    def remove_amendment(self, date_or_uri):
+        """ Remove amendment events that match a date (or date string) or the FRBR URI of the amending document.
+        Other amendments are left unchanged. Returns the number of events removed.
+        """
+        removed = 0
+        for event, source in self._find_amendments(date_or_uri):
+            event.getparent().remove(event)
+            if source is not None:
+                source.getparent().remove(source)
+            removed += 1
+
+        lifecycle = self.meta.find(f'{{{self.namespace}}}lifecycle')
+        if removed and (lifecycle is None or lifecycle.find(f'{{{self.namespace}}}eventRef[@type="amendment"]') is None):
+            self._tidy_amendments(lifecycle)
+
+        return removed
+
+    @changes_document
+    def update_amendment(self, date_or_uri, date=None, amending_uri=None, amending_title=None):
+        """ Update the details of amendment events that match a date (or date string) or the FRBR URI of the
+        amending document. Only the given details are changed, and existing eIds are kept as they are. An event
+        whose date changes is moved to keep the events in date order.
+        Returns the number of events updated.
+        """
+        updated = 0
+        for event, source in self._find_amendments(date_or_uri):
+            if date is not None and event.get('date') != datestring(date):
+                event.set('date', datestring(date))
+                lifecycle = event.getparent()
+                lifecycle.remove(event)
+                self._insert_events(lifecycle, [event])
+            if source is not None:
+                if amending_uri is not None:
+                    source.set('href', amending_uri)
+                if amending_title is not None:
+                    source.set('showAs', amending_title)
+            updated += 1
+
+        return updated
+
+    def _find_amendments(self, date_or_uri):
+        """ Find (eventRef, passiveRef) pairs for amendment events that match a date (or date string) or the
+        FRBR URI of the amending document. The passiveRef may be None.
+        """
+        if not isinstance(date_or_uri, str):
+            date_or_uri = datestring(date_or_uri)
+
+        passive_ref = f'{{{self.namespace}}}passiveRef'
+        references = self._reference_index()
+        matches = []
+        for e in self.meta.iterfind(f'./{{{self.namespace}}}lifecycle/{{{self.namespace}}}eventRef[@type="amendment"]'):
+            source = references.get((e.get('source') or '')[1:])
+            if source is not None and source.tag != passive_ref:
+                source = None
+            if e.get('date') == date_or_uri or (source is not None and source.get('href') == date_or_uri):
+                matches.append((e, source))
+
+        return matches
+
+    def _prepare_amendments(self):
+        """ Ensure the lifecycle and references elements exist for adding amendments. Returns a
+        (lifecycle, references) tuple.
+        """
+        self.act.set('contains', 'singleVersion')
+        lifecycle = self._ensure_lifecycle()
+        references = self.ensure_element('meta.references', after=lifecycle)
+        if not references.get('source'):
+            references.set('source', '#' + self.source[1])
+        return lifecycle, references
+
+    def _make_amendment(self, references, event, ref, eids):
+        """ Make the eventRef for an amendment event, and add its passiveRef to `references`. The eventRef is given
+        an eId that isn't in `eids`, which is updated. Returns the eventRef, which must be inserted with
+        :meth:`_insert_events`.
+        """
+        date = datestring(event.date)
+
+        # several amendments can happen on the same date
+        eid = 'amendment-' + date
+        n = 1
+        while eid in eids:
+            n += 1
+            eid = f'amendment-{date}-{n}'
+        eids.add(eid)
+
+        # create the lifecycle element
+        node = self.make_element('eventRef')
+        node.set('eId', eid)
+        node.set('date', date)
+        node.set('type', 'amendment')
+        node.set('source', '#' + ref)
+
+        # create the passive ref
+        passive = self.make_element('passiveRef')
+        passive.set('eId', ref)
+        passive.set('href', event.amending_uri)
+        passive.set('showAs', event.amending_title)
+        references.append(passive)
+
+        return node
+
+    def _insert_events(self, lifecycle, nodes):
+        """ Insert eventRefs, which must be sorted by date, into the lifecycle in date order. Each one is placed after
+        the existing events with the same date. This is a single pass over the existing events.
+        """
+        i = 0
+        for other in lifecycle.findall(f'{{{self.namespace}}}eventRef'):
+            date = other.get('date') or ''
+            while i < len(nodes) and nodes[i].get('date') < date:
+                other.addprevious(nodes[i])
+                i += 1
+        for node in nodes[i:]:
+            lifecycle.append(node)
+
+    def _tidy_amendments(self, lifecycle):
+        """ Tidy up after all amendments have been removed.
+        """
+        # no amendments, default is originalVersion so it doesn't need to be set explicitly
+        if 'contains' in self.act.attrib:
+            del self.act.attrib['contains']
+        # lifecycle cannot be empty
+        if lifecycle is not None and not lifecycle.getchildren():
+            lifecycle.getparent().remove(lifecycle)
 
     @property
     def repeal(self):
@@ -131,23 +252,21 @@ class Act(HierarchicalStructure):
             date = parsedate(e.get('date'))
             event = RepealEvent(date=date)
 
-            id = e.get('source')[1:]
-            source = self.meta.findall(f'.//{{{self.namespace}}}references/{{{self.namespace}}}passiveRef[@eId="{id}"]')
-            if source:
-                event.repealing_title = source[0].get('showAs')
-                event.repealing_uri = source[0].get('href')
+            source = self._reference_index().get(e.get('source')[1:])
+            if source is not None and source.tag == f'{{{self.namespace}}}passiveRef':
+                event.repealing_title = source.get('showAs')
+                event.repealing_uri = source.get('href')
             return event
 
     @repeal.setter
+    @changes_document
     def repeal(self, value):
         # delete existing entries
-        for e in self.meta.iterfind(f'.//{{{self.namespace}}}lifecycle/{{{self.namespace}}}eventRef[@type="repeal"]'):
-            # delete the passive ref elements
-            id = e.get('source')[1:]
-            for node in self.meta.iterfind(f'.//{{{self.namespace}}}references/{{{self.namespace}}}passiveRef[@eId="{id}"]'):
-                node.getparent().remove(node)
-
-            # delete the event
+        events = self.meta.findall(f'.//{{{self.namespace}}}lifecycle/{{{self.namespace}}}eventRef[@type="repeal"]')
+        # delete the passive ref elements
+        self._remove_references({e.get('source')[1:] for e in events})
+        # delete the events
+        for e in events:
             e.getparent().remove(e)
 
         if value:
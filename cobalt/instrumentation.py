@@ -0,0 +1,194 @@
+"""
+Hooks for measuring where cobalt spends its time.
+
+A hook is a function that is called with an :class:`Event` after each instrumented operation, such as parsing
+or validating a document. When no hooks are installed, instrumented operations only check that the list of hooks
+is empty.
+
+    >>> stats = Aggregator()
+    >>> with installed(stats):
+    ...     act = Act(xml)
+    ...     validate(act)
+    >>> stats.snapshot()['AkomaNtosoDocument.parse']['count']
+    1
+"""
+import logging
+import time
+from bisect import bisect_left
+from functools import wraps
+
+hooks = []
+""" The installed hooks. """
+
+log = logging.getLogger(__name__)
+
+
+class Event:
+    """ Details of an instrumented operation.
+
+    :ivar name: name of the operation, such as `AkomaNtosoDocument.parse`
+    :ivar duration: duration in seconds
+    :ivar size: size of the input or output in bytes or characters, or None
+    :ivar cache_hit: True or False if the operation used a cache, otherwise None
+    :ivar error: the exception raised by the operation, or None
+    """
+    __slots__ = ('name', 'duration', 'size', 'cache_hit', 'error', '_elements', '_tree')
+
+    def __init__(self, name, duration, size=None, cache_hit=None, elements=None, tree=None, error=None):
+        self.name = name
+        self.duration = duration
+        self.size = size
+        self.cache_hit = cache_hit
+        self.error = error
+        self._elements = elements
+        self._tree = tree
+
+    @property
+    def elements(self):
+        """ The number of elements involved, or None. Counting the elements in a tree is only done if this is used.
+        """
+        if self._elements is None and self._tree is not None:
+            self._elements = sum(1 for _ in self._tree.iter())
+        return self._elements
+
+    def __repr__(self):
+        return f'<Event {self.name} {self.duration * 1000:.3f}ms>'
+
+
+def add_hook(hook):
+    """ Install a hook, which is called with an :class:`Event` after each instrumented operation.
+    """
+    hooks.append(hook)
+
+
+def remove_hook(hook):
+    """ Remove an installed hook.
+    """
+    hooks.remove(hook)
+
+
+class installed:
+    """ Context manager that installs a hook for the duration of a block.
+    """
+    def __init__(self, hook):
+        self.hook = hook
+
+    def __enter__(self):
+        add_hook(self.hook)
+        return self.hook
+
+    def __exit__(self, *args):
+        remove_hook(self.hook)
+
+
+def instrumented(name, before=None, after=None):
+    """ Decorator that reports calls to a function to the installed hooks.
+
+    Errors raised by `before`, `after` and the hooks are logged and otherwise ignored, so that instrumentation
+    never changes the result of a call.
+
+    :param name: name of the operation
+    :param before: optional function called with `(args, kwargs)` before the operation, that returns a dict of
+                   :class:`Event` attributes
+    :param after: optional function called with `(result, args, kwargs)` after the operation, that returns a
+                  dict of :class:`Event` attributes
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not hooks:
+                return func(*args, **kwargs)
+
+            info = _call(name, before, args, kwargs) if before else {}
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                _report(Event(name, time.perf_counter() - start, error=e, **info))
+                raise
+
+            duration = time.perf_counter() - start
+            if after:
+                info.update(_call(name, after, result, args, kwargs))
+            _report(Event(name, duration, **info))
+            return result
+
+        return wrapper
+    return decorator
+
+
+def argument_size(index, keyword):
+    """ Make a `before` function for :func:`instrumented` that gives the length of an argument as the size of an
+    event. The argument is the positional argument at `index`, or the keyword argument `keyword`. The size is None
+    if the argument is missing or has no length.
+    """
+    def before(args, kwargs):
+        value = args[index] if len(args) > index else kwargs.get(keyword)
+        try:
+            return {'size': len(value)}
+        except TypeError:
+            return {'size': None}
+    return before
+
+
+def _call(name, func, *args):
+    """ Call a `before` or `after` function, returning an empty dict if it fails.
+    """
+    try:
+        return func(*args)
+    except Exception:
+        log.exception(f"Error describing a call to {name}")
+        return {}
+
+
+def _report(event):
+    """ Call each installed hook with an event, logging any errors.
+    """
+    for hook in list(hooks):
+        try:
+            hook(event)
+        except Exception:
+            log.exception(f"Error in instrumentation hook {hook!r} for {event.name}")
+
+
+class Aggregator:
+    """ A hook that aggregates events in-process, for export to a monitoring system.
+
+    For each operation, it counts calls, errors, cache hits and misses, and sums durations, sizes and element
+    counts. Durations are also recorded in a histogram, with the upper bounds (in seconds) given by `buckets`.
+    """
+    buckets = [0.00001, 0.0001, 0.001, 0.01, 0.1, 1, 10]
+
+    def __init__(self, count_elements=False):
+        """ :param count_elements: count the elements of trees, which may be slow
+        """
+        self.count_elements = count_elements
+        self.stats = {}
+
+    def __call__(self, event):
+        stats = self.stats.get(event.name)
+        if stats is None:
+            stats = self.stats[event.name] = {
+                'count': 0, 'errors': 0, 'duration': 0.0, 'size': 0, 'elements': 0, 'cache_hits': 0,
+                'cache_misses': 0, 'histogram': [0] * (len(self.buckets) + 1),
+            }
+
+        stats['count'] += 1
+        stats['duration'] += event.duration
+        stats['histogram'][bisect_left(self.buckets, event.duration)] += 1
+        if event.error is not None:
+            stats['errors'] += 1
+        if event.size is not None:
+            stats['size'] += event.size
+        if event.cache_hit is not None:
+            stats['cache_hits' if event.cache_hit else 'cache_misses'] += 1
+        if event._elements is not None or self.count_elements:
+            stats['elements'] += event.elements or 0
+
+    def snapshot(self):
+        """ Get a copy of the statistics, as a dict from operation name to a dict of counters.
+        """
+        return {name: dict(stats, histogram=list(stats['histogram'])) for name, stats in self.stats.items()}
+
+    def reset(self):
+        self.stats = {}
@@ -0,0 +1,106 @@
+"""
+Change the FRBR URIs of documents, such as when a locality code is renamed, together with the references to them.
+
+A mapping is a function that takes a :class:`cobalt.uri.FrbrUri` and returns the new URI, or None (or the same
+URI) to leave it unchanged. It is applied to the URI of each document and to the `href` of each citation in it, so
+that references between the documents in a corpus stay correct. Use :func:`cobalt.cli.reidentify_files` to
+re-identify a corpus of files in parallel.
+
+    >>> mapping = UriMapping({'locality': 'cpt'}, where={'locality': 'wc011'})
+    >>> report = reidentify(act, mapping)
+"""
+from .graph import CITATION_ELEMENTS
+from .uri import FrbrUri
+
+
+class UriMapping:
+    """ A mapping that changes some fields of a URI, such as ``locality``, if its other fields match `where`.
+    Blank values mean None. Mappings must be picklable to be used in parallel, which this is.
+
+    :param changes: dict from field name to new value
+    :param where: dict from field name to the value it must have for the URI to be changed
+    """
+    def __init__(self, changes, where=None):
+        self.changes = dict(changes)
+        self.where = dict(where or {})
+
+    def __call__(self, uri):
+        if all(getattr(uri, field) == (value or None) for field, value in self.where.items()):
+            for field, value in self.changes.items():
+                setattr(uri, field, value or None)
+            return uri
+
+
+def _map(mapping, uri):
+    """ Apply a mapping to a copy of a URI, returning the new URI or None if the work URI is unchanged.
+    """
+    new = mapping(uri.clone())
+    if new is not None:
+        if not isinstance(new, FrbrUri):
+            new = FrbrUri.parse(new)
+        if new.uri() != uri.uri():
+            return new
+
+
+def rewrite_refs(document, mapping, skipped=None):
+    """ Change the `href` attributes of the citations in a document (see :data:`cobalt.graph.CITATION_ELEMENTS`)
+    that refer to works whose URIs are changed by `mapping`. Only the work part of each href is changed, so the
+    expression, component and portion it refers to are kept.
+
+    Returns a list of `(old, new)` hrefs for each citation that was changed, in document order.
+
+    :param skipped: optional list to append the href of each citation to, in document order, that refers to a work
+                    changed by `mapping` but that can't be rewritten because it doesn't start with the work's URI
+                    in canonical form
+    """
+    tags = [f'{{{document.namespace}}}{name}' for name in CITATION_ELEMENTS]
+    # old href -> new href, None if unchanged, or False if it can't be rewritten, so that repeated hrefs are only
+    # mapped once
+    hrefs = {}
+    changes = []
+
+    for elem in document.root.iter(*tags):
+        href = elem.get('href')
+        if not href:
+            continue
+
+        if href not in hrefs:
+            hrefs[href] = None
+            try:
+                uri = FrbrUri.parse(href)
+            except ValueError:
+                continue
+            new = _map(mapping, uri)
+            if new is not None:
+                hrefs[href] = new.uri() + href[len(uri.uri()):] if href.startswith(uri.uri()) else False
+
+        if hrefs[href]:
+            elem.set('href', hrefs[href])
+            changes.append((href, hrefs[href]))
+        elif hrefs[href] is False and skipped is not None:
+            skipped.append(href)
+
+    return changes
+
+
+def reidentify(document, mapping):
+    """ Change the FRBR URI of a document and its components using `mapping`, in the same way as setting
+    :attr:`cobalt.akn.StructuredDocument.frbr_uri`, and rewrite its citations with :func:`rewrite_refs`.
+
+    Returns a report dict with the old and new expression FRBR URIs, whether the document's URI changed, the
+    list of `(old, new)` citations that changed, and the list of hrefs of citations that should have changed but
+    couldn't be rewritten (see :func:`rewrite_refs`).
+    """
+    old = document.expression_frbr_uri()
+    new = _map(mapping, old)
+    if new is not None:
+        document.frbr_uri = new
+
+    skipped = []
+    return {
+        'old_frbr_uri': old.expression_uri(),
+        'frbr_uri': document.expression_frbr_uri().expression_uri(),
+        'changed': new is not None,
+        'refs': rewrite_refs(document, mapping, skipped),
+        'skipped': skipped,
+    }
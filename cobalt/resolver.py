@@ -0,0 +1,145 @@
+"""
+Point-in-time resolution of expressions: finding the expression of a work that was in force at a particular date.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+from .akn import datestring
+from .uri import FrbrUri
+
+
+def _datestring(value):
+    return datestring(value) if isinstance(value, date) else value
+
+
+class PointInTimeResolver:
+    """ Resolves "as at" queries, which find the latest expression of a work whose expression date is on or before
+    a given date.
+
+    For each work URI (as given by :meth:`cobalt.uri.FrbrUri.work_uri`) and language, the resolver keeps a sorted
+    list of expression dates, so that each query takes O(log n) time. The resolver is fed from document metadata,
+    such as the details returned by :class:`cobalt.store.DocumentStore`, so documents don't need to be parsed.
+
+        >>> resolver = PointInTimeResolver()
+        >>> resolver.add_many(store.find(country='za'))
+        >>> resolver.resolve('/akn/za/act/2009/1', '2015-01-01')
+        '/akn/za/act/2009/1/eng@2012-04-01'
+    """
+    def __init__(self):
+        # work uri -> language -> ([expression date], [expression uri])
+        self.works = {}
+
+    def __len__(self):
+        return len(self.works)
+
+    def add(self, frbr_uri, expression_date=None):
+        """ Add an expression, replacing any existing expression of the work with the same language and date.
+
+        :param frbr_uri: expression FRBR URI, as a string or :class:`cobalt.uri.FrbrUri`
+        :param expression_date: expression date, as a `date` or string; defaults to the date in the URI, or the
+                                date of the work if the URI has no date
+        """
+        work_uri, language, expression_date, expression_uri = self._key(frbr_uri, expression_date)
+        dates, uris = self.works.setdefault(work_uri, {}).setdefault(language, ([], []))
+
+        i = bisect_left(dates, expression_date)
+        if i < len(dates) and dates[i] == expression_date:
+            uris[i] = expression_uri
+        else:
+            dates.insert(i, expression_date)
+            uris.insert(i, expression_uri)
+
+    def add_document(self, document):
+        """ Add the expression of a :class:`cobalt.akn.StructuredDocument`.
+        """
+        self.add(document.expression_frbr_uri(), document.expression_date)
+
+    def add_many(self, expressions):
+        """ Add many expressions at once, which is quicker than adding them one at a time. `expressions` is an
+        iterable of dicts with `expression_uri` and `expression_date` keys, such as those returned by
+        :class:`cobalt.store.DocumentStore`.
+        """
+        changed = set()
+        for info in expressions:
+            work_uri, language, expression_date, expression_uri = self._key(
+                info['expression_uri'], info.get('expression_date'))
+            dates, uris = self.works.setdefault(work_uri, {}).setdefault(language, ([], []))
+            dates.append(expression_date)
+            uris.append(expression_uri)
+            changed.add((work_uri, language))
+
+        # sort each changed list once; later entries replace earlier ones with the same date
+        for work_uri, language in changed:
+            dates, uris = self.works[work_uri][language]
+            entries = dict(zip(dates, uris))
+            dates[:] = sorted(entries)
+            uris[:] = [entries[d] for d in dates]
+
+    def remove(self, frbr_uri):
+        """ Remove an expression. Returns True if it was present.
+        """
+        uri = frbr_uri if isinstance(frbr_uri, FrbrUri) else FrbrUri.parse(frbr_uri)
+        languages = self.works.get(uri.work_uri(work_component=False), {})
+        dates, uris = languages.get(uri.language, ([], []))
+        expression_uri = uri.expression_uri(work_component=False)
+
+        if expression_uri in uris:
+            i = uris.index(expression_uri)
+            del dates[i]
+            del uris[i]
+            return True
+        return False
+
+    def resolve(self, work_uri, as_at, language=None):
+        """ Get the URI of the latest expression of a work on or before `as_at`, or None if there isn't one.
+
+        :param work_uri: work FRBR URI, as a string or :class:`cobalt.uri.FrbrUri`
+        :param as_at: date, as a `date` or string
+        :param language: language of the expression; if None, the latest expression in any language is used
+        """
+        if isinstance(work_uri, FrbrUri):
+            work_uri = work_uri.work_uri(work_component=False)
+        return self._resolve(self.works.get(work_uri), _datestring(as_at), language)
+
+    def resolve_many(self, as_at, work_uris=None, language=None):
+        """ Resolve an as-at query for many works at once. Returns a dict from work URI to expression URI, for the
+        works that have an expression on or before `as_at`.
+
+        :param as_at: date, as a `date` or string
+        :param work_uris: work URIs to resolve; if None, all works are resolved
+        :param language: language of the expressions; if None, the latest expression in any language is used
+        """
+        as_at = _datestring(as_at)
+        if work_uris is None:
+            work_uris = self.works
+
+        result = {}
+        for work_uri in work_uris:
+            if isinstance(work_uri, FrbrUri):
+                work_uri = work_uri.work_uri(work_component=False)
+            expression_uri = self._resolve(self.works.get(work_uri), as_at, language)
+            if expression_uri:
+                result[work_uri] = expression_uri
+        return result
+
+    def _resolve(self, languages, as_at, language):
+        if not languages:
+            return None
+
+        best_date = best_uri = None
+        for dates, uris in ([languages.get(language, ([], []))] if language else languages.values()):
+            i = bisect_right(dates, as_at)
+            if i and (best_date is None or dates[i - 1] > best_date):
+                best_date, best_uri = dates[i - 1], uris[i - 1]
+        return best_uri
+
+    def _key(self, frbr_uri, expression_date):
+        uri = frbr_uri if isinstance(frbr_uri, FrbrUri) else FrbrUri.parse(frbr_uri)
+        if expression_date is None:
+            expression_date = (uri.expression_date or '')[1:] or uri.date
+        return (
+            uri.work_uri(work_component=False),
+            uri.language,
+            _datestring(expression_date),
+            uri.expression_uri(work_component=False),
+        )
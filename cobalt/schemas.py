@@ -4,20 +4,43 @@ Cobalt can validate Akoma Ntoso documents against the Akoma Ntoso schema. Two sc
 1. Strict: the `official AKN schema <http://docs.oasis-open.org/legaldocml/akn-core/v1.0/os/part2-specs/schemas/akomantoso30.xsd>`_
 2. Lenient: a slightly modified version of the official schema. Duplicate eId attributes are allowed, and FRBRdate
    elements are allowed to have year-only @date values.
+
+Individual subtrees and components of large documents can be validated on their own with
+:func:`validate_fragment`, which is much faster than validating the entire document after a small change.
+
+Cobalt can also do a fast integrity check of a document with :func:`check_integrity`, which catches
+common problems such as duplicate eIds without the cost of full schema validation.
 """
 import os
+from collections import Counter
+from copy import deepcopy
 
 from lxml import etree
 
+from .instrumentation import instrumented
+
 
 SCHEMAS = {
     'http://docs.oasis-open.org/legaldocml/ns/akn/3.0': 'akomantoso30.xsd',
     'http://docs.oasis-open.org/legaldocml/ns/akn/3.0-lenient': 'akomantoso30-lenient.xsd',
 }
 
+XSD_NAMESPACE = 'http://www.w3.org/2001/XMLSchema'
+XML_NAMESPACE = 'http://www.w3.org/XML/1998/namespace'
+
 _schemas = {}
+_content_models = {}
+
 
+def _schema_cached(args, kwargs):
+    """ Is the schema for a call to get_schema already cached?
+    """
+    namespace = args[0] if args else kwargs['namespace']
+    strict = args[1] if len(args) > 1 else kwargs['strict']
+    return {'cache_hit': (namespace if strict else namespace + '-lenient') in _schemas}
 
+
+@instrumented('schemas.validate', after=lambda result, args, kwargs: {'tree': args[0].root})
 def validate(akn_doc, strict=False):
     """ Validate this AKN document against its schema. if `strict` is True,
     then also validate the uniqueness of eId attributes. Returns a (validates, errors)
@@ -38,6 +61,7 @@ def validate_xml(root, schema):
     return validates, errors
 
 
+@instrumented('schemas.get_schema', before=_schema_cached)
 def get_schema(namespace, strict):
     """ Get an XML schema for a namespace.
     """
@@ -60,13 +84,382 @@ def assert_validates(akn_doc, strict=False):
     schema.assertValid(akn_doc.root)
 
 
+class ContentModel:
+    """ The content model of an element, compiled from an XSD schema.
+
+    :ivar children: frozenset of the names of allowed child elements
+    :ivar order: dict from the name of an allowed child element to its position in the required order of children.
+                 Children with the same position may appear in any order relative to each other.
+    :ivar attributes: frozenset of the names of allowed attributes
+    :ivar required_attributes: frozenset of the names of required attributes
+    """
+    def __init__(self, slots, attributes, required_attributes):
+        self.order = {}
+        for i, slot in enumerate(slots):
+            for name in slot:
+                self.order.setdefault(name, i)
+        self.children = frozenset(self.order)
+        self.attributes = frozenset(attributes)
+        self.required_attributes = frozenset(required_attributes)
+
+    def __repr__(self):
+        return f'<ContentModel(children={sorted(self.children)})>'
+
+
+def compile_content_models(fname):
+    """ Compile the global elements of an XSD schema file into a dict from element name to :class:`ContentModel`.
+    Only the subset of XSD used by the Akoma Ntoso schema is supported.
+    """
+    root = etree.parse(fname).getroot()
+    defs = {
+        kind: {node.get('name'): node for node in root.iterchildren(f'{{{XSD_NAMESPACE}}}{kind}')}
+        for kind in ['element', 'complexType', 'group', 'attributeGroup']
+    }
+    types = {}
+
+    def localname(node):
+        return node.tag.split('}', 1)[-1]
+
+    def repeats(node):
+        return node.get('maxOccurs', '1') != '1'
+
+    def particle_slots(node):
+        # returns a list of sets of element names, in the order in which they must appear
+        kind = localname(node)
+        if kind == 'element':
+            return [{node.get('ref') or node.get('name')}]
+
+        if kind == 'group':
+            slots = []
+            for child in defs['group'][node.get('ref')].iterchildren(etree.Element):
+                slots.extend(particle_slots(child))
+        elif kind == 'sequence':
+            slots = []
+            for child in node.iterchildren(etree.Element):
+                slots.extend(particle_slots(child))
+        elif kind == 'choice':
+            # merge alternatives position by position
+            slots = []
+            for child in node.iterchildren(etree.Element):
+                for i, slot in enumerate(particle_slots(child)):
+                    if i < len(slots):
+                        slots[i] |= slot
+                    else:
+                        slots.append(set(slot))
+        else:
+            return []
+
+        if repeats(node) and len(slots) > 1:
+            # a repeated sequence or choice doesn't impose an order on its children
+            slots = [set().union(*slots)]
+        return slots
+
+    def attribute_names(node, attribs, required):
+        for child in node.iterchildren(f'{{{XSD_NAMESPACE}}}attribute', f'{{{XSD_NAMESPACE}}}attributeGroup'):
+            if localname(child) == 'attributeGroup':
+                attribute_names(defs['attributeGroup'][child.get('ref')], attribs, required)
+            else:
+                name = child.get('name') or child.get('ref')
+                if name.startswith('xml:'):
+                    name = f'{{{XML_NAMESPACE}}}{name[4:]}'
+                attribs.add(name)
+                if child.get('use') == 'required':
+                    required.add(name)
+
+    def compile_type(node):
+        slots, attribs, required = [], set(), set()
+
+        for child in node.iterchildren(etree.Element):
+            kind = localname(child)
+            if kind in ['complexContent', 'simpleContent']:
+                derivation = next(child.iterchildren(etree.Element))
+                base = defs['complexType'].get(derivation.get('base'))
+                if base is not None:
+                    base_slots, base_attribs, base_required = named_type(derivation.get('base'))
+                    if localname(derivation) == 'extension':
+                        slots.extend(base_slots)
+                    attribs |= base_attribs
+                    required |= base_required
+                derived_slots, derived_attribs, derived_required = compile_type(derivation)
+                slots.extend(derived_slots)
+                attribs |= derived_attribs
+                required |= derived_required
+            elif kind in ['element', 'group', 'sequence', 'choice']:
+                slots.extend(particle_slots(child))
+
+        attribute_names(node, attribs, required)
+        return slots, attribs, required
+
+    def named_type(name):
+        if name not in types:
+            types[name] = compile_type(defs['complexType'][name])
+        return types[name]
+
+    models = {}
+    for name, node in defs['element'].items():
+        if node.get('type') in defs['complexType']:
+            compiled = named_type(node.get('type'))
+        else:
+            inline = node.find(f'{{{XSD_NAMESPACE}}}complexType')
+            compiled = compile_type(inline) if inline is not None else ([], set(), set())
+        models[name] = ContentModel(*compiled)
+
+    return models
+
+
+def get_content_models(namespace):
+    """ Get the compiled content models for the schema for a namespace, as a dict from element name to
+    :class:`ContentModel`. The schema is compiled the first time this is called.
+    """
+    if namespace not in _content_models:
+        fname = os.path.join(os.path.dirname(__file__), 'xsd', SCHEMAS[namespace])
+        _content_models[namespace] = compile_content_models(fname)
+    return _content_models[namespace]
+
+
+class FragmentError:
+    """ A validation error found by :func:`validate_fragment`.
+
+    :ivar message: the error message from the schema validator
+    :ivar path: XPath of the element with the error, relative to the root of the original document
+    :ivar element: the element in the original document with the error, if it can be found
+    """
+    def __init__(self, message, path, element=None):
+        self.message = message
+        self.path = path
+        self.element = element
+
+    def __repr__(self):
+        return f'<FragmentError({self.path}: {self.message})>'
+
+
+def validate_fragment(akn_doc, element, strict=False):
+    """ Validate only the subtree `element` of this AKN document, rather than the whole document.
+    This is much faster than :func:`validate` for small changes to large documents.
+
+    If `element` is a document, component or attachment, it is validated as a standalone document. Otherwise,
+    the closest ancestor-or-self of `element` that can be validated as a portion (such as a section or chapter)
+    is wrapped in a minimal portion document and validated.
+
+    Returns a (validates, errors) tuple, where `errors` is a list of :class:`FragmentError` objects with paths
+    that refer to the original document.
+    """
+    from .akn import AKN_NAMESPACES, datestring, get_maker
+    from .portion import Portion
+
+    ns = akn_doc.namespace
+    version = {v: k for k, v in AKN_NAMESPACES.items()}[ns]
+    maker = get_maker(version)
+
+    # find the closest element that can be validated on its own
+    node = element
+    while node is not None:
+        name = etree.QName(node).localname
+        if name in ['attachment', 'component']:
+            document = next(node.iterchildren(*(f'{{{ns}}}{t}' for t in AkomaNtoso30.document_elements)), None)
+            if document is None:
+                path = akn_doc.root.getroottree().getpath(node)
+                return False, [FragmentError(f'{name} has no document element', path, node)]
+            node = document
+            name = etree.QName(node).localname
+        if name in AkomaNtoso30.document_elements or name in AkomaNtoso30.portion_body_elements:
+            break
+        node = node.getparent()
+
+    if node is None or node.getparent() is None:
+        # we're validating the entire document
+        node = akn_doc.main
+        name = etree.QName(node).localname
+
+    fragment = deepcopy(node)
+    fragment.tail = None
+
+    if name in AkomaNtoso30.document_elements:
+        skeleton = maker.akomaNtoso(fragment)
+    else:
+        frbr_uri = akn_doc.expression_frbr_uri()
+        # the skeleton must always be valid, even if the original work date is only a year
+        frbr_uri.date = datestring(akn_doc.work_date)
+        frbr_uri.doctype = Portion.document_type
+        skeleton = maker.akomaNtoso(
+            maker.portion(
+                Portion.empty_meta(frbr_uri, maker=maker, for_root=True),
+                maker.portionBody(fragment),
+                includedIn=f'#{Portion.source[1]}',
+            )
+        )
+
+    validates, log = validate_xml(skeleton, get_schema(ns, strict))
+
+    # map error paths in the skeleton to paths in the original document
+    tree = akn_doc.root.getroottree()
+    prefix = skeleton.getroottree().getpath(fragment)
+    original = tree.getpath(node)
+    errors = []
+    for entry in log:
+        path = entry.path or ''
+        if path == prefix or path.startswith(prefix + '/'):
+            path = original + path[len(prefix):]
+        else:
+            # errors outside the fragment, such as uniqueness constraints, are attributed to the fragment itself
+            path = original
+        found = tree.xpath(path)
+        errors.append(FragmentError(entry.message, path, found[0] if found else None))
+
+    return validates, errors
+
+
+class IntegrityIssue:
+    """ A problem found by :func:`check_integrity`.
+
+    :ivar code: short machine-readable code for the type of problem (eg. ``duplicate-eid``)
+    :ivar message: human-readable description of the problem
+    :ivar element: the :class:`lxml.etree.Element` with the problem
+    """
+    DUPLICATE_EID = 'duplicate-eid'
+    DANGLING_SOURCE = 'dangling-source'
+    MISSING_FRBRTHIS = 'missing-frbrthis'
+
+    def __init__(self, code, message, element=None):
+        self.code = code
+        self.message = message
+        self.element = element
+
+    def __repr__(self):
+        return f'<IntegrityIssue({self.code}: {self.message})>'
+
+
+def check_integrity(akn_doc):
+    """ Cheaply check an AKN document for common integrity problems that the lenient schema doesn't catch:
+
+    * duplicate eId attributes (each component of a collection has eIds of its own)
+    * eventRef elements whose `source` doesn't refer to an element in a references block
+    * components (including the main document) without an FRBRWork/FRBRthis value
+
+    This only visits the elements it needs to and is much faster than validating against the schema
+    (see ``benchmarks/integrity.py``).
+
+    Returns a list of :class:`IntegrityIssue` objects, which is empty if there are no problems.
+    """
+    ns = akn_doc.namespace
+    component_tag = f'{{{ns}}}component'
+    references_tag = f'{{{ns}}}references'
+    event_ref_tag = f'{{{ns}}}eventRef'
+    meta_tag = f'{{{ns}}}meta'
+    frbrthis_path = f'./{{{ns}}}identification/{{{ns}}}FRBRWork/{{{ns}}}FRBRthis'
+    root = akn_doc.root
+
+    issues = []
+
+    # each component of a collection is a document of its own, with eIds of its own
+    components = list(root.iter(component_tag))
+    containers = {parent for component in components for parent in component.iterancestors()}
+    for scope in [root] + components:
+        eids = _scope_eids(scope, component_tag, containers)
+        if len(set(eids)) == len(eids):
+            continue
+
+        for eid, count in Counter(eids).items():
+            if count > 1:
+                found = [elem for elem in scope.xpath('.//*[@eId = $eid]', eid=eid)
+                         if next(elem.iterancestors(component_tag), root) is scope]
+                issues.append(IntegrityIssue(IntegrityIssue.DUPLICATE_EID, f'Duplicate eId: {eid}', found[1]))
+
+    # component element -> eIds of its references; an eventRef can only refer to its own component's references
+    reference_ids = {}
+    # (component element, eventRef element)
+    event_refs = []
+    component = akn_doc.main
+
+    for elem in root.iter(references_tag, event_ref_tag, meta_tag):
+        tag = elem.tag
+        if tag == references_tag:
+            reference_ids.setdefault(component, set()).update(
+                ref.get('eId') for ref in elem.iterchildren(etree.Element))
+        elif tag == event_ref_tag:
+            event_refs.append((component, elem))
+        else:
+            # the meta of a component comes before anything else in it
+            component = elem.getparent()
+            frbrthis = elem.find(frbrthis_path)
+            if frbrthis is None or not frbrthis.get('value'):
+                issues.append(IntegrityIssue(IntegrityIssue.MISSING_FRBRTHIS,
+                                             f'Component {component.tag.split("}", 1)[-1]} has no FRBRthis',
+                                             component))
+
+    for component, elem in event_refs:
+        source = elem.get('source') or ''
+        if not source.startswith('#') or source[1:] not in reference_ids.get(component, ()):
+            issues.append(IntegrityIssue(IntegrityIssue.DANGLING_SOURCE,
+                                         f'eventRef {elem.get("eId")} has a dangling source: {source}', elem))
+
+    return issues
+
+
+def _scope_eids(elem, component_tag, containers):
+    """ The eIds of the descendants of `elem`, excluding those inside components. `containers` are the elements that
+    have components inside them. Only they are walked, so as not to build an element for each eId.
+    """
+    if elem not in containers:
+        return elem.xpath('.//*/@eId', smart_strings=False)
+
+    eids = []
+    for child in elem.iterchildren(etree.Element):
+        if child.get('eId') is not None:
+            eids.append(child.get('eId'))
+        if child.tag != component_tag:
+            eids.extend(_scope_eids(child, component_tag, containers))
+    return eids
+
+
 class AkomaNtoso30:
     """ Information on various elements of the Akoma Ntoso 3.0 schema.
     """
 
+    namespace = 'http://docs.oasis-open.org/legaldocml/ns/akn/3.0'
+
     hier_elements = [
         'alinea', 'article', 'book', 'chapter', 'clause', 'division', 'indent', 'level', 'list', 'paragraph', 'part',
         'point', 'proviso', 'rule', 'section', 'subchapter', 'subclause', 'subdivision', 'sublist', 'subparagraph',
         'subpart', 'subrule', 'subsection', 'subtitle', 'title', 'tome', 'transitional'
     ]
     """ Hierarchical elements """
+
+    document_elements = [
+        'amendmentList', 'officialGazette', 'documentCollection', 'act', 'bill', 'debateReport', 'debate',
+        'statement', 'amendment', 'judgment', 'portion', 'doc'
+    ]
+    """ Document elements that can be the root of a document or component """
+
+    portion_body_elements = hier_elements + [
+        'address', 'adjournment', 'administrationOfOath', 'answer', 'citation', 'citations', 'communication',
+        'container', 'coverPage', 'debateSection', 'declarationOfVote', 'div', 'formula', 'hcontainer', 'longTitle',
+        'ministerialStatements', 'narrative', 'nationalInterest', 'noticesOfMotion', 'oralStatements', 'other',
+        'papers', 'personalStatements', 'petitions', 'pointOfOrder', 'prayers', 'preamble', 'preface',
+        'proceduralMotions', 'question', 'questions', 'recital', 'recitals', 'resolutions', 'rollCall', 'scene',
+        'speech', 'speechGroup', 'summary', 'writtenStatements'
+    ]
+    """ Elements that can be the content of a portion """
+
+    @classmethod
+    def content_model(cls, name):
+        """ The compiled :class:`ContentModel` for an element, or None if the element isn't in the schema.
+        """
+        return get_content_models(cls.namespace).get(name)
+
+    @classmethod
+    def insertion_point(cls, parent, name):
+        """ Find the existing child of `parent` after which a new child element called `name` must be placed, according
+        to the order of children required by the schema. Returns None if the new element must be the first child.
+        """
+        # don't use len() or iteration directly on parent, because objectify changes their meaning
+        children = parent.getchildren()
+        model = cls.content_model(parent.tag.split('}', 1)[-1])
+        if model is None or name not in model.order:
+            # unknown, add it at the end
+            return children[-1] if children else None
+
+        position = model.order[name]
+        for child in reversed(children):
+            if isinstance(child.tag, str) and model.order.get(child.tag.split('}', 1)[-1], -1) <= position:
+                return child
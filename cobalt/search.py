@@ -0,0 +1,310 @@
+"""
+A simple on-disk full-text index of Akoma Ntoso documents, for sites that don't need a search server.
+
+Text is indexed in units of a hierarchical element (as given by :meth:`cobalt.akn.StructuredDocument.text_chunks`),
+identified by the expression FRBR URI, component name and eId.
+
+The index is a directory of immutable segments and a manifest. Each call to :meth:`SearchIndex.add` writes a new
+segment, and removing an expression marks its units as deleted. :meth:`SearchIndex.merge` combines all the segments
+into one and discards deleted units. The postings of each segment are memory-mapped, so that only the postings of the
+terms in a query are read.
+"""
+import json
+import math
+import mmap
+import os
+import re
+from array import array
+
+from .uri import FrbrUri
+
+TOKEN_RE = re.compile(r'\w+')
+PHRASE_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text):
+    """ Split text into a list of lowercase terms.
+    """
+    return TOKEN_RE.findall(text.lower())
+
+
+def _expression_uri(frbr_uri):
+    if isinstance(frbr_uri, FrbrUri):
+        return frbr_uri.expression_uri()
+    return frbr_uri
+
+
+class SearchHit:
+    """ A unit of text that matches a query.
+
+    :ivar frbr_uri: expression FRBR URI of the document
+    :ivar component: name of the component
+    :ivar eid: eId of the element, or None for text in a component that isn't in a hierarchical element
+    :ivar score: relevance score; higher is more relevant
+    """
+    __slots__ = ('frbr_uri', 'component', 'eid', 'score')
+
+    def __init__(self, frbr_uri, component, eid, score):
+        self.frbr_uri = frbr_uri
+        self.component = component
+        self.eid = eid
+        self.score = score
+
+    def __repr__(self):
+        return f'<SearchHit {self.frbr_uri} {self.component} {self.eid} {self.score:.3f}>'
+
+
+class Segment:
+    """ An immutable part of a search index.
+
+    The postings file is an array of unsigned ints. The postings of a term are a sequence of
+    `unit, n, position * n` entries, where `unit` is an index into the units of the segment.
+    """
+    def __init__(self, path, name):
+        self.name = name
+        with open(os.path.join(path, f'{name}.json')) as f:
+            info = json.load(f)
+        # list of [expression uri, component, eId, length]
+        self.units = info['units']
+        # term -> [offset, number of units]
+        self.terms = info['terms']
+
+        self.file = open(os.path.join(path, f'{name}.postings'), 'rb')
+        self.mmap = None
+        self.postings = memoryview(b'').cast('I')
+        if os.fstat(self.file.fileno()).st_size:
+            self.mmap = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.postings = memoryview(self.mmap).cast('I')
+
+    def close(self):
+        self.postings.release()
+        if self.mmap is not None:
+            self.mmap.close()
+        self.file.close()
+
+    def read(self, term):
+        """ Read the postings for a term, as a dict from unit to list of positions.
+        """
+        result = {}
+        if term in self.terms:
+            offset, count = self.terms[term]
+            postings = self.postings
+            for _ in range(count):
+                unit, n = postings[offset], postings[offset + 1]
+                result[unit] = postings[offset + 2:offset + 2 + n].tolist()
+                offset += 2 + n
+        return result
+
+    @classmethod
+    def write(cls, path, name, units):
+        """ Write a new segment from a list of `(expression uri, component, eId, terms)` tuples.
+        """
+        index = {}
+        info = []
+        for unit, (frbr_uri, component, eid, terms) in enumerate(units):
+            info.append([frbr_uri, component, eid, len(terms)])
+            for position, term in enumerate(terms):
+                index.setdefault(term, {}).setdefault(unit, []).append(position)
+
+        postings = array('I')
+        offsets = {}
+        for term in sorted(index):
+            offsets[term] = [len(postings), len(index[term])]
+            for unit, positions in index[term].items():
+                postings.append(unit)
+                postings.append(len(positions))
+                postings.extend(positions)
+
+        with open(os.path.join(path, f'{name}.postings'), 'wb') as f:
+            postings.tofile(f)
+        with open(os.path.join(path, f'{name}.json'), 'w') as f:
+            json.dump({'units': info, 'terms': offsets}, f)
+
+        return cls(path, name)
+
+
+class SearchIndex:
+    """ A full-text index stored in a directory, which is created if necessary.
+
+        >>> with SearchIndex('index') as index:
+        ...     index.add(act)
+        ...     hits = index.search('"animal health" vaccine')
+
+    :ivar path: directory of the index
+    """
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+
+        manifest = os.path.join(path, 'manifest.json')
+        if os.path.exists(manifest):
+            with open(manifest) as f:
+                self.manifest = json.load(f)
+        else:
+            # segments: names of the segments
+            # expressions: expression uri -> segment
+            # deleted: segment -> deleted units
+            # units, length: number of live units and the total length of their text
+            self.manifest = {'next': 0, 'segments': [], 'expressions': {}, 'deleted': {}, 'units': 0, 'length': 0}
+
+        self.segments = {name: Segment(path, name) for name in self.manifest['segments']}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __contains__(self, frbr_uri):
+        return _expression_uri(frbr_uri) in self.manifest['expressions']
+
+    def close(self):
+        for segment in self.segments.values():
+            segment.close()
+        self.segments = {}
+
+    def expressions(self):
+        """ Expression FRBR URIs of the documents in the index.
+        """
+        return list(self.manifest['expressions'])
+
+    def add(self, document):
+        """ Add a document to the index, replacing it if it's already in the index.
+        """
+        self.add_many([document])
+
+    def add_many(self, documents):
+        """ Add documents to the index in a single new segment, replacing any that are already in the index.
+        If several documents are the same expression, only the last of them is added.
+        """
+        latest = {document.expression_frbr_uri().expression_uri(): document for document in documents}
+        units = []
+        for frbr_uri, document in latest.items():
+            self._remove(frbr_uri)
+            units.extend((frbr_uri, component, eid, tokenize(text))
+                         for component, eid, text in document.text_chunks())
+        self._add_segment(units)
+        self._save()
+
+    def remove(self, frbr_uri):
+        """ Remove an expression from the index. Returns True if it was in the index.
+        """
+        removed = self._remove(_expression_uri(frbr_uri))
+        self._save()
+        return removed
+
+    def merge(self):
+        """ Combine all segments into a single segment, without deleted units.
+        """
+        units = []
+        for segment in self.segments.values():
+            deleted = set(self.manifest['deleted'].get(segment.name, []))
+            # rebuild the terms of each unit from the postings
+            terms = [[None] * unit[3] for unit in segment.units]
+            for term in segment.terms:
+                for unit, positions in segment.read(term).items():
+                    if unit not in deleted:
+                        for position in positions:
+                            terms[unit][position] = term
+            units.extend((frbr_uri, component, eid, terms[i])
+                         for i, (frbr_uri, component, eid, _) in enumerate(segment.units) if i not in deleted)
+
+        old = list(self.segments.values())
+        self.segments = {}
+        self.manifest.update(segments=[], expressions={}, deleted={}, units=0, length=0)
+        self._add_segment(units)
+        self._save()
+
+        for segment in old:
+            segment.close()
+            for ext in ['json', 'postings']:
+                os.unlink(os.path.join(self.path, f'{segment.name}.{ext}'))
+
+    def search(self, query, limit=10):
+        """ Find the units of text that contain all the terms of a query, most relevant first. Double-quoted phrases
+        in the query must match exactly. Returns a list of at most `limit` :class:`SearchHit` objects.
+        """
+        phrases = [tokenize(phrase or word) for phrase, word in PHRASE_RE.findall(query)]
+        phrases = [p for p in phrases if p]
+        terms = sorted({term for phrase in phrases for term in phrase})
+        if not terms:
+            return []
+
+        # (segment, {term: {unit: positions}}) for segments with units that match all terms
+        matches = []
+        df = dict.fromkeys(terms, 0)
+        for segment in self.segments.values():
+            deleted = set(self.manifest['deleted'].get(segment.name, []))
+            postings = {}
+            for term in terms:
+                postings[term] = {u: p for u, p in segment.read(term).items() if u not in deleted}
+                df[term] += len(postings[term])
+
+            units = set.intersection(*(set(p) for p in postings.values()))
+            units = {u for u in units if all(self._has_phrase(postings, phrase, u) for phrase in phrases)}
+            if units:
+                matches.append((segment, postings, units))
+
+        count = self.manifest['units']
+        avg_length = self.manifest['length'] / count if count else 0
+        idf = {term: math.log(1 + (count - n + 0.5) / (n + 0.5)) for term, n in df.items()}
+
+        hits = []
+        for segment, postings, units in matches:
+            for unit in units:
+                frbr_uri, component, eid, length = segment.units[unit]
+                norm = K1 * (1 - B + B * length / avg_length)
+                score = 0
+                for term in terms:
+                    tf = len(postings[term][unit])
+                    score += idf[term] * tf * (K1 + 1) / (tf + norm)
+                hits.append(SearchHit(frbr_uri, component, eid, score))
+
+        hits.sort(key=lambda h: (-h.score, h.frbr_uri, h.component or '', h.eid or ''))
+        return hits[:limit]
+
+    def _has_phrase(self, postings, phrase, unit):
+        if len(phrase) == 1:
+            return True
+        starts = set(postings[phrase[0]][unit])
+        for i, term in enumerate(phrase[1:], 1):
+            starts &= {p - i for p in postings[term][unit]}
+        return bool(starts)
+
+    def _add_segment(self, units):
+        if not units:
+            return
+
+        name = f'seg{self.manifest["next"]}'
+        self.manifest['next'] += 1
+        segment = Segment.write(self.path, name, units)
+        self.segments[name] = segment
+        self.manifest['segments'].append(name)
+        for frbr_uri, _, _, terms in units:
+            self.manifest['expressions'][frbr_uri] = name
+            self.manifest['units'] += 1
+            self.manifest['length'] += len(terms)
+
+    def _remove(self, frbr_uri):
+        name = self.manifest['expressions'].pop(frbr_uri, None)
+        if name is None:
+            return False
+
+        deleted = self.manifest['deleted'].setdefault(name, [])
+        for i, unit in enumerate(self.segments[name].units):
+            if unit[0] == frbr_uri:
+                deleted.append(i)
+                self.manifest['units'] -= 1
+                self.manifest['length'] -= unit[3]
+        return True
+
+    def _save(self):
+        # write the manifest atomically, so that the index is never left in an inconsistent state
+        fname = os.path.join(self.path, 'manifest.json')
+        with open(fname + '.tmp', 'w') as f:
+            json.dump(self.manifest, f)
+        os.replace(fname + '.tmp', fname)
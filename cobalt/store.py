@@ -0,0 +1,250 @@
+"""
+An on-disk store of Akoma Ntoso documents.
+
+Documents are stored as XML files in a content-addressed blob store, and the details of each document are kept in
+a sqlite database, so that documents can be found without parsing any XML.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+
+from .akn import StructuredDocument, datestring
+from .uri import FrbrUri
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    expression_uri TEXT PRIMARY KEY,
+    work_uri TEXT NOT NULL,
+    prefix TEXT,
+    country TEXT,
+    locality TEXT,
+    doctype TEXT,
+    subtype TEXT,
+    actor TEXT,
+    date TEXT,
+    number TEXT,
+    language TEXT,
+    expression_date TEXT,
+    document_type TEXT,
+    title TEXT,
+    components TEXT,
+    blob TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS documents_work ON documents (work_uri, expression_date);
+CREATE INDEX IF NOT EXISTS documents_blob ON documents (blob);
+CREATE INDEX IF NOT EXISTS documents_place ON documents (country, locality, doctype, subtype);
+CREATE INDEX IF NOT EXISTS documents_number ON documents (number);
+"""
+
+# columns that can be used to find documents
+FIELDS = [
+    'expression_uri', 'work_uri', 'prefix', 'country', 'locality', 'doctype', 'subtype', 'actor', 'date', 'number',
+    'language', 'expression_date', 'document_type', 'title',
+]
+
+
+def _metadata(row):
+    info = dict(row)
+    info['components'] = json.loads(info['components'])
+    return info
+
+
+class DocumentStore:
+    """ A store of documents in a directory, which is created if necessary.
+
+    Documents are identified by their expression FRBR URI (without a work component), and can also be retrieved by
+    work FRBR URI. Details of documents are returned as dicts with the columns in :data:`FIELDS`, plus the names of
+    the document's components.
+
+        >>> store = DocumentStore('documents')
+        >>> store.put_many(acts)
+        >>> store.find(country='za', doctype='act', language='eng')
+        >>> act = store.get('/akn/za/act/2009/1')
+
+    :ivar path: directory of the store
+    :ivar db: :class:`sqlite3.Connection` to the index
+    """
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.join(path, 'blobs'), exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(path, 'index.sqlite3'))
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return self.db.execute('SELECT COUNT(*) FROM documents').fetchone()[0]
+
+    def __contains__(self, frbr_uri):
+        return self.metadata(frbr_uri) is not None
+
+    def close(self):
+        self.db.close()
+
+    def put(self, document):
+        """ Add a document to the store, replacing an existing document with the same expression FRBR URI.
+        Returns the expression FRBR URI.
+        """
+        return self.put_many([document])[0]
+
+    def put_many(self, documents):
+        """ Add many documents to the store in a single transaction. Returns a list of expression FRBR URIs.
+        If several documents are the same expression, only the last of them is stored.
+        """
+        documents = list(documents)
+        uris = [document.expression_frbr_uri().expression_uri(work_component=False) for document in documents]
+        latest = dict(zip(uris, documents))
+
+        rows = []
+        for document in latest.values():
+            xml = document.to_xml()
+            blob = hashlib.sha256(xml).hexdigest()
+            self._write_blob(blob, xml)
+            rows.append(self._row(document, blob))
+
+        if rows:
+            with self.db:
+                replaced = self._blobs(list(latest))
+                self.db.executemany(
+                    f'INSERT OR REPLACE INTO documents ({", ".join(rows[0])}) VALUES ({", ".join("?" * len(rows[0]))})',
+                    [list(row.values()) for row in rows])
+            self._delete_blobs(replaced)
+
+        return uris
+
+    def delete(self, frbr_uri):
+        """ Remove an expression from the store. Returns True if it was in the store.
+        """
+        uri = self._uri(frbr_uri)
+        with self.db:
+            blobs = self._blobs([uri])
+            cursor = self.db.execute('DELETE FROM documents WHERE expression_uri = ?', [uri])
+        self._delete_blobs(blobs)
+        return cursor.rowcount > 0
+
+    def metadata(self, frbr_uri, language=None):
+        """ Get the details of a document, or None if it's not in the store.
+
+        If `frbr_uri` is a work URI (without an expression date), this is the latest expression of the work,
+        optionally in the given language.
+        """
+        uri = frbr_uri if isinstance(frbr_uri, FrbrUri) else FrbrUri.parse(frbr_uri)
+
+        if uri.expression_date is None:
+            sql = 'SELECT * FROM documents WHERE work_uri = ?'
+            params = [uri.work_uri(work_component=False)]
+            if language:
+                sql += ' AND language = ?'
+                params.append(language)
+            sql += ' ORDER BY expression_date DESC LIMIT 1'
+        else:
+            sql = 'SELECT * FROM documents WHERE expression_uri = ?'
+            params = [uri.expression_uri(work_component=False)]
+
+        row = self.db.execute(sql, params).fetchone()
+        return _metadata(row) if row else None
+
+    def get_xml(self, frbr_uri, language=None):
+        """ Get the XML of a document as bytes, or None if it's not in the store. See :meth:`metadata`.
+        """
+        info = self.metadata(frbr_uri, language)
+        if info:
+            with open(self._blob_path(info['blob']), 'rb') as f:
+                return f.read()
+
+    def get(self, frbr_uri, language=None):
+        """ Get a document as a :class:`cobalt.akn.StructuredDocument`, or None if it's not in the store.
+        See :meth:`metadata`.
+        """
+        info = self.metadata(frbr_uri, language)
+        if info:
+            with open(self._blob_path(info['blob']), 'rb') as f:
+                return StructuredDocument.for_document_type(info['document_type'])(f.read())
+
+    def expressions(self, work_uri):
+        """ Get the details of all expressions of a work, ordered by expression date.
+        """
+        uri = work_uri if isinstance(work_uri, FrbrUri) else FrbrUri.parse(work_uri)
+        rows = self.db.execute('SELECT * FROM documents WHERE work_uri = ? ORDER BY expression_date, language',
+                               [uri.work_uri(work_component=False)])
+        return [_metadata(row) for row in rows]
+
+    def find(self, **fields):
+        """ Get the details of the documents with the given values for fields in :data:`FIELDS`, ordered by
+        expression FRBR URI.
+        """
+        for field in fields:
+            if field not in FIELDS:
+                raise ValueError(f"Unknown field: {field}")
+
+        sql = 'SELECT * FROM documents'
+        if fields:
+            sql += ' WHERE ' + ' AND '.join(f'{f} IS ?' for f in fields)
+        rows = self.db.execute(sql + ' ORDER BY expression_uri', list(fields.values()))
+        return [_metadata(row) for row in rows]
+
+    def _uri(self, frbr_uri):
+        uri = frbr_uri if isinstance(frbr_uri, FrbrUri) else FrbrUri.parse(frbr_uri)
+        return uri.expression_uri(work_component=False)
+
+    def _row(self, document, blob):
+        uri = document.expression_frbr_uri()
+        return {
+            'expression_uri': uri.expression_uri(work_component=False),
+            'work_uri': uri.work_uri(work_component=False),
+            'prefix': uri.prefix,
+            'country': uri.country,
+            'locality': uri.locality,
+            'doctype': uri.doctype,
+            'subtype': uri.subtype,
+            'actor': uri.actor,
+            'date': uri.date,
+            'number': uri.number,
+            'language': uri.language,
+            'expression_date': datestring(document.expression_date),
+            'document_type': document.document_type,
+            'title': document.title,
+            'components': json.dumps(list(document.components())),
+            'blob': blob,
+        }
+
+    def _blob_path(self, blob):
+        return os.path.join(self.path, 'blobs', blob[:2], f'{blob}.xml')
+
+    def _write_blob(self, blob, xml):
+        fname = self._blob_path(blob)
+        if not os.path.exists(fname):
+            os.makedirs(os.path.dirname(fname), exist_ok=True)
+            # write atomically, so that a blob is never incomplete
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(fname))
+            with os.fdopen(fd, 'wb') as f:
+                f.write(xml)
+            os.replace(tmp, fname)
+
+    def _blobs(self, uris):
+        """ The blobs of the documents with the given expression URIs.
+        """
+        blobs = set()
+        for i in range(0, len(uris), 500):
+            batch = uris[i:i + 500]
+            rows = self.db.execute(
+                f'SELECT blob FROM documents WHERE expression_uri IN ({", ".join("?" * len(batch))})', batch)
+            blobs.update(row[0] for row in rows)
+        return blobs
+
+    def _delete_blobs(self, blobs):
+        """ Delete those of the given blobs that are no longer used by any documents.
+        """
+        for blob in blobs:
+            if not self.db.execute('SELECT 1 FROM documents WHERE blob = ? LIMIT 1', [blob]).fetchone():
+                try:
+                    os.unlink(self._blob_path(blob))
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,435 @@
+"""
+Tools for working with large Akoma Ntoso documents on disk, without loading the entire document into memory.
+"""
+import json
+from collections import OrderedDict
+from io import BytesIO
+from xml.parsers import expat
+
+from lxml import etree, objectify
+
+from .akn import (
+    COMPONENT_PARENTS, QUOTED_STRUCTURES, TEXT_EXCLUDE, StructuredDocument, TOCBuilder, _normalize, _text, objectify_parser,
+)
+from .schemas import AkomaNtoso30
+from .uri import FrbrUri
+
+
+# (parent, container) element names of the components returned by StructuredDocument.components()
+COMPONENT_CONTAINERS = [('attachments', 'attachment'), ('components', 'component'), ('collectionBody', 'component')]
+
+
+def _read(source, start=0, end=None):
+    """ Read bytes from source, which is either a filename or a bytes object.
+    """
+    if isinstance(source, bytes):
+        return source[start:end]
+    with open(source, 'rb') as f:
+        f.seek(start)
+        return f.read() if end is None else f.read(end - start)
+
+
+def _open(source):
+    """ Get something that can be passed to a parser: a filename, or a file-like object.
+    """
+    return BytesIO(source) if isinstance(source, bytes) else source
+
+
+def _objectify(elem, parser=objectify_parser):
+    """ Copy an element into a standalone objectified element.
+    """
+    return objectify.fromstring(etree.tostring(elem, with_tail=False), parser=parser)
+
+
+def _component_name(name):
+    """ Get a component name from a name, !name or FRBR URI string or object.
+    """
+    if isinstance(name, FrbrUri):
+        return name.work_component
+    if name.startswith('/'):
+        return FrbrUri.parse(name).work_component
+    return name.lstrip('!')
+
+
+def document_type(source):
+    """ Get the document type of a document, such as ``act``, which is the name of the first child of the root
+    element. Only the start of the document is read.
+
+    :param source: filename or bytes of the XML document
+    """
+    with open(source, 'rb') if not isinstance(source, bytes) else BytesIO(source) as f:
+        events = etree.iterparse(f, events=('start',))
+        next(events)
+        return etree.QName(next(events)[1]).localname
+
+
+class LazyDocument:
+    """ A large document (such as an :class:`cobalt.collection.OfficialGazette`) from which components are only
+    parsed when they are needed.
+
+    A single pass over the document records the byte offsets of each `<component>` and `<attachment>`, keyed by
+    work component name, in the same way as :meth:`cobalt.akn.StructuredDocument.components`. Calling
+    :meth:`get_component` then only parses that part of the file.
+
+    The index can be saved alongside the document with :meth:`save_index` and re-used with :meth:`load`, so that
+    the document doesn't need to be scanned again.
+
+    :ivar source: filename or bytes of the XML document
+    :ivar index: dict describing the locations of the components
+    """
+
+    def __init__(self, source, index=None):
+        self.source = source
+        self.index = index if index is not None else self.build_index(source)
+
+    @classmethod
+    def load(cls, source, index_file):
+        """ Create a lazy document for `source` using an index previously saved with :meth:`save_index`.
+        """
+        return cls(source, json.load(index_file))
+
+    def save_index(self, index_file):
+        """ Save the component index as JSON to a text file-like object.
+        """
+        json.dump(self.index, index_file)
+
+    @property
+    def document_type(self):
+        return self.index['document_type']
+
+    def component_names(self):
+        """ Names of the components in this document, including the main document.
+        """
+        return [self.index['main']] + list(self.index['components'])
+
+    def get_component(self, name):
+        """ Parse a single component as its own :class:`cobalt.akn.StructuredDocument`. The main component is
+        the entire document.
+
+        :param name: work component name (eg. ``schedule1`` or ``!schedule1``), or an FRBR URI (string or
+                     :class:`cobalt.uri.FrbrUri`) with a work component
+        :raises KeyError: if the component doesn't exist
+        """
+        name = _component_name(name)
+
+        if name == self.index['main']:
+            xml = _read(self.source)
+            return StructuredDocument.for_document_type(self.document_type)(xml)
+
+        start, end, document_type, *namespaces = self.index['components'][name]
+        # indexes saved by older versions have one list of namespaces for all components
+        namespaces = namespaces[0] if namespaces else self.index['namespaces']
+
+        # wrap the component in a root element that declares the namespaces used by its own ancestors, which can
+        # use the same prefixes as other components for different namespaces
+        nsmap = ''.join(f' xmlns:{prefix}="{uri}"' if prefix else f' xmlns="{uri}"' for prefix, uri in namespaces)
+        root = self.index['root']
+        encoding = self.index['encoding']
+        xml = b''.join([
+            f'<?xml version="1.0" encoding="{encoding}"?><{root}{nsmap}>'.encode(encoding),
+            _read(self.source, start, end),
+            f'</{root}>'.encode(encoding),
+        ])
+        return StructuredDocument.for_document_type(document_type)(xml)
+
+    @classmethod
+    def build_index(cls, source):
+        """ Build a component index for a document, without building the XML tree.
+        """
+        parser = expat.ParserCreate(namespace_separator=' ')
+        index = {
+            'encoding': 'utf-8',
+            'root': None,
+            'document_type': None,
+            'main': None,
+            'components': OrderedDict(),
+        }
+        # stack of local element names, and of the namespace declarations of each element. Declarations are
+        # reported before the element they belong to starts, so declarations[0] holds those of the root element.
+        path = []
+        declarations = [[]]
+        current = {}
+
+        def xml_decl(version, encoding, standalone):
+            if encoding:
+                index['encoding'] = encoding
+
+        def start_ns(prefix, uri):
+            declarations[-1].append((prefix, uri))
+
+        def start(name, attrs):
+            local = name.rsplit(' ', 1)[-1]
+            path.append(local)
+            declarations.append([])
+            depth = len(path)
+
+            if depth == 1:
+                # use the same prefix as the original root element
+                ns = name.rsplit(' ', 1)[0]
+                prefix = next((p for p, uri in declarations[0] if uri == ns and p), None)
+                index['root'] = f'{prefix}:{local}' if prefix else local
+            elif depth == 2:
+                index['document_type'] = local
+            elif _is_component(path) and depth == 5:
+                # the document element of a component, such as <doc>
+                current.update(start=parser.CurrentByteIndex, document_type=local)
+                # namespaces declared by ancestors, with inner declarations overriding outer ones
+                nsmap = OrderedDict()
+                for decls in declarations[:-2]:
+                    nsmap.update(decls)
+                current['namespaces'] = [list(ns) for ns in nsmap.items()]
+
+            if local == 'FRBRthis' and path[-4:-1] == ['meta', 'identification', 'FRBRWork']:
+                component = FrbrUri.parse(attrs['value']).work_component
+                if depth == 6:
+                    index['main'] = component
+                elif depth == 9 and 'start' in current:
+                    current['name'] = component
+
+        def end(name):
+            if len(path) == 4 and current:
+                # end of the container, such as </attachment>
+                if 'name' in current:
+                    index['components'][current['name']] = [current['start'], parser.CurrentByteIndex,
+                                                            current['document_type'], current['namespaces']]
+                current.clear()
+            path.pop()
+            declarations.pop()
+
+        parser.XmlDeclHandler = xml_decl
+        parser.StartNamespaceDeclHandler = start_ns
+        parser.StartElementHandler = start
+        parser.EndElementHandler = end
+
+        if isinstance(source, bytes):
+            parser.Parse(source, True)
+        else:
+            with open(source, 'rb') as f:
+                parser.ParseFile(f)
+
+        return index
+
+
+def _is_component(path):
+    """ Is the element at the end of this path of local names the document element of a component?
+    """
+    return len(path) == 2 or (
+        len(path) == 5 and (path[2], path[3]) in COMPONENT_CONTAINERS and path[4] in AkomaNtoso30.document_elements
+    )
+
+
+def extract_portion(source, eid_or_range, component=None, parser=objectify_parser):
+    """ Extract a single portion of a document without loading the entire document, in the same way as
+    :meth:`cobalt.akn.StructuredDocument.get_portion_element`. Parsing stops as soon as the portion has been read,
+    and elements that have already been parsed are discarded, so that memory use is bounded by the size of the
+    portion rather than that of the document.
+
+    Returns an `(element, meta)` tuple, where `meta` is the `<meta>` element of the component that contains the
+    portion. Both are standalone :class:`lxml.objectify.ObjectifiedElement` objects. Returns `(None, None)` if the
+    portion doesn't exist.
+
+    :param source: filename, file-like object or bytes of the XML document
+    :param eid_or_range: eId of the portion (eg. ``chp_2``), a portion name without an eId (eg. ``preamble``), or a
+                         range of sibling portions (eg. ``chp_1->chp_3``), in which case `element` is a list of
+                         the elements in the range
+    :param component: optional name of the component (eg. ``schedule1`` or ``!schedule1``) or FRBR URI with a work
+                      component, to look for the portion in
+    :param parser: the objectify parser for the elements that are returned. An lxml parser can only parse one
+                   document at a time, so threads must each use their own.
+    """
+    first, _, last = eid_or_range.replace('"', '').partition('->')
+    if component is not None:
+        component = _component_name(component)
+
+    def matches(elem, target):
+        if target in StructuredDocument.non_eid_portions:
+            return elem.tag.rsplit('}', 1)[-1] == target
+        return elem.get('eId') == target
+
+    # local names of the open elements
+    path = []
+    # [name, meta] of the components we're in, innermost last; both are None until the component's meta has been read
+    components = []
+    # the meta element being read, and the portion's elements
+    meta = None
+    found = []
+
+    for event, elem in etree.iterparse(_open(source), events=('start', 'end')):
+        if event == 'start':
+            path.append(elem.tag.rsplit('}', 1)[-1])
+
+            if _is_component(path):
+                components.append([None, None])
+            elif path[-1] == 'meta' and _is_component(path[:-1]):
+                meta = elem
+            elif not found and meta is None and components and component in (None, components[-1][0]) \
+                    and matches(elem, first):
+                found.append(elem)
+            continue
+
+        if found:
+            if not last:
+                if elem is found[0]:
+                    return _objectify(elem, parser), components[-1][1]
+            elif elem.getparent() is found[0].getparent():
+                # the portions in a range are siblings
+                if elem is not found[0]:
+                    found.append(elem)
+                if matches(elem, last):
+                    return [_objectify(e, parser) for e in found], components[-1][1]
+            elif elem is found[0].getparent():
+                # the range has no end
+                break
+
+        elif elem is meta:
+            frbr_this = elem.find('./{*}identification/{*}FRBRWork/{*}FRBRthis')
+            if frbr_this is not None:
+                components[-1][0] = FrbrUri.parse(frbr_this.get('value')).work_component
+            components[-1][1] = _objectify(elem, parser)
+            meta = None
+
+        if _is_component(path):
+            components.pop()
+        path.pop()
+
+        if not found and meta is None:
+            # discard everything that has already been parsed
+            elem.clear(keep_tail=True)
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+    return None, None
+
+
+def _iter_components(source):
+    """ Parse a document incrementally, yielding `(event, element, root)` tuples for the `start` and `end` of each
+    element in the components of the document, other than their `<meta>` elements. `root` is the document element of
+    the component (such as `<doc>`), which starts and ends each component.
+
+    Once a component's meta has been read, a `('component', name, root)` tuple is yielded, where `name` is the work
+    component name. Metas and components are discarded once they've been read.
+    """
+    path = []
+    # document elements of the components we're in
+    components = []
+    meta = None
+
+    for event, elem in etree.iterparse(_open(source), events=('start', 'end')):
+        if event == 'start':
+            path.append(elem.tag.rsplit('}', 1)[-1])
+            if _is_component(path):
+                components.append(elem)
+            elif meta is None and path[-1] == 'meta' and _is_component(path[:-1]):
+                meta = elem
+
+            if meta is None and components:
+                yield event, elem, components[-1]
+            continue
+
+        if elem is meta:
+            frbr_this = elem.find('./{*}identification/{*}FRBRWork/{*}FRBRthis')
+            name = FrbrUri.parse(frbr_this.get('value')).work_component if frbr_this is not None else None
+            meta = None
+            elem.clear(keep_tail=True)
+            yield 'component', name, components[-1]
+
+        elif meta is None and components:
+            yield event, elem, components[-1]
+
+        if components and elem is components[-1]:
+            components.pop()
+            elem.clear(keep_tail=True)
+        path.pop()
+
+
+def toc_from_file(source):
+    """ Build the table of contents of a document without loading the entire document, in the same way as
+    :meth:`cobalt.akn.StructuredDocument.toc`. Each hierarchical element is discarded once it has been read, so
+    memory use is bounded by the depth of the document rather than its size.
+
+    :param source: filename, file-like object or bytes of the XML document
+    """
+    toc = OrderedDict()
+    # component document element -> builder
+    builders = {}
+
+    for event, elem, root in _iter_components(source):
+        if event == 'component':
+            toc[elem] = builders[root].entries
+            continue
+
+        if elem is root:
+            if event == 'start':
+                builders[root] = TOCBuilder(etree.QName(root).namespace)
+            else:
+                del builders[root]
+            continue
+
+        builder = builders[root]
+        if event == 'start':
+            builder.start(elem)
+        else:
+            builder.end(elem)
+            if elem.tag in builder.hier and not builder.skipping:
+                # discard the element and its earlier siblings, which have all been read
+                elem.clear(keep_tail=True)
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+
+    return toc
+
+
+def text_chunks_from_file(source, normalize=True, exclude=TEXT_EXCLUDE):
+    """ Generate `(component, eId, text)` tuples for a document without loading the entire document, in the same
+    way as :meth:`cobalt.akn.StructuredDocument.text_chunks`. Each hierarchical element is discarded once its text
+    has been read.
+
+    Unlike :meth:`cobalt.akn.StructuredDocument.text_chunks`, the attachments of a component are generated before
+    the chunk of the component's own text.
+
+    :param source: filename, file-like object or bytes of the XML document
+    """
+    names = {}
+    # (hierarchical, quoted, excluded, excluded from the component's own text, component containers) tags for each
+    # component we're in
+    tags = {}
+    quoted = 0
+    # component -> number of open component containers (such as <attachments>) in it. The components they contain
+    # have their own roots, so anything else in them is skipped, as it is by text_chunks(), such as the attachments
+    # of a work embedded in a collection.
+    containers = {}
+
+    for event, elem, root in _iter_components(source):
+        if event == 'component':
+            names[root] = elem
+            continue
+
+        if root not in tags:
+            namespace = etree.QName(root).namespace
+            tags[root] = (
+                {f'{{{namespace}}}{t}' for t in AkomaNtoso30.hier_elements},
+                {f'{{{namespace}}}{t}' for t in QUOTED_STRUCTURES},
+                {f'{{{namespace}}}{t}' for t in exclude},
+                {f'{{{namespace}}}{t}' for t in list(exclude) + COMPONENT_PARENTS},
+                {f'{{{namespace}}}{t}' for t in COMPONENT_PARENTS},
+            )
+        hier, quotes, skip, root_skip, parents = tags[root]
+
+        if elem.tag in parents:
+            containers[root] = containers.get(root, 0) + (1 if event == 'start' else -1)
+            if event == 'end':
+                elem.clear(keep_tail=True)
+        elif containers.get(root):
+            continue
+        elif elem.tag in quotes:
+            quoted += 1 if event == 'start' else -1
+        elif event == 'end' and elem is root:
+            text = _normalize(_text(elem, root_skip), normalize)
+            if text.strip():
+                yield names.pop(root), None, text
+            del tags[root]
+            containers.pop(root, None)
+        elif event == 'end' and elem.tag in hier and not quoted:
+            # hierarchical descendants have already been discarded, leaving only their tails
+            yield names[root], elem.get('eId'), _normalize(_text(elem, skip), normalize)
+            elem.clear(keep_tail=True)
@@ -1,5 +1,7 @@
 import re
 
+from .instrumentation import argument_size, instrumented
+
 FRBR_URI_RE = re.compile(r"""^(/(?P<prefix>akn))?            # optional 'akn' prefix
                               /(?P<country>[a-z]{2})         # country
                               (-(?P<locality>[^/]+))?        # locality code
@@ -189,6 +191,7 @@ class FrbrUri(object):
         return f'<FrbrUri({self})>'
 
     @classmethod
+    @instrumented('FrbrUri.parse', before=argument_size(1, 's'))
     def parse(cls, s):
         """ Parse a string into an FrbrUri instance.
 
@@ -0,0 +1,131 @@
+"""
+Documents shared by several test modules.
+"""
+from cobalt import Act
+
+ATTACHMENTS_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<akomaNtoso xmlns="http://docs.oasis-open.org/legaldocml/ns/akn/3.0" xsi:schemaLocation="http://docs.oasis-open.org/legaldocml/akn-core/v1.0/os/part2-specs/schemas/akomantoso30.xsd" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+  <act contains="singleVersion" name="act">
+    <meta>
+      <identification source="#cobalt">
+        <FRBRWork>
+          <FRBRthis value="/na/act/1977/25/!main"/>
+          <FRBRuri value="/na/act/1977/25"/>
+          <FRBRalias value="Livestock Improvement Act, 1977" name="title"/>
+          <FRBRdate date="1977" name="Generation"/>
+          <FRBRauthor href=""/>
+          <FRBRcountry value="na"/>
+          <FRBRnumber value="25"/>
+        </FRBRWork>
+        <FRBRExpression>
+          <FRBRthis value="/na/act/1977/25/eng@1993-12-02/!main"/>
+          <FRBRuri value="/na/act/1977/25/eng@1993-12-02"/>
+          <FRBRdate date="1993-12-02" name="Generation"/>
+          <FRBRauthor href=""/>
+          <FRBRlanguage language="eng"/>
+        </FRBRExpression>
+        <FRBRManifestation>
+          <FRBRthis value="/na/act/1977/25/eng@1993-12-02/!main"/>
+          <FRBRuri value="/na/act/1977/25/eng@1993-12-02"/>
+          <FRBRdate date="2020-03-25" name="Generation"/>
+          <FRBRauthor href=""/>
+        </FRBRManifestation>
+      </identification>
+      <publication number="5462" name="South African Government Gazette" showAs="South African Government Gazette" date="1977-03-23"/>
+    </meta>
+    <body>
+      <section eId="section_1">
+        <content>
+          <p></p>
+        </content>
+      </section>
+    </body>
+    <attachments>
+      <attachment eId="att_1">
+        <heading>Schedule</heading>
+        <doc name="schedule">
+          <meta>
+            <identification source="#cobalt">
+              <FRBRWork>
+                <FRBRthis value="/na/act/1977/25/!schedule-A"/>
+                <FRBRuri value="/na/act/1977/25"/>
+                <FRBRalias value="Schedule" name="title"/>
+                <FRBRdate date="1977" name="Generation"/>
+                <FRBRauthor href=""/>
+                <FRBRcountry value="na"/>
+                <FRBRnumber value="25"/>
+              </FRBRWork>
+              <FRBRExpression>
+                <FRBRthis value="/na/act/1977/25/eng@1993-12-02/!schedule-A"/>
+                <FRBRuri value="/na/act/1977/25/eng@1993-12-02"/>
+                <FRBRdate date="1993-12-02" name="Generation"/>
+                <FRBRauthor href=""/>
+                <FRBRlanguage language="eng"/>
+              </FRBRExpression>
+              <FRBRManifestation>
+                <FRBRthis value="/na/act/1977/25/eng@1993-12-02/!schedule-A"/>
+                <FRBRuri value="/na/act/1977/25/eng@1993-12-02"/>
+                <FRBRdate date="2020-03-25" name="Generation"/>
+                <FRBRauthor href=""/>
+              </FRBRManifestation>
+            </identification>
+          </meta>
+          <mainBody>
+            <paragraph eId="paragraph_1">
+              <content>
+                <p>This is the content of the Schedule!</p>
+              </content>
+            </paragraph>
+          </mainBody>
+        </doc>
+      </attachment>
+    </attachments>
+    <components>
+      <component eId="comp_1">
+        <heading>Schedule</heading>
+        <doc name="schedule">
+          <meta>
+            <identification source="#cobalt">
+              <FRBRWork>
+                <FRBRthis value="/na/act/1977/25/!schedule-XXX"/>
+                <FRBRuri value="/na/act/1977/25"/>
+                <FRBRalias value="Schedule" name="title" />
+                <FRBRdate date="1980-01-01" name="Generation"/>
+                <FRBRauthor href=""/>
+                <FRBRcountry value="na"/>
+                <FRBRnumber value="25"/>
+              </FRBRWork>
+              <FRBRExpression>
+                <FRBRthis value="/na/act/1977/25/eng@1993-12-02/!schedule-XXX"/>
+                <FRBRuri value="/na/act/1977/25/eng@1993-12-02"/>
+                <FRBRdate date="1980-01-01" name="Generation"/>
+                <FRBRauthor href=""/>
+                <FRBRlanguage language="eng"/>
+              </FRBRExpression>
+              <FRBRManifestation>
+                <FRBRthis value="/na/act/1977/25/eng@1993-12-02/!schedule-XXX"/>
+                <FRBRuri value="/na/act/1977/25/eng@1993-12-02"/>
+                <FRBRdate date="2020-03-25" name="Generation"/>
+                <FRBRauthor href=""/>
+              </FRBRManifestation>
+            </identification>
+          </meta>
+          <mainBody>
+            <paragraph eId="paragraph_1">
+              <content>
+                <p>This is the content of the Schedule!</p>
+              </content>
+            </paragraph>
+          </mainBody>
+        </doc>
+      </component>
+    </components>
+  </act>
+</akomaNtoso>
+"""
+
+
+def attachments_act():
+    """ A new act with an attachment and a component, from :data:`ATTACHMENTS_XML`.
+    """
+    return Act(xml=ATTACHMENTS_XML)
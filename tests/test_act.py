@@ -1,5 +1,5 @@
 from unittest import TestCase
-from datetime import date
+from datetime import date, timedelta
 
 from lxml.etree import LxmlSyntaxError
 
@@ -294,6 +294,134 @@ class ActTestCase(TestCase):
 
         assert_validates(a)
 
+    def test_many_amendments(self):
+        a = Act()
+        a.frbr_uri = "/akn/za/act/1900-01-01/1"
+        a.repeal = RepealEvent(date='2012-02-01', repealing_uri='/za/act/1980/10', repealing_title='Foo')
+        a.amendments = [
+            AmendmentEvent(date=date(1901, 1, 1) + timedelta(days=i), amending_uri=f'/za/act/1901/{i}',
+                           amending_title=f'Amendment {i}')
+            for i in range(500)
+        ]
+
+        amendments = a.amendments
+        self.assertEqual(500, len(amendments))
+        self.assertEqual('/za/act/1901/499', amendments[-1].amending_uri)
+        self.assertEqual('Amendment 499', amendments[-1].amending_title)
+        self.assertEqual(date(1901, 1, 1) + timedelta(days=499), amendments[-1].date)
+        assert_validates(a, strict=True)
+
+        # replacing the amendments leaves the repeal alone
+        a.amendments = amendments[:2]
+        self.assertEqual(['/za/act/1901/0', '/za/act/1901/1'], [x.amending_uri for x in a.amendments])
+        self.assertEqual(a.repeal.repealing_uri, '/za/act/1980/10')
+        self.assertEqual(4, len(a.meta.references.getchildren()))
+        assert_validates(a, strict=True)
+
+        a.repeal = None
+        self.assertEqual(2, len(a.amendments))
+        self.assertEqual(3, len(a.meta.references.getchildren()))
+
+    def test_add_amendment(self):
+        a = Act()
+        a.frbr_uri = "/akn/za/act/1900-01-01/1"
+        a.amendments = [AmendmentEvent(date='2012-02-01', amending_uri='/za/act/1980/10', amending_title="Foo")]
+        original = a.meta.lifecycle.eventRef
+
+        a.add_amendment(AmendmentEvent(date='2013-03-03', amending_uri='/za/act/1990/5', amending_title="Bar"))
+        self.assertEqual(['/za/act/1980/10', '/za/act/1990/5'], [x.amending_uri for x in a.amendments])
+        self.assertEqual(['amendment-0-source', 'amendment-1-source'],
+                         [x.get('eId') for x in a.meta.references.passiveRef])
+        # existing nodes are untouched
+        self.assertIs(original, a.meta.lifecycle.eventRef)
+        assert_validates(a, strict=True)
+
+    def test_add_amendment_same_date(self):
+        a = Act()
+        a.frbr_uri = "/akn/za/act/1900-01-01/1"
+        a.amendments = [AmendmentEvent(date='2012-02-01', amending_uri='/za/act/1980/10', amending_title="Foo")]
+        a.add_amendment(AmendmentEvent(date='2013-03-03', amending_uri='/za/act/1990/5', amending_title="Bar"))
+        a.add_amendment(AmendmentEvent(date='2012-02-01', amending_uri='/za/act/1980/11', amending_title="Baz"))
+        a.add_amendment(AmendmentEvent(date='2010-01-01', amending_uri='/za/act/1980/1', amending_title="Qux"))
+
+        self.assertEqual(
+            [('amendment-2010-01-01', '2010-01-01'), ('amendment-2012-02-01', '2012-02-01'),
+             ('amendment-2012-02-01-2', '2012-02-01'), ('amendment-2013-03-03', '2013-03-03')],
+            [(e.get('eId'), e.get('date')) for e in a.meta.lifecycle.eventRef])
+        assert_validates(a, strict=True)
+
+    def test_add_amendment_empty(self):
+        a = Act()
+        a.frbr_uri = "/akn/za/act/1900-01-01/1"
+        a.add_amendment(AmendmentEvent(date='2013-03-03', amending_uri='/za/act/1990/5', amending_title="Bar"))
+        self.assertEqual(['/za/act/1990/5'], [x.amending_uri for x in a.amendments])
+        self.assertEqual('singleVersion', a.act.get('contains'))
+        assert_validates(a, strict=True)
+
+    def test_remove_amendment(self):
+        a = Act()
+        a.frbr_uri = "/akn/za/act/1900-01-01/1"
+        a.amendments = [
+            AmendmentEvent(date='2012-02-01', amending_uri='/za/act/1980/22', amending_title="Foo"),
+            AmendmentEvent(date='2013-03-03', amending_uri='/za/act/1990/5', amending_title="Bar"),
+        ]
+
+        self.assertEqual(1, a.remove_amendment('/za/act/1980/22'))
+        self.assertEqual(['/za/act/1990/5'], [x.amending_uri for x in a.amendments])
+        self.assertEqual('amendment-1-source', a.meta.references.passiveRef.get('eId'))
+        self.assertEqual(0, a.remove_amendment('/za/act/1980/22'))
+        assert_validates(a, strict=True)
+
+        # adding a new one uses a free eId
+        a.add_amendment(AmendmentEvent(date='2014-01-01', amending_uri='/za/act/2014/1', amending_title="Baz"))
+        self.assertEqual(['amendment-1-source', 'amendment-0-source'],
+                         [x.get('eId') for x in a.meta.references.passiveRef])
+
+        self.assertEqual(1, a.remove_amendment(date(2013, 3, 3)))
+        self.assertEqual(1, a.remove_amendment('2014-01-01'))
+        self.assertEqual([], a.amendments)
+        self.assertIsNone(a.act.get('contains'))
+        self.assertIsNone(a.get_element('meta.lifecycle'))
+        assert_validates(a, strict=True)
+
+    def test_update_amendment(self):
+        a = Act()
+        a.frbr_uri = "/akn/za/act/1900-01-01/1"
+        a.amendments = [
+            AmendmentEvent(date='2012-02-01', amending_uri='/za/act/1980/22', amending_title="Foo"),
+            AmendmentEvent(date='2013-03-03', amending_uri='/za/act/1990/5', amending_title="Bar"),
+        ]
+
+        self.assertEqual(1, a.update_amendment('2012-02-01', amending_title='Corrected', amending_uri='/za/act/1980/23'))
+        self.assertEqual(1, a.update_amendment('/za/act/1990/5', date=date(2013, 4, 4)))
+        self.assertEqual(0, a.update_amendment('/za/act/1990/99', date=date(2013, 4, 4)))
+
+        amendments = a.amendments
+        self.assertEqual(['Corrected', 'Bar'], [x.amending_title for x in amendments])
+        self.assertEqual(['/za/act/1980/23', '/za/act/1990/5'], [x.amending_uri for x in amendments])
+        self.assertEqual([date(2012, 2, 1), date(2013, 4, 4)], [x.date for x in amendments])
+        # eIds are unchanged
+        self.assertEqual(['amendment-2012-02-01', 'amendment-2013-03-03'],
+                         [x.get('eId') for x in a.meta.lifecycle.eventRef])
+        assert_validates(a, strict=True)
+
+    def test_update_amendment_date_order(self):
+        a = Act()
+        a.frbr_uri = "/akn/za/act/1900-01-01/1"
+        a.amendments = [
+            AmendmentEvent(date='2013-03-03', amending_uri='/za/act/1990/5', amending_title="Bar"),
+            AmendmentEvent(date='2012-02-01', amending_uri='/za/act/1980/22', amending_title="Foo"),
+            AmendmentEvent(date='2014-01-01', amending_uri='/za/act/1990/6', amending_title="Baz"),
+        ]
+        self.assertEqual(['2012-02-01', '2013-03-03', '2014-01-01'], [e.get('date') for e in a.meta.lifecycle.eventRef])
+
+        a.update_amendment('/za/act/1980/22', date=date(2015, 1, 1))
+        self.assertEqual(['2013-03-03', '2014-01-01', '2015-01-01'], [e.get('date') for e in a.meta.lifecycle.eventRef])
+        a.update_amendment('/za/act/1980/22', date=date(2013, 3, 3))
+        self.assertEqual(['amendment-2013-03-03', 'amendment-2012-02-01', 'amendment-2014-01-01'],
+                         [e.get('eId') for e in a.meta.lifecycle.eventRef])
+        assert_validates(a, strict=True)
+
     def test_main(self):
         a = Act()
         self.assertEqual(a.main, a.act)
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import tempfile
+import threading
+from unittest import IsolatedAsyncioTestCase, mock
+
+from cobalt import Act, aio
+from cobalt.aio import WorkerPool
+from cobalt.akn import objectify_parser
+from cobalt.streaming import extract_portion as _extract_portion
+
+
+class AsyncioTestCase(IsolatedAsyncioTestCase):
+    def setUp(self):
+        act = Act()
+        act.frbr_uri = '/akn/za/act/2010-03-04/2'
+        act.main_content.append(act.maker.section(act.maker.num('1.'), eId='sec_1'))
+        self.xml = act.to_xml()
+        self.pool = WorkerPool(max_workers=2, max_bytes=len(self.xml) * 2)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    async def until(self, condition):
+        for _ in range(500):
+            if condition():
+                return
+            await asyncio.sleep(0.01)
+
+    async def test_load(self):
+        act = await self.pool.load(self.xml)
+        self.assertIsInstance(act, Act)
+        self.assertEqual('/akn/za/act/2010-03-04/2', act.frbr_uri.work_uri())
+        # the shared parser is restored
+        self.assertNotIn('_parser', act.__dict__)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            fname = os.path.join(tmp, 'act.xml')
+            with open(fname, 'wb') as f:
+                f.write(self.xml)
+            self.assertIsInstance(await self.pool.load(fname), Act)
+            self.assertEqual('sec_1', (await self.pool.extract_portion(fname, 'sec_1'))[0].get('eId'))
+
+        with self.assertRaises(ValueError):
+            await self.pool.load(self.xml.replace(b'<act ', b'<foo ').replace(b'</act>', b'</foo>'))
+
+    async def test_validate_and_to_xml(self):
+        documents = await asyncio.gather(*(self.pool.load(self.xml) for _ in range(6)))
+        results = await asyncio.gather(*(self.pool.validate(d, strict=True) for d in documents))
+        self.assertEqual([True] * 6, [valid for valid, errors in results])
+        self.assertEqual(self.xml, await self.pool.to_xml(documents[0]))
+
+        documents[0].main_content.append(documents[0].maker.section(eId='sec_1'))
+        valid, errors = await self.pool.validate(documents[0], strict=True)
+        self.assertFalse(valid)
+        self.assertTrue(errors)
+
+    async def test_extract_portion(self):
+        element, meta = await aio.extract_portion(self.xml, 'sec_1')
+        self.assertEqual('sec_1', element.get('eId'))
+        self.assertEqual((None, None), await aio.extract_portion(self.xml, 'sec_99'))
+
+        # the portion is parsed with the thread's own parser
+        with mock.patch('cobalt.aio._extract_portion', wraps=_extract_portion) as extract:
+            await self.pool.extract_portion(self.xml, 'sec_1')
+        parser = extract.call_args.args[3]
+        self.assertIsNot(objectify_parser, parser)
+
+    async def test_backpressure(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def block():
+            started.set()
+            release.wait(5)
+
+        # fill the pool
+        first = asyncio.ensure_future(self.pool._run(self.pool.max_bytes, block))
+        await asyncio.to_thread(started.wait, 5)
+        self.assertEqual(self.pool.max_bytes, self.pool.used)
+
+        # a document larger than the limit must wait its turn
+        second = asyncio.ensure_future(self.pool._run(self.pool.max_bytes * 10, lambda: 'done'))
+        await asyncio.sleep(0.01)
+        self.assertFalse(second.done())
+        self.assertEqual(1, len(self.pool._waiters))
+
+        release.set()
+        self.assertEqual('done', await second)
+        await first
+        await self.until(lambda: not self.pool.used)
+        self.assertEqual(0, self.pool.used)
+
+    async def test_cancel(self):
+        started = threading.Event()
+        release = threading.Event()
+        calls = []
+
+        def block():
+            started.set()
+            release.wait(5)
+            calls.append('block')
+
+        running = asyncio.ensure_future(self.pool._run(self.pool.max_bytes, block))
+        await asyncio.to_thread(started.wait, 5)
+        waiting = asyncio.ensure_future(self.pool._run(1, calls.append, 'waiting'))
+        await asyncio.sleep(0.01)
+
+        # a waiting call is never run
+        waiting.cancel()
+        running.cancel()
+        await asyncio.sleep(0.01)
+        self.assertEqual(0, len(self.pool._waiters))
+
+        # work that has started runs to completion, and then releases its room
+        self.assertEqual(self.pool.max_bytes, self.pool.used)
+        release.set()
+        await self.until(lambda: calls and not self.pool.used)
+        self.assertEqual(['block'], calls)
+        self.assertEqual(0, self.pool.used)
@@ -0,0 +1,187 @@
+import json
+import os
+import tempfile
+from contextlib import redirect_stderr
+from io import StringIO
+from unittest import TestCase, mock
+
+from cobalt import Act
+from cobalt.cli import expand_files, load, main, reidentify_files
+from cobalt.reidentify import UriMapping
+
+from . import fixtures
+
+
+class CommandLineTestCase(TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.files = []
+
+        act = fixtures.attachments_act()
+        self.write('act-1.xml', act.to_xml(xml_declaration=True))
+
+        act = Act()
+        act.frbr_uri = '/akn/za/act/2010-03-04/2'
+        act.title = 'Act 2 of 2010'
+        act.expression_date = '2011-01-01'
+        self.write('sub/act-2.xml', act.to_xml())
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def write(self, name, xml):
+        fname = os.path.join(self.dir.name, name)
+        os.makedirs(os.path.dirname(fname), exist_ok=True)
+        with open(fname, 'wb') as f:
+            f.write(xml)
+        self.files.append(fname)
+
+    def run_cli(self, *args):
+        stdout = StringIO()
+        stderr = StringIO()
+        status = main(list(args), stdout=stdout, stderr=stderr)
+        return status, [json.loads(line) for line in stdout.getvalue().splitlines()], stderr.getvalue()
+
+    def test_expand_files(self):
+        self.assertEqual(self.files, expand_files([self.dir.name]))
+        self.assertEqual(self.files[1:], expand_files([os.path.join(self.dir.name, '**', 'act-2.xml')]))
+        self.assertEqual(['missing.xml'], expand_files(['missing.xml']))
+
+    def test_meta(self):
+        status, results, stderr = self.run_cli('meta', *self.files)
+        self.assertEqual(0, status)
+        self.assertEqual({
+            'file': self.files[1],
+            'frbr_uri': '/akn/za/act/2010-03-04/2/eng@2011-01-01',
+            'work_uri': '/akn/za/act/2010-03-04/2',
+            'document_type': 'act',
+            'title': 'Act 2 of 2010',
+            'language': 'eng',
+            'work_date': '2010-03-04',
+            'expression_date': '2011-01-01',
+            'components': ['main'],
+        }, results[1])
+        self.assertEqual(['main', 'schedule-A', 'schedule-XXX'], results[0]['components'])
+        self.assertIn('meta: 2 files, 0 failed', stderr)
+
+    def test_errors(self):
+        self.write('bad.xml', b'<akomaNtoso')
+        status, results, stderr = self.run_cli('meta', '--quiet', self.files[-1], 'missing.xml')
+        self.assertEqual(1, status)
+        self.assertEqual([self.files[-1], 'missing.xml'], [r['file'] for r in results])
+        self.assertTrue(results[0]['error'].startswith('XMLSyntaxError'))
+        self.assertTrue(results[1]['error'].startswith('FileNotFoundError'))
+        self.assertEqual('', stderr)
+
+    def test_validate(self):
+        status, results, _ = self.run_cli('validate', '--strict', self.files[1])
+        self.assertEqual(0, status)
+        self.assertEqual([{'file': self.files[1], 'valid': True, 'errors': []}], results)
+
+        act = load(self.files[1])
+        act.frbr_uri = '/akn/za/act/2010/2'
+        self.write('invalid.xml', act.to_xml())
+        status, results, stderr = self.run_cli('validate', '--strict', self.files[-1])
+        self.assertEqual(1, status)
+        self.assertFalse(results[0]['valid'])
+        self.assertIn("'2010' is not a valid value", results[0]['errors'][0])
+        self.assertIn('1 failed', stderr)
+
+    def test_set_uri(self):
+        status, results, _ = self.run_cli('set-uri', '--set', 'locality=cpt', '--set', 'number=3', self.files[1])
+        self.assertEqual(0, status)
+        self.assertEqual('/akn/za-cpt/act/2010-03-04/3/eng@2011-01-01', results[0]['frbr_uri'])
+        self.assertEqual('/akn/za/act/2010-03-04/2/eng@2011-01-01', results[0]['old_frbr_uri'])
+        self.assertEqual('/akn/za-cpt/act/2010-03-04/3/eng@2011-01-01', load(self.files[1]).expression_frbr_uri().expression_uri())
+
+        self.run_cli('set-uri', '--uri', '/akn/za/act/2020/1', '--dry-run', self.files[1])
+        self.assertEqual('/akn/za-cpt/act/2010-03-04/3', load(self.files[1]).frbr_uri.work_uri())
+
+        with self.assertRaises(SystemExit), redirect_stderr(StringIO()):
+            self.run_cli('set-uri', '--set', 'colour=red', self.files[1])
+
+    def test_reidentify(self):
+        act = load(self.files[0])
+        act.main_content.append(act.maker.p(act.maker.ref('Act 2', href='/akn/za/act/2010-03-04/2/~sec_1')))
+        self.write('act-3.xml', act.to_xml())
+
+        status, results, stderr = self.run_cli('reidentify', '--where', 'number=2', '--set', 'number=20', *self.files)
+        self.assertEqual(0, status)
+        self.assertEqual([False, True, False], [r['changed'] for r in results])
+        self.assertEqual([[['/akn/za/act/2010-03-04/2/~sec_1', '/akn/za/act/2010-03-04/20/~sec_1']]],
+                         [r['refs'] for r in results if r['refs']])
+        self.assertEqual('/akn/za/act/2010-03-04/20', load(self.files[1]).frbr_uri.work_uri())
+        self.assertIn('/akn/za/act/2010-03-04/20/~sec_1', load(self.files[2]).to_xml(encoding='unicode'))
+
+        reports = list(reidentify_files(self.files, UriMapping({'number': '21'}, {'number': '20'}), jobs=2,
+                                        dry_run=True))
+        self.assertEqual([False, True, False], [r['changed'] for r in reports])
+        self.assertEqual('/akn/za/act/2010-03-04/20', load(self.files[1]).frbr_uri.work_uri())
+
+    def test_set_date(self):
+        status, results, _ = self.run_cli('set-date', '--date', '2021-02-03', self.files[0])
+        self.assertEqual(0, status)
+        self.assertTrue(results[0]['frbr_uri'].endswith('@2021-02-03'))
+
+        act = load(self.files[0])
+        self.assertEqual('2021-02-03', act.components()['schedule-A'].doc.meta.identification.FRBRExpression.FRBRdate.get('date'))
+        with open(self.files[0], 'rb') as f:
+            self.assertTrue(f.read().startswith(b'<?xml'))
+
+    def test_save_keeps_mode(self):
+        os.chmod(self.files[1], 0o644)
+        self.run_cli('set-date', '--date', '2021-02-03', self.files[1])
+        self.assertEqual(0o644, os.stat(self.files[1]).st_mode & 0o777)
+
+    def test_save_error(self):
+        with mock.patch.object(Act, 'to_xml', side_effect=ValueError('broken')):
+            status, results, _ = self.run_cli('set-date', '--date', '2021-02-03', self.files[1])
+        self.assertEqual(1, status)
+        self.assertEqual('ValueError: broken', results[0]['error'])
+        # the temporary file is removed
+        self.assertEqual(['act-2.xml'], os.listdir(os.path.dirname(self.files[1])))
+
+    def test_broken_pipe(self):
+        class ClosedPipe(StringIO):
+            def write(self, s):
+                raise BrokenPipeError()
+
+        stopped = []
+
+        def results(files):
+            try:
+                for fname in files:
+                    yield {'filename': fname}
+            finally:
+                stopped.append(True)
+
+        # keep a reference to the results, so that they aren't closed when main() drops them
+        generators = []
+
+        def run(func, args, files, jobs):
+            generators.append(results(files))
+            return generators[-1]
+
+        with mock.patch('cobalt.cli.run', run):
+            status = main(['meta', *self.files], stdout=ClosedPipe(), stderr=StringIO())
+        self.assertEqual(1, status)
+        # the remaining files are abandoned, which cancels the work on them
+        self.assertEqual([True], stopped)
+
+    def test_components(self):
+        status, results, _ = self.run_cli('components', self.files[0])
+        self.assertEqual(0, status)
+        self.assertEqual(['main', 'schedule-A', 'schedule-XXX'], [c['name'] for c in results[0]['components']])
+        self.assertEqual(['act', 'doc', 'doc'], [c['document_type'] for c in results[0]['components']])
+
+    def test_portion(self):
+        status, results, _ = self.run_cli('portion', '--eid', 'sec_nn_1', *self.files)
+        self.assertEqual(1, status)
+        self.assertIn('eId="sec_nn_1"', results[1]['xml'])
+        self.assertEqual('ValueError: Portion not found: sec_nn_1', results[0]['error'])
+
+    def test_jobs(self):
+        _, serial, _ = self.run_cli('meta', *self.files)
+        status, parallel, _ = self.run_cli('meta', '--jobs', '2', *self.files)
+        self.assertEqual(0, status)
+        self.assertEqual(serial, parallel)
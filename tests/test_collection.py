@@ -0,0 +1,67 @@
+from io import BytesIO
+from unittest import TestCase
+
+from cobalt import Act, CollectionBuilder, Document, OfficialGazette
+from cobalt.schemas import assert_validates
+
+
+class CollectionBuilderTestCase(TestCase):
+    def notice(self, text):
+        doc = Document()
+        doc.mainBody.append(doc.make_element('p'))
+        doc.mainBody.p._setText(text)
+        return doc
+
+    def build(self, **kwargs):
+        f = BytesIO()
+        with CollectionBuilder(f, '/akn/za/officialGazette/2020-01-31/123', **kwargs) as builder:
+            for i in range(3):
+                builder.add_component(self.notice(f'Notice {i + 1}'), name=f'notice_{i + 1}')
+            builder.add_component(Act())
+        return OfficialGazette(f.getvalue())
+
+    def test_build(self):
+        gazette = self.build(expression_date='2020-02-01', title='Gazette 123', language='fre')
+        assert_validates(gazette)
+
+        self.assertEqual('/akn/za/officialGazette/2020-01-31/123/fre@2020-02-01', gazette.frbr_uri.expression_uri())
+        self.assertEqual('Gazette 123', gazette.title)
+        self.assertEqual(['main', 'notice_1', 'notice_2', 'notice_3', 'component_4'], list(gazette.components()))
+
+        self.assertEqual('Notice 2', gazette.components()['notice_2'].doc.mainBody.p.text)
+        component = gazette.main.collectionBody.component[3]
+        self.assertEqual('cmp_4', component.get('eId'))
+        ident = component.act.meta.identification
+        self.assertEqual('/akn/za/officialGazette/2020-01-31/123/!component_4', ident.FRBRWork.FRBRthis.get('value'))
+        self.assertEqual('/akn/za/officialGazette/2020-01-31/123/fre@2020-02-01/!component_4',
+                         ident.FRBRExpression.FRBRthis.get('value'))
+        self.assertEqual('2020-02-01', ident.FRBRExpression.FRBRdate.get('date'))
+        self.assertEqual('fre', ident.FRBRExpression.FRBRlanguage.get('language'))
+
+    def test_frbr_uri(self):
+        gazette = self.build()
+        # setting the URI on the loaded document must give the same result
+        before = gazette.to_xml()
+        gazette.frbr_uri = gazette.frbr_uri
+        self.assertEqual(before, gazette.to_xml())
+
+        gazette.frbr_uri = '/akn/za/officialGazette/2020-01-31/124'
+        self.assertEqual('/akn/za/officialGazette/2020-01-31/124/!notice_2',
+                         gazette.components()['notice_2'].doc.meta.identification.FRBRWork.FRBRthis.get('value'))
+
+    def test_embedded_foreign_act(self):
+        gazette = self.build()
+        act = Act()
+        act.frbr_uri = '/akn/za/act/2020-01-01/5'
+        gazette.main.collectionBody.append(gazette.maker.component(act.main, eId='cmp_5'))
+
+        self.assertEqual(['main', 'notice_1', 'notice_2', 'notice_3', 'component_4'], list(gazette.components()))
+        self.assertIs(gazette.main, gazette.components()['main'])
+
+        gazette.frbr_uri = '/akn/za/officialGazette/2020-01-31/124'
+        gazette.expression_date = '2020-02-05'
+        self.assertEqual('/akn/za/officialGazette/2020-01-31/124/!main',
+                         gazette.meta.identification.FRBRWork.FRBRthis.get('value'))
+        ident = gazette.main.collectionBody.component[4].act.meta.identification
+        self.assertEqual('/akn/za/act/2020-01-01/5/!main', ident.FRBRWork.FRBRthis.get('value'))
+        self.assertNotEqual('2020-02-05', ident.FRBRExpression.FRBRdate.get('date'))
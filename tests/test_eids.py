@@ -0,0 +1,132 @@
+from io import BytesIO
+from unittest import TestCase, mock
+
+from lxml import etree
+
+from cobalt import Act, CollectionBuilder, OfficialGazette
+from cobalt.eids import EidGenerator
+
+from . import fixtures
+
+
+class EidGeneratorTestCase(TestCase):
+    def setUp(self):
+        self.act = Act()
+        E = self.act.maker
+        self.act.main_content.append(E.chapter(
+            E.num('2'),
+            E.section(
+                E.num('3.'),
+                E.content(E.p('text', eId='old_p'), E.p(E.ref('section 3', href='#old_sec'))),
+                eId='old_sec'),
+            eId='old_chp'))
+        self.act.main_content.append(E.section(
+            E.num('3.'),
+            E.subsection(E.num('(a)'), E.content(E.p('text'))),
+            E.subsection(E.content(E.p('text', eId='x'))),
+            E.subsection(E.content(E.p(E.ref('elsewhere', href='#missing')))),
+            E.blockList(E.item(E.num('(iv)'), E.p('text'), eId='y'), eId='z'),
+            E.quotedStructure(E.section(E.num('9.'), eId='quoted_sec_9'), eId='qs'),
+        ))
+
+    def eids(self, doc=None):
+        doc = doc or self.act
+        return doc.root.xpath('//a:*[not(ancestor::a:meta)]/@eId', namespaces={'a': doc.namespace})
+
+    def test_clean_num(self):
+        gen = EidGenerator()
+        self.assertEqual('a', gen.clean_num(' (a) '))
+        self.assertEqual('2.1', gen.clean_num('2.1.'))
+        self.assertEqual('12A-bis', gen.clean_num('12A  bis'))
+        self.assertEqual('', gen.clean_num('.'))
+
+    def test_renumber(self):
+        renamed = self.act.renumber_eids()
+        self.assertEqual([
+            'sec_nn_1', 'sec_nn_1__p_1',
+            'chp_2', 'chp_2__sec_3', 'chp_2__sec_3__p_1',
+            'sec_3', 'sec_3__subsec_a', 'sec_3__subsec_nn_1', 'sec_3__subsec_nn_1__p_1', 'sec_3__subsec_nn_2',
+            'sec_3__list_1', 'sec_3__list_1__item_iv', 'sec_3__qstr_1', 'quoted_sec_9',
+        ], self.eids())
+        self.assertEqual({None: {
+            'old_chp': 'chp_2', 'old_sec': 'chp_2__sec_3', 'old_p': 'chp_2__sec_3__p_1', 'x': 'sec_3__subsec_nn_1__p_1',
+            'z': 'sec_3__list_1', 'y': 'sec_3__list_1__item_iv', 'qs': 'sec_3__qstr_1',
+        }}, renamed)
+
+        refs = self.act.root.xpath('//a:ref', namespaces={'a': self.act.namespace})
+        self.assertEqual(['#chp_2__sec_3', '#missing'], [r.get('href') for r in refs])
+        self.assertIsNone(self.act.root.xpath('//a:section[@eId="chp_2__sec_3"]', namespaces={'a': self.act.namespace})[0].get('wId'))
+
+        # already numbered
+        self.assertEqual({}, self.act.renumber_eids())
+        self.assertEqual('cobalt', self.act.meta.references.TLCOrganization.get('eId'))
+
+    def test_without_skip_subtree(self):
+        # older versions of lxml can't skip subtrees while walking
+        real_iterwalk = etree.iterwalk
+
+        class iterwalk:
+            def __init__(self, *args, **kwargs):
+                self.walker = real_iterwalk(*args, **kwargs)
+
+            def __iter__(self):
+                return iter(self.walker)
+
+        expected = Act(self.act.to_xml()).renumber_eids()
+        with mock.patch('cobalt.eids.etree.iterwalk', iterwalk):
+            self.assertEqual(expected, self.act.renumber_eids())
+        self.assertIn('quoted_sec_9', self.eids())
+
+    def test_wids(self):
+        self.act.renumber_eids(wids=True)
+        section = self.act.root.xpath('//a:section[@eId="chp_2__sec_3"]', namespaces={'a': self.act.namespace})[0]
+        self.assertEqual('old_sec', section.get('wId'))
+        self.assertIsNone(self.act.main_content.section.get('wId'))
+
+    def test_duplicates(self):
+        E = self.act.maker
+        self.act.main_content.append(E.section(E.num('3.'), eId='sec_3'))
+        self.act.renumber_eids()
+        self.assertEqual(['sec_3', 'sec_3_2'], [e for e in self.eids() if e.startswith('sec_3') and '__' not in e])
+
+    def test_reserved(self):
+        # eIds in quoted structures aren't renumbered, so new eIds must not clash with them
+        E = self.act.maker
+        self.act.main_content.append(E.quotedStructure(E.section(E.num('4.'), eId='sec_4'), eId='qs_2'))
+        self.act.main_content.append(E.section(E.num('4.'), eId='new'))
+        renamed = self.act.renumber_eids()
+        self.assertEqual('sec_4_2', renamed[None]['new'])
+        self.assertEqual(1, self.eids().count('sec_4'))
+
+    def test_attachments(self):
+        act = fixtures.attachments_act()
+        act.renumber_eids()
+        self.assertEqual(['sec_nn_1', 'att_1', 'att_1__para_nn_1', 'cmp_1', 'para_nn_1'], self.eids(act))
+
+    def test_collection(self):
+        f = BytesIO()
+        with CollectionBuilder(f, '/akn/za/officialGazette/2020-01-31/123') as builder:
+            builder.add_component(Act(), name='act_1')
+            builder.add_component(Act(), name='act_2')
+        gazette = OfficialGazette(f.getvalue())
+
+        # each component is numbered separately
+        self.assertEqual({}, gazette.renumber_eids())
+        self.assertEqual(['cmp_1', 'sec_nn_1', 'sec_nn_1__p_1', 'cmp_2', 'sec_nn_1', 'sec_nn_1__p_1'], self.eids(gazette))
+
+    def test_collection_scopes(self):
+        f = BytesIO()
+        with CollectionBuilder(f, '/akn/za/officialGazette/2020-01-31/123') as builder:
+            for name, num in [('act_1', '1.'), ('act_2', '2.')]:
+                act = Act()
+                E = act.maker
+                act.main_content.append(E.section(E.num(num), E.content(E.p(E.ref('x', href='#x'))), eId='x'))
+                builder.add_component(act, name=name)
+        gazette = OfficialGazette(f.getvalue())
+
+        renamed = gazette.renumber_eids()
+        components = gazette.root.xpath('//a:component', namespaces={'a': gazette.namespace})
+        self.assertEqual({components[0]: {'x': 'sec_1'}, components[1]: {'x': 'sec_2'}}, renamed)
+        # each href is changed to match the renamed eId in its own component
+        self.assertEqual(['#sec_1', '#sec_2'],
+                         gazette.root.xpath('//a:ref/@href', namespaces={'a': gazette.namespace}))
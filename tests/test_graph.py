@@ -0,0 +1,59 @@
+from unittest import TestCase
+
+from lxml import etree
+
+from cobalt import Act
+from cobalt.graph import CitationGraph, extract_citations
+
+
+def make_act(frbr_uri, hrefs, passive=()):
+    act = Act()
+    act.frbr_uri = frbr_uri
+    p = act.body.section.content.p
+    for href in hrefs:
+        p.append(etree.fromstring(f'<ref xmlns="{act.namespace}" href="{href}">a reference</ref>'))
+    for i, href in enumerate(passive):
+        act._ensure_reference('passiveRef', 'Amendment', f'ref-{i}', href)
+    return act
+
+
+class CitationsTestCase(TestCase):
+    def test_extract_citations(self):
+        act = make_act('/akn/za/act/2009/1', [
+            '/akn/za/act/2001/5',
+            '/akn/za/act/2001/5/eng@2010-01-01/~sec_2',
+            '/za/act/1998/3',
+            '/akn/za/act/2009/1/~sec_3',
+            '#sec_1',
+            'https://example.com',
+        ], passive=['/akn/za/act/2012/8'])
+
+        expected = ('/akn/za/act/2009/1', {'/akn/za/act/2001/5', '/akn/za/act/1998/3', '/akn/za/act/2012/8'})
+        self.assertEqual(expected, extract_citations(act))
+        self.assertEqual(expected, extract_citations(act.to_xml()))
+
+
+class CitationGraphTestCase(TestCase):
+    def setUp(self):
+        self.graph = CitationGraph()
+        self.graph.add_document(make_act('/akn/za/act/2009/1', ['/akn/za/act/2001/5', '/akn/za/act/1998/3']))
+        self.graph.add_document(make_act('/akn/za/act/2010/2', ['/akn/za/act/2001/5']).to_xml())
+
+    def test_lookups(self):
+        self.assertEqual(4, len(self.graph))
+        self.assertEqual(3, self.graph.edge_count())
+        self.assertEqual(['/akn/za/act/1998/3', '/akn/za/act/2001/5'], sorted(self.graph.cites('/akn/za/act/2009/1')))
+        self.assertEqual(['/akn/za/act/2009/1', '/akn/za/act/2010/2'], self.graph.cited_by('/akn/za/act/2001/5'))
+        self.assertEqual([], self.graph.cites('/akn/za/act/2001/5'))
+        self.assertEqual([], self.graph.cited_by('/akn/za/act/1900/1'))
+
+    def test_update(self):
+        self.graph.add_document(make_act('/akn/za/act/2009/1', ['/akn/za/act/2010/2']))
+        self.assertEqual(['/akn/za/act/2010/2'], self.graph.cites('/akn/za/act/2009/1'))
+        self.assertEqual(['/akn/za/act/2010/2'], self.graph.cited_by('/akn/za/act/2001/5'))
+        self.assertEqual(['/akn/za/act/2009/1'], self.graph.cited_by('/akn/za/act/2010/2'))
+        self.assertEqual([], self.graph.cited_by('/akn/za/act/1998/3'))
+
+        self.graph.remove_citations('/akn/za/act/2010/2')
+        self.assertEqual([], self.graph.cited_by('/akn/za/act/2001/5'))
+        self.assertEqual(['/akn/za/act/2009/1'], self.graph.cited_by('/akn/za/act/2010/2'))
@@ -0,0 +1,60 @@
+import json
+import os
+import subprocess
+import sys
+from unittest import TestCase
+
+
+class ImportTestCase(TestCase):
+    def run_import(self, statement):
+        """ Run an import statement in a fresh interpreter with -X importtime. Returns the names of all imported
+        modules and the total time in microseconds taken to import the cobalt modules.
+        """
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c',
+             f'{statement}; import sys; print(__import__("json").dumps(sorted(sys.modules)))'],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+            capture_output=True, text=True, check=True)
+
+        total = 0
+        for line in result.stderr.splitlines():
+            if line.startswith('import time:'):
+                self_us, _, name = line[len('import time:'):].split('|')
+                if name.strip().startswith('cobalt'):
+                    total += int(self_us)
+
+        return json.loads(result.stdout), total
+
+    def test_frbr_uri_is_lightweight(self):
+        modules, frbr_uri_time = self.run_import('from cobalt import FrbrUri')
+        self.assertIn('cobalt.uri', modules)
+        self.assertNotIn('cobalt.akn', modules)
+        self.assertEqual([], [m for m in modules if m.startswith('lxml') or m.startswith('iso8601')])
+
+        _, act_time = self.run_import('from cobalt import Act; import lxml.etree')
+        self.assertLess(frbr_uri_time, act_time)
+
+    def test_documents_are_imported_on_demand(self):
+        modules, _ = self.run_import('from cobalt import Act')
+        self.assertIn('cobalt.hierarchical', modules)
+        self.assertIn('lxml.etree', modules)
+        self.assertNotIn('cobalt.judgment', modules)
+        self.assertNotIn('iso8601', modules)
+
+    def test_lazy_attributes(self):
+        import cobalt
+        from cobalt.akn import StructuredDocument
+
+        self.assertIs(cobalt.Judgment, StructuredDocument.for_document_type('judgment'))
+        self.assertIs(cobalt.akn.StructuredDocument, StructuredDocument)
+        self.assertIn('Act', dir(cobalt))
+        with self.assertRaises(AttributeError):
+            cobalt.foo
+
+    def test_parse_date_is_still_iso8601(self):
+        modules, _ = self.run_import('from cobalt import Act; Act().work_date')
+        self.assertNotIn('iso8601', modules)
+
+        from datetime import datetime
+        from cobalt.akn import parse_date
+        self.assertIsInstance(parse_date('2020-01-02'), datetime)
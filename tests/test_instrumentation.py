@@ -0,0 +1,98 @@
+from unittest import TestCase
+
+from cobalt import Act, FrbrUri, instrumentation
+from cobalt.instrumentation import Aggregator, add_hook, installed, remove_hook
+from cobalt.schemas import validate
+
+
+class InstrumentationTestCase(TestCase):
+    def test_events(self):
+        events = []
+        act = Act()
+        act.frbr_uri = '/akn/za/act/2009/1'
+        xml = act.to_xml()
+
+        with installed(events.append):
+            Act(xml).to_xml()
+            FrbrUri.parse('/akn/za/act/2009/1')
+            validate(act)
+            act.components()
+            act.get_portion_element('sec_nn_1')
+        self.assertEqual([], instrumentation.hooks)
+
+        names = [e.name for e in events]
+        for name in ['AkomaNtosoDocument.parse', 'AkomaNtosoDocument.to_xml', 'FrbrUri.parse', 'schemas.validate',
+                     'schemas.get_schema', 'StructuredDocument.components', 'StructuredDocument.get_portion_element']:
+            self.assertIn(name, names)
+
+        parse = events[names.index('AkomaNtosoDocument.parse')]
+        self.assertEqual(len(xml), parse.size)
+        self.assertEqual(len(list(act.root.iter())), parse.elements)
+        self.assertGreater(parse.duration, 0)
+
+        self.assertEqual(len('/akn/za/act/2009/1'), events[names.index('FrbrUri.parse')].size)
+        self.assertEqual(1, events[names.index('StructuredDocument.components')].elements)
+        self.assertEqual(1, events[names.index('StructuredDocument.get_portion_element')].elements)
+        self.assertIsNotNone(events[names.index('schemas.get_schema')].cache_hit)
+
+    def test_errors(self):
+        events = []
+        add_hook(events.append)
+        try:
+            with self.assertRaises(ValueError):
+                FrbrUri.parse('bad')
+        finally:
+            remove_hook(events.append)
+
+        self.assertEqual(['FrbrUri.parse'], [e.name for e in events])
+        self.assertIsInstance(events[0].error, ValueError)
+
+    def test_sizes(self):
+        events = []
+        with installed(events.append):
+            FrbrUri.parse(s='/akn/za/act/2009/1')
+            with self.assertRaises(AttributeError):
+                FrbrUri.parse(None)
+
+        self.assertEqual([len('/akn/za/act/2009/1'), None], [e.size for e in events])
+        self.assertIsNone(events[0].error)
+        self.assertIsNotNone(events[1].error)
+
+    def test_failing_hooks(self):
+        def hook(event):
+            raise RuntimeError('broken hook')
+
+        @instrumentation.instrumented('broken', before=lambda args, kwargs: 1 / 0,
+                                      after=lambda result, args, kwargs: 1 / 0)
+        def double(x):
+            return x * 2
+
+        with installed(hook), self.assertLogs('cobalt.instrumentation') as logs:
+            self.assertEqual(4, double(2))
+            self.assertEqual('/akn/za/act/2009/1', FrbrUri.parse('/akn/za/act/2009/1').work_uri())
+            with self.assertRaises(ValueError):
+                FrbrUri.parse('bad')
+
+        self.assertEqual(5, len(logs.records))
+
+    def test_aggregator(self):
+        stats = Aggregator()
+        with installed(stats):
+            for uri in ['/akn/za/act/2009/1', '/akn/za/act/2009/2', 'bad']:
+                try:
+                    FrbrUri.parse(uri)
+                except ValueError:
+                    pass
+            validate(Act())
+            validate(Act())
+
+        snapshot = stats.snapshot()
+        self.assertEqual(3, snapshot['FrbrUri.parse']['count'])
+        self.assertEqual(1, snapshot['FrbrUri.parse']['errors'])
+        self.assertEqual(39, snapshot['FrbrUri.parse']['size'])
+        self.assertEqual(3, sum(snapshot['FrbrUri.parse']['histogram']))
+        self.assertEqual(2, snapshot['schemas.get_schema']['cache_hits'] + snapshot['schemas.get_schema']['cache_misses'])
+        self.assertGreaterEqual(snapshot['schemas.get_schema']['cache_hits'], 1)
+
+        stats.reset()
+        self.assertEqual({}, stats.snapshot())
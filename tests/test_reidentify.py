@@ -0,0 +1,78 @@
+from unittest import TestCase, mock
+
+from cobalt import Act, FrbrUri
+from cobalt.reidentify import UriMapping, reidentify, rewrite_refs
+
+
+class ReidentifyTestCase(TestCase):
+    def setUp(self):
+        self.act = Act()
+        self.act.frbr_uri = '/akn/za-wc011/act/by-law/2010-03-04/2'
+        self.act.expression_date = '2011-01-01'
+        E = self.act.maker
+        self.act.main_content.append(E.section(
+            E.num('1.'),
+            E.content(E.p(
+                E.ref('section 2', href='/akn/za-wc011/act/by-law/2010-03-04/2/~sec_2'),
+                E.ref('the Act', href='/akn/za/act/2009/1'),
+                E.ref('by-law 1', href='/akn/za-wc011/act/by-law/2009/1/eng@2010-01-01/!schedule_1'),
+                E.ref('again', href='/akn/za-wc011/act/by-law/2010-03-04/2/~sec_2'),
+                E.ref('term', href='#term'),
+                eId='sec_1__p_1',
+            )),
+            eId='sec_1',
+        ))
+        self.mapping = UriMapping({'locality': 'cpt'}, where={'locality': 'wc011'})
+
+    def test_uri_mapping(self):
+        uri = self.act.frbr_uri
+        self.assertEqual('/akn/za-cpt/act/by-law/2010-03-04/2', self.mapping(uri).work_uri())
+        self.assertIsNone(self.mapping(FrbrUri.parse('/akn/za/act/2009/1')))
+        self.assertIsNone(UriMapping({'locality': None})(self.act.frbr_uri).locality)
+
+    def test_reidentify(self):
+        report = reidentify(self.act, self.mapping)
+        self.assertEqual({
+            'old_frbr_uri': '/akn/za-wc011/act/by-law/2010-03-04/2/eng@2011-01-01',
+            'frbr_uri': '/akn/za-cpt/act/by-law/2010-03-04/2/eng@2011-01-01',
+            'changed': True,
+            'refs': [
+                ('/akn/za-wc011/act/by-law/2010-03-04/2/~sec_2', '/akn/za-cpt/act/by-law/2010-03-04/2/~sec_2'),
+                ('/akn/za-wc011/act/by-law/2009/1/eng@2010-01-01/!schedule_1',
+                 '/akn/za-cpt/act/by-law/2009/1/eng@2010-01-01/!schedule_1'),
+                ('/akn/za-wc011/act/by-law/2010-03-04/2/~sec_2', '/akn/za-cpt/act/by-law/2010-03-04/2/~sec_2'),
+            ],
+            'skipped': [],
+        }, report)
+        self.assertEqual('/akn/za-cpt/act/by-law/2010-03-04/2/!main',
+                         self.act.meta.identification.FRBRWork.FRBRthis.get('value'))
+        self.assertEqual(['/akn/za-cpt/act/by-law/2010-03-04/2/~sec_2', '/akn/za/act/2009/1',
+                          '/akn/za-cpt/act/by-law/2009/1/eng@2010-01-01/!schedule_1',
+                          '/akn/za-cpt/act/by-law/2010-03-04/2/~sec_2', '#term'],
+                         [ref.get('href') for ref in self.act.root.iter(f'{{{self.act.namespace}}}ref')])
+
+        # nothing more to change
+        report = reidentify(self.act, self.mapping)
+        self.assertFalse(report['changed'])
+        self.assertEqual([], report['refs'])
+
+    def test_mapping_function(self):
+        def renumber(uri):
+            uri.number = '3'
+            return uri.work_uri()
+
+        self.assertEqual([], rewrite_refs(self.act, lambda uri: None))
+        self.assertEqual(4, len(rewrite_refs(self.act, renumber)))
+        self.assertEqual('/akn/za/act/2009/3', list(self.act.root.iter(f'{{{self.act.namespace}}}ref'))[1].get('href'))
+
+    def test_skipped(self):
+        # a lenient parser would accept hrefs that aren't in canonical form
+        parse = FrbrUri.parse
+        self.act.main_content.section.content.p.append(
+            self.act.maker.ref('by-law 2', href='/akn/za-WC011/act/by-law/2009/2'))
+
+        with mock.patch('cobalt.reidentify.FrbrUri.parse', lambda s: parse(s.lower())):
+            report = reidentify(self.act, self.mapping)
+        self.assertEqual(3, len(report['refs']))
+        self.assertEqual(['/akn/za-WC011/act/by-law/2009/2'], report['skipped'])
+        self.assertEqual('/akn/za-WC011/act/by-law/2009/2', self.act.main_content.section.content.p.ref[-1].get('href'))
@@ -0,0 +1,51 @@
+from datetime import date
+from unittest import TestCase
+
+from cobalt import Act, FrbrUri
+from cobalt.resolver import PointInTimeResolver
+
+
+class PointInTimeResolverTestCase(TestCase):
+    def setUp(self):
+        self.resolver = PointInTimeResolver()
+        self.resolver.add_many([
+            {'expression_uri': '/akn/za/act/2009/1/eng@2012-01-01', 'expression_date': '2012-01-01'},
+            {'expression_uri': '/akn/za/act/2009/1/eng@2009-06-01', 'expression_date': '2009-06-01'},
+            {'expression_uri': '/akn/za/act/2009/1/afr@2010-01-01', 'expression_date': '2010-01-01'},
+            {'expression_uri': '/akn/za/act/2010/2/eng@2010-01-01'},
+        ])
+
+    def test_resolve(self):
+        resolve = self.resolver.resolve
+        self.assertEqual(2, len(self.resolver))
+        self.assertIsNone(resolve('/akn/za/act/2009/1', '2009-01-01'))
+        self.assertEqual('/akn/za/act/2009/1/eng@2009-06-01', resolve('/akn/za/act/2009/1', '2009-06-01'))
+        self.assertEqual('/akn/za/act/2009/1/afr@2010-01-01', resolve('/akn/za/act/2009/1', date(2011, 1, 1)))
+        self.assertEqual('/akn/za/act/2009/1/eng@2009-06-01',
+                         resolve(FrbrUri.parse('/akn/za/act/2009/1'), date(2011, 1, 1), language='eng'))
+        self.assertEqual('/akn/za/act/2009/1/eng@2012-01-01', resolve('/akn/za/act/2009/1', '2020-01-01'))
+        self.assertIsNone(resolve('/akn/za/act/2009/1', '2020-01-01', language='fra'))
+        self.assertIsNone(resolve('/akn/za/act/2009/99', '2020-01-01'))
+
+    def test_resolve_many(self):
+        self.assertEqual({
+            '/akn/za/act/2009/1': '/akn/za/act/2009/1/afr@2010-01-01',
+            '/akn/za/act/2010/2': '/akn/za/act/2010/2/eng@2010-01-01',
+        }, self.resolver.resolve_many('2011-01-01'))
+        self.assertEqual({'/akn/za/act/2009/1': '/akn/za/act/2009/1/eng@2009-06-01'},
+                         self.resolver.resolve_many('2009-12-31', ['/akn/za/act/2009/1', '/akn/za/act/2010/2']))
+
+    def test_add_and_remove(self):
+        act = Act()
+        act.frbr_uri = '/akn/za/act/2009/1'
+        act.expression_date = date(2011, 1, 1)
+        self.resolver.add_document(act)
+        self.resolver.add('/akn/za/act/2009/1/eng@2013-01-01')
+        self.assertEqual('/akn/za/act/2009/1/eng@2011-01-01',
+                         self.resolver.resolve('/akn/za/act/2009/1', '2011-06-01', 'eng'))
+        self.assertEqual('/akn/za/act/2009/1/eng@2013-01-01', self.resolver.resolve('/akn/za/act/2009/1', '2014-01-01'))
+
+        self.assertTrue(self.resolver.remove('/akn/za/act/2009/1/eng@2011-01-01'))
+        self.assertFalse(self.resolver.remove('/akn/za/act/2009/1/eng@2011-01-01'))
+        self.assertEqual('/akn/za/act/2009/1/eng@2009-06-01',
+                         self.resolver.resolve('/akn/za/act/2009/1', '2011-06-01', 'eng'))
@@ -0,0 +1,218 @@
+from io import BytesIO
+from unittest import TestCase
+
+from cobalt import Act, AmendmentEvent, CollectionBuilder, Document, OfficialGazette
+from cobalt.schemas import AkomaNtoso30, check_integrity, IntegrityIssue, validate_fragment
+
+
+class IntegrityTestCase(TestCase):
+    def test_empty_act(self):
+        self.assertEqual([], check_integrity(Act()))
+
+    def test_amendments(self):
+        a = Act()
+        a.amendments = [AmendmentEvent(date='2012-02-01', amending_uri='/za/act/1980/10', amending_title="Foo")]
+        self.assertEqual([], check_integrity(a))
+
+    def test_duplicate_eids(self):
+        a = Act()
+        a.body.append(a.make_element('section', {'eId': 'sec_nn_1'}))
+        a.body.append(a.make_element('section', {'eId': 'sec_nn_1'}))
+
+        issues = check_integrity(a)
+        self.assertEqual([IntegrityIssue.DUPLICATE_EID], [i.code for i in issues])
+        self.assertIs(a.body.section[1], issues[0].element)
+
+    def test_duplicate_eids_in_components(self):
+        # each component of a collection has eIds of its own
+        f = BytesIO()
+        with CollectionBuilder(f, '/akn/za/officialGazette/2020-01-01/1') as builder:
+            for i in [1, 2]:
+                a = Act()
+                a.frbr_uri = f'/akn/za/act/2020/{i}'
+                builder.add_component(a, name=f'act_{i}')
+        gazette = OfficialGazette(f.getvalue())
+        self.assertEqual([], check_integrity(gazette))
+
+        act = gazette.components()['act_2']
+        section = gazette.make_element('section', {'eId': 'sec_nn_1'})
+        act.find(f'.//{{{gazette.namespace}}}body').append(section)
+
+        issues = check_integrity(gazette)
+        self.assertEqual(['Duplicate eId: sec_nn_1'], [i.message for i in issues])
+        self.assertIs(section, issues[0].element)
+
+    def test_dangling_source(self):
+        a = Act()
+        a.amendments = [AmendmentEvent(date='2012-02-01', amending_uri='/za/act/1980/10', amending_title="Foo")]
+        a.meta.lifecycle.eventRef.set('source', '#missing')
+
+        issues = check_integrity(a)
+        self.assertEqual([IntegrityIssue.DANGLING_SOURCE], [i.code for i in issues])
+        self.assertEqual('eventRef amendment-2012-02-01 has a dangling source: #missing', issues[0].message)
+
+    def test_dangling_source_in_component(self):
+        a = Act()
+        a.amendments = [AmendmentEvent(date='2012-02-01', amending_uri='/za/act/1980/10', amending_title="Foo")]
+        source = a.meta.lifecycle.eventRef.get('source')
+
+        # the attachment refers to a reference in the main document's meta, not its own
+        schedule = Document()
+        schedule.meta.remove(schedule.meta.references)
+        schedule.meta.append(schedule.maker.lifecycle(
+            schedule.maker.eventRef(date='2012-02-01', eId='att-amendment', source=source, type='amendment'),
+            source='#cobalt'))
+        E = a.maker
+        a.main.append(E.attachments(E.attachment(schedule.main, eId='att_1')))
+
+        issues = check_integrity(a)
+        self.assertEqual([IntegrityIssue.DANGLING_SOURCE], [i.code for i in issues])
+        self.assertEqual(f'eventRef att-amendment has a dangling source: {source}', issues[0].message)
+
+    def test_missing_frbrthis(self):
+        a = Act()
+        a.meta.identification.FRBRWork.FRBRthis.set('value', '')
+
+        issues = check_integrity(a)
+        self.assertEqual([IntegrityIssue.MISSING_FRBRTHIS], [i.code for i in issues])
+        self.assertIs(a.main, issues[0].element)
+
+
+class ValidateFragmentTestCase(TestCase):
+    def setUp(self):
+        self.a = Act()
+        self.a.frbr_uri = '/akn/za/act/2009/1'
+
+    def test_valid(self):
+        self.assertEqual((True, []), validate_fragment(self.a, self.a.body.section.content.p))
+        self.assertEqual((True, []), validate_fragment(self.a, self.a.body.section))
+        self.assertEqual((True, []), validate_fragment(self.a, self.a.root))
+
+    def test_empty_attachment(self):
+        attachment = self.a.maker.attachment(eId='att_1')
+        self.a.main.append(self.a.maker.attachments(attachment))
+
+        validates, errors = validate_fragment(self.a, attachment)
+        self.assertFalse(validates)
+        self.assertEqual(['attachment has no document element'], [e.message for e in errors])
+        self.assertIs(attachment, errors[0].element)
+
+    def test_invalid(self):
+        foo = self.a.make_element('foo')
+        self.a.body.section.content.append(foo)
+
+        validates, errors = validate_fragment(self.a, self.a.body.section.content.p)
+        self.assertFalse(validates)
+        self.assertEqual(1, len(errors))
+        self.assertEqual(self.a.root.getroottree().getpath(foo), errors[0].path)
+        self.assertIs(foo, errors[0].element)
+
+    def test_strict(self):
+        section = self.a.body.section
+        section.content.append(self.a.make_element('p', {'eId': 'sec_nn_1__p_1'}))
+
+        self.assertEqual((True, []), validate_fragment(self.a, section))
+        validates, errors = validate_fragment(self.a, section, strict=True)
+        self.assertFalse(validates)
+        self.assertIs(section.content.p[1], errors[0].element)
+
+    def test_attachment(self):
+        a = Act("""<akomaNtoso xmlns="http://docs.oasis-open.org/legaldocml/ns/akn/3.0">
+  <act name="act">
+    <meta/>
+    <body/>
+    <attachments>
+      <attachment eId="att_1">
+        <doc name="schedule">
+          <meta>
+            <identification source="#cobalt">
+              <FRBRWork>
+                <FRBRthis value="/akn/za/act/2009/1/!schedule1"/>
+                <FRBRuri value="/akn/za/act/2009/1"/>
+                <FRBRdate date="2009-01-01" name="Generation"/>
+                <FRBRauthor href=""/>
+                <FRBRcountry value="za"/>
+              </FRBRWork>
+              <FRBRExpression>
+                <FRBRthis value="/akn/za/act/2009/1/eng@2009-01-01/!schedule1"/>
+                <FRBRuri value="/akn/za/act/2009/1/eng@2009-01-01"/>
+                <FRBRdate date="2009-01-01" name="Generation"/>
+                <FRBRauthor href=""/>
+                <FRBRlanguage language="eng"/>
+              </FRBRExpression>
+              <FRBRManifestation>
+                <FRBRthis value="/akn/za/act/2009/1/eng@2009-01-01/!schedule1"/>
+                <FRBRuri value="/akn/za/act/2009/1/eng@2009-01-01"/>
+                <FRBRdate date="2009-01-01" name="Generation"/>
+                <FRBRauthor href=""/>
+              </FRBRManifestation>
+            </identification>
+          </meta>
+          <mainBody>
+            <p>text</p>
+          </mainBody>
+        </doc>
+      </attachment>
+    </attachments>
+  </act>
+</akomaNtoso>""")
+        attachment = a.main.attachments.attachment
+        # the main document itself is invalid, but the attachment is fine
+        self.assertEqual((True, []), validate_fragment(a, attachment))
+        self.assertEqual((True, []), validate_fragment(a, attachment.doc.mainBody.p))
+
+        attachment.doc.mainBody.append(a.make_element('foo'))
+        validates, errors = validate_fragment(a, attachment.doc.mainBody.p)
+        self.assertFalse(validates)
+        self.assertIs(attachment.doc.mainBody.foo, errors[0].element)
+
+
+class ContentModelTestCase(TestCase):
+    def test_content_model(self):
+        model = AkomaNtoso30.content_model('act')
+        self.assertEqual(['meta', 'coverPage', 'preface', 'preamble', 'body', 'conclusions', 'attachments',
+                          'components'], sorted(model.children, key=lambda c: model.order[c]))
+        self.assertEqual({'contains', 'name'}, model.attributes)
+        self.assertEqual({'name'}, model.required_attributes)
+
+        model = AkomaNtoso30.content_model('section')
+        self.assertIn('subsection', model.children)
+        self.assertIn('eId', model.attributes)
+        self.assertIn('{http://www.w3.org/XML/1998/namespace}lang', model.attributes)
+        self.assertEqual(model.order['num'], model.order['heading'])
+        self.assertLess(model.order['intro'], model.order['subsection'])
+        self.assertLess(model.order['subsection'], model.order['wrapUp'])
+
+        self.assertEqual(set(), AkomaNtoso30.content_model('eventRef').children)
+        self.assertIsNone(AkomaNtoso30.content_model('foo'))
+
+    def test_insertion_point(self):
+        a = Act()
+        work = a.meta.identification.FRBRWork
+        self.assertIs(work.FRBRcountry, AkomaNtoso30.insertion_point(work, 'FRBRsubtype'))
+        self.assertIs(work.FRBRnumber, AkomaNtoso30.insertion_point(work, 'FRBRname'))
+        self.assertIs(a.meta, AkomaNtoso30.insertion_point(a.main, 'preface'))
+
+        work = a.make_element('FRBRWork')
+        work.append(a.make_element('FRBRuri'))
+        self.assertIsNone(AkomaNtoso30.insertion_point(work, 'FRBRthis'))
+        self.assertIs(a.meta.identification, AkomaNtoso30.insertion_point(a.meta, 'lifecycle'))
+
+    def test_ensure_element(self):
+        a = Act()
+        a.ensure_element('meta.publication')
+        a.ensure_element('meta.lifecycle')
+        a.ensure_element('FRBRsubtype', at=a.meta.identification.FRBRWork).set('value', 'by-law')
+        self.assertEqual(['identification', 'publication', 'lifecycle', 'references'],
+                         [c.tag.split('}')[1] for c in a.meta.iterchildren()])
+        self.assertEqual('FRBRnumber', a.meta.identification.FRBRWork.FRBRsubtype.getnext().tag.split('}')[1])
+
+    def test_ensure_element_in_main(self):
+        a = Act()
+        preface = a.ensure_element('preface')
+        self.assertIs(preface, a.main.preface)
+        self.assertEqual('meta', preface.getprevious().tag.split('}')[1])
+        self.assertIs(preface, a.ensure_element('preface'))
+
+        with self.assertRaises(ValueError):
+            a.ensure_element('meta.foo.bar')
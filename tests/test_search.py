@@ -0,0 +1,104 @@
+import shutil
+import tempfile
+from datetime import date
+from unittest import TestCase
+
+from lxml import etree
+
+from cobalt import Act, FrbrUri
+from cobalt.search import SearchIndex, tokenize
+
+
+def make_act(frbr_uri, sections):
+    act = Act()
+    act.frbr_uri = frbr_uri
+    act.expression_date = date(2020, 1, 1)
+    for child in act.body.getchildren():
+        act.body.remove(child)
+    for i, text in enumerate(sections, 1):
+        act.body.append(etree.fromstring(
+            f'<section xmlns="{act.namespace}" eId="sec_{i}"><num>{i}.</num>'
+            f'<content><p>{text}</p></content></section>'))
+    return act
+
+
+class SearchIndexTestCase(TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.index = SearchIndex(self.path)
+        self.act1 = make_act('/akn/za/act/2009/1', [
+            'Animal health and the vaccination of animals.',
+            'Health inspectors may inspect any animal.',
+            'Nothing in this section about that.',
+        ])
+        self.act2 = make_act('/akn/za/act/2010/2', [
+            'The health of animal owners.',
+            'Vaccines for animal health, animal health, animal health.',
+        ])
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.path)
+
+    def hits(self, query):
+        return [(h.frbr_uri, h.eid) for h in self.index.search(query)]
+
+    def test_tokenize(self):
+        self.assertEqual(['animal', 'health', 'act', '2009'], tokenize('Animal-Health Act, 2009.'))
+
+    def test_search(self):
+        self.index.add(self.act1)
+        self.index.add(self.act2)
+
+        self.assertEqual([
+            ('/akn/za/act/2010/2/eng@2020-01-01', 'sec_2'),
+            ('/akn/za/act/2010/2/eng@2020-01-01', 'sec_1'),
+            ('/akn/za/act/2009/1/eng@2020-01-01', 'sec_2'),
+            ('/akn/za/act/2009/1/eng@2020-01-01', 'sec_1'),
+        ], self.hits('animal health'))
+        self.assertEqual([], self.hits('animal missing'))
+        self.assertEqual([], self.hits(''))
+
+        hit = self.index.search('inspectors')[0]
+        self.assertEqual('main', hit.component)
+        self.assertGreater(hit.score, 0)
+
+    def test_phrase(self):
+        self.index.add_many([self.act1, self.act2])
+        self.assertEqual([('/akn/za/act/2010/2/eng@2020-01-01', 'sec_2'), ('/akn/za/act/2009/1/eng@2020-01-01', 'sec_1')],
+                         self.hits('"animal health"'))
+        self.assertEqual([('/akn/za/act/2010/2/eng@2020-01-01', 'sec_2')], self.hits('"animal health" vaccines'))
+        self.assertEqual([], self.hits('"health vaccines"'))
+
+    def test_remove_and_merge(self):
+        self.index.add(self.act1)
+        self.index.add(self.act2)
+        self.assertIn('/akn/za/act/2009/1/eng@2020-01-01', self.index)
+
+        self.assertTrue(self.index.remove(FrbrUri.parse('/akn/za/act/2009/1/eng@2020-01-01')))
+        self.assertFalse(self.index.remove('/akn/za/act/2009/1/eng@2020-01-01'))
+        self.assertEqual(['/akn/za/act/2010/2/eng@2020-01-01'], self.index.expressions())
+        self.assertEqual([('/akn/za/act/2010/2/eng@2020-01-01', 'sec_2'), ('/akn/za/act/2010/2/eng@2020-01-01', 'sec_1')],
+                         self.hits('animal health'))
+
+        before = self.index.search('animal health')
+        self.index.merge()
+        self.assertEqual(1, len(self.index.segments))
+        after = self.index.search('"animal health"')
+        self.assertEqual([(h.eid, h.score) for h in before][:1], [(h.eid, h.score) for h in after])
+
+    def test_replace_and_reopen(self):
+        self.index.add(self.act1)
+        self.index.add(make_act('/akn/za/act/2009/1', ['Only plants.']))
+        self.assertEqual([], self.hits('animal'))
+        self.index.close()
+
+        self.index = SearchIndex(self.path)
+        self.assertEqual([('/akn/za/act/2009/1/eng@2020-01-01', 'sec_1')], self.hits('plants'))
+
+    def test_replace_in_batch(self):
+        self.index.add_many([self.act1, self.act2, make_act('/akn/za/act/2009/1', ['Only plants.'])])
+        self.assertEqual(['/akn/za/act/2009/1/eng@2020-01-01', '/akn/za/act/2010/2/eng@2020-01-01'],
+                         sorted(self.index.expressions()))
+        self.assertEqual([], self.hits('inspectors'))
+        self.assertEqual([('/akn/za/act/2009/1/eng@2020-01-01', 'sec_1')], self.hits('plants'))
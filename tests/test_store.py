@@ -0,0 +1,98 @@
+import os
+import shutil
+import tempfile
+from datetime import date
+from unittest import TestCase
+
+from cobalt import Act, FrbrUri
+from cobalt.store import DocumentStore
+
+
+def make_act(frbr_uri, expression_date, title='Test Act'):
+    act = Act()
+    act.frbr_uri = frbr_uri
+    act.expression_date = expression_date
+    act.title = title
+    return act
+
+
+class DocumentStoreTestCase(TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.store = DocumentStore(self.path)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.path)
+
+    def blobs(self):
+        return sum(len(files) for _, _, files in os.walk(os.path.join(self.path, 'blobs')))
+
+    def test_put_and_get(self):
+        uri = self.store.put(make_act('/akn/za/act/2009/1', date(2010, 1, 1)))
+        self.assertEqual('/akn/za/act/2009/1/eng@2010-01-01', uri)
+        self.assertEqual(1, len(self.store))
+        self.assertIn(uri, self.store)
+
+        act = self.store.get(uri)
+        self.assertIsInstance(act, Act)
+        self.assertEqual('Test Act', act.title)
+        self.assertEqual(act.to_xml(), self.store.get_xml(FrbrUri.parse(uri)))
+
+        info = self.store.metadata(uri)
+        self.assertEqual('za', info['country'])
+        self.assertEqual('act', info['document_type'])
+        self.assertEqual('2010-01-01', info['expression_date'])
+        self.assertEqual(['main'], info['components'])
+
+        self.assertIsNone(self.store.get('/akn/za/act/2009/2/eng@2010-01-01'))
+
+    def test_work_uri(self):
+        self.store.put_many([
+            make_act('/akn/za/act/2009/1', date(2010, 1, 1)),
+            make_act('/akn/za/act/2009/1', date(2012, 1, 1), 'Amended Act'),
+            make_act('/akn/za/act/2009/2', date(2011, 1, 1)),
+        ])
+        self.assertEqual('Amended Act', self.store.get('/akn/za/act/2009/1').title)
+        self.assertEqual(['/akn/za/act/2009/1/eng@2010-01-01', '/akn/za/act/2009/1/eng@2012-01-01'],
+                         [x['expression_uri'] for x in self.store.expressions('/akn/za/act/2009/1')])
+        self.assertIsNone(self.store.metadata('/akn/za/act/2009/1', language='fra'))
+
+    def test_find(self):
+        self.store.put_many([
+            make_act('/akn/za/act/2009/1', date(2010, 1, 1)),
+            make_act('/akn/za-cpt/act/by-law/2009/1', date(2010, 1, 1)),
+        ])
+        self.assertEqual(['/akn/za-cpt/act/by-law/2009/1/eng@2010-01-01'],
+                         [x['expression_uri'] for x in self.store.find(locality='cpt')])
+        self.assertEqual(['/akn/za/act/2009/1/eng@2010-01-01'],
+                         [x['expression_uri'] for x in self.store.find(country='za', locality=None)])
+        self.assertEqual(2, len(self.store.find()))
+        with self.assertRaises(ValueError):
+            self.store.find(blob='x')
+
+    def test_replace_and_delete(self):
+        act = make_act('/akn/za/act/2009/1', date(2010, 1, 1))
+        self.store.put(act)
+        # identical documents share a blob
+        self.store.put(make_act('/akn/za/act/2009/1', date(2010, 1, 1)))
+        self.assertEqual(1, self.blobs())
+
+        act.title = 'New title'
+        self.store.put(act)
+        self.assertEqual(1, len(self.store))
+        self.assertEqual(1, self.blobs())
+        self.assertEqual('New title', self.store.get('/akn/za/act/2009/1/eng@2010-01-01').title)
+
+        self.assertTrue(self.store.delete('/akn/za/act/2009/1/eng@2010-01-01'))
+        self.assertFalse(self.store.delete('/akn/za/act/2009/1/eng@2010-01-01'))
+        self.assertEqual(0, len(self.store))
+        self.assertEqual(0, self.blobs())
+
+    def test_replace_in_batch(self):
+        uris = self.store.put_many(make_act('/akn/za/act/2009/1', date(2010, 1, 1), title) for title in ['Old', 'New'])
+        self.assertEqual(['/akn/za/act/2009/1/eng@2010-01-01'] * 2, uris)
+        self.assertEqual(1, len(self.store))
+        # no blob is left without a document
+        self.assertEqual(1, self.blobs())
+        self.assertEqual('New', self.store.get('/akn/za/act/2009/1/eng@2010-01-01').title)
@@ -0,0 +1,216 @@
+import os
+import tempfile
+from io import StringIO
+from unittest import TestCase
+
+from lxml import etree
+
+from cobalt import Act, CollectionBuilder, Document, FrbrUri, LazyDocument, OfficialGazette
+from cobalt.streaming import extract_portion
+
+
+class LazyDocumentTestCase(TestCase):
+    def setUp(self):
+        fd, self.fname = tempfile.mkstemp(suffix='.xml')
+        with os.fdopen(fd, 'wb') as f:
+            with CollectionBuilder(f, '/akn/za/officialGazette/2020-01-31/123', xml_declaration=True) as builder:
+                for i in range(3):
+                    doc = Document()
+                    doc.mainBody.append(doc.make_element('p'))
+                    doc.mainBody.p._setText(f'Notice {i + 1}')
+                    builder.add_component(doc, name=f'notice_{i + 1}')
+                builder.add_component(Act())
+
+    def tearDown(self):
+        os.unlink(self.fname)
+
+    def test_components(self):
+        lazy = LazyDocument(self.fname)
+        self.assertEqual('officialGazette', lazy.document_type)
+        self.assertEqual(['main', 'notice_1', 'notice_2', 'notice_3', 'component_4'], lazy.component_names())
+
+        notice = lazy.get_component('notice_2')
+        self.assertIsInstance(notice, Document)
+        self.assertEqual('Notice 2', notice.main.mainBody.p.text)
+        self.assertEqual('/akn/za/officialGazette/2020-01-31/123/!notice_2',
+                         notice.meta.identification.FRBRWork.FRBRthis.get('value'))
+
+        self.assertIsInstance(lazy.get_component('component_4'), Act)
+        self.assertIsInstance(lazy.get_component('main'), OfficialGazette)
+
+        with self.assertRaises(KeyError):
+            lazy.get_component('notice_99')
+
+    def test_work_component(self):
+        lazy = LazyDocument(self.fname)
+        uri = '/akn/za/officialGazette/2020-01-31/123/!notice_3'
+        for name in ['!notice_3', uri, FrbrUri.parse(uri)]:
+            self.assertEqual('Notice 3', lazy.get_component(name).main.mainBody.p.text)
+
+    def test_sidecar_index(self):
+        f = StringIO()
+        LazyDocument(self.fname).save_index(f)
+        f.seek(0)
+
+        lazy = LazyDocument.load(self.fname, f)
+        self.assertEqual('Notice 1', lazy.get_component('notice_1').main.mainBody.p.text)
+
+    def test_matches_components(self):
+        act = Act(xml="""<?xml version="1.0" encoding="UTF-8"?>
+<akn:akomaNtoso xmlns:akn="http://docs.oasis-open.org/legaldocml/ns/akn/3.0">
+  <akn:act name="act">
+    <akn:meta>
+      <akn:identification source="#cobalt">
+        <akn:FRBRWork><akn:FRBRthis value="/akn/na/act/1977/25/!main"/></akn:FRBRWork>
+      </akn:identification>
+    </akn:meta>
+    <akn:body/>
+    <akn:attachments>
+      <akn:attachment eId="att_1">
+        <akn:doc name="schedule">
+          <akn:meta>
+            <akn:identification source="#cobalt">
+              <akn:FRBRWork><akn:FRBRthis value="/akn/na/act/1977/25/!schedule-A"/></akn:FRBRWork>
+            </akn:identification>
+          </akn:meta>
+          <akn:mainBody><akn:p>Schedule A</akn:p></akn:mainBody>
+        </akn:doc>
+      </akn:attachment>
+    </akn:attachments>
+  </akn:act>
+</akn:akomaNtoso>""")
+        lazy = LazyDocument(act.to_xml())
+        self.assertEqual(list(act.components()), lazy.component_names())
+        self.assertEqual(act.components()['schedule-A'].doc.mainBody.p.text,
+                         lazy.get_component('schedule-A').main.mainBody.p.text)
+
+    def test_conflicting_namespace_prefixes(self):
+        def component(n, uri):
+            return f"""<component eId="cmp_{n}" xmlns:x="{uri}">
+        <doc name="notice" x:note="{n}">
+          <meta>
+            <identification source="#cobalt">
+              <FRBRWork><FRBRthis value="/akn/za/officialGazette/2020-01-31/1/!notice_{n}"/></FRBRWork>
+            </identification>
+          </meta>
+          <mainBody><p>Notice {n}</p></mainBody>
+        </doc>
+      </component>"""
+
+        xml = f"""<akomaNtoso xmlns="http://docs.oasis-open.org/legaldocml/ns/akn/3.0">
+  <officialGazette name="officialGazette">
+    <meta>
+      <identification source="#cobalt">
+        <FRBRWork><FRBRthis value="/akn/za/officialGazette/2020-01-31/1/!main"/></FRBRWork>
+      </identification>
+    </meta>
+    <collectionBody>
+      {component(1, 'urn:example:one')}
+      {component(2, 'urn:example:two')}
+    </collectionBody>
+  </officialGazette>
+</akomaNtoso>""".encode('utf-8')
+        lazy = LazyDocument(xml)
+
+        # each component is wrapped with its own declaration of the x prefix
+        self.assertEqual('1', lazy.get_component('notice_1').main.get('{urn:example:one}note'))
+        self.assertEqual('2', lazy.get_component('notice_2').main.get('{urn:example:two}note'))
+
+    def test_attachment_headings(self):
+        # the heading of an attachment comes before its document element, and isn't a component
+        xml = """<akomaNtoso xmlns="http://docs.oasis-open.org/legaldocml/ns/akn/3.0">
+  <act name="act">
+    <meta>
+      <identification source="#cobalt">
+        <FRBRWork><FRBRthis value="/akn/za/act/2009/1/!main"/></FRBRWork>
+      </identification>
+    </meta>
+    <body><section eId="sec_1"><num>1</num></section></body>
+    <attachments>
+      <attachment eId="att_1">
+        <heading>Schedule</heading>
+        <subheading>Forms</subheading>
+        <doc name="schedule">
+          <meta>
+            <identification source="#cobalt">
+              <FRBRWork><FRBRthis value="/akn/za/act/2009/1/!schedule_1"/></FRBRWork>
+            </identification>
+          </meta>
+          <mainBody><paragraph eId="att_1__para_1"><num>1</num></paragraph></mainBody>
+        </doc>
+      </attachment>
+    </attachments>
+  </act>
+</akomaNtoso>""".encode('utf-8')
+        lazy = LazyDocument(xml)
+
+        self.assertEqual(['main', 'schedule_1'], lazy.component_names())
+        schedule = lazy.get_component('schedule_1')
+        self.assertEqual('doc', schedule.document_type)
+        self.assertEqual('att_1__para_1', schedule.main.mainBody.paragraph.get('eId'))
+
+        element, meta = extract_portion(xml, 'att_1__para_1', 'schedule_1')
+        self.assertEqual('att_1__para_1', element.get('eId'))
+        self.assertEqual('/akn/za/act/2009/1/!schedule_1', meta.identification.FRBRWork.FRBRthis.get('value'))
+
+
+class ExtractPortionTestCase(TestCase):
+    xml = """<?xml version="1.0" encoding="UTF-8"?>
+<akomaNtoso xmlns="http://docs.oasis-open.org/legaldocml/ns/akn/3.0">
+  <act name="act">
+    <meta>
+      <identification source="#cobalt">
+        <FRBRWork><FRBRthis value="/akn/za/act/2009/1/!main"/></FRBRWork>
+      </identification>
+    </meta>
+    <preamble><p>Preamble</p></preamble>
+    <body>
+      <chapter eId="chp_1"><num>1</num></chapter>
+      <chapter eId="chp_2"><num>2</num><section eId="chp_2__sec_1"><num>1</num></section></chapter>
+      <chapter eId="chp_3"><num>3</num></chapter>
+      <chapter eId="chp_4"><num>4</num></chapter>
+    </body>
+    <attachments>
+      <attachment eId="att_1">
+        <doc name="schedule">
+          <meta>
+            <identification source="#cobalt">
+              <FRBRWork><FRBRthis value="/akn/za/act/2009/1/!schedule1"/></FRBRWork>
+            </identification>
+          </meta>
+          <mainBody><chapter eId="chp_2"><num>Schedule 2</num></chapter></mainBody>
+        </doc>
+      </attachment>
+    </attachments>
+  </act>
+</akomaNtoso>"""
+
+    def test_extract_portion(self):
+        act = Act(self.xml)
+        elem, meta = extract_portion(self.xml.encode('utf-8'), 'chp_2__sec_1')
+        self.assertEqual(etree.tostring(act.get_portion_element('chp_2__sec_1'), with_tail=False), etree.tostring(elem))
+        self.assertEqual('/akn/za/act/2009/1/!main', meta.identification.FRBRWork.FRBRthis.get('value'))
+
+        elem, meta = extract_portion(self.xml.encode('utf-8'), 'preamble')
+        self.assertEqual('Preamble', elem.p.text)
+
+        self.assertEqual((None, None), extract_portion(self.xml.encode('utf-8'), 'chp_99'))
+
+    def test_component(self):
+        elem, meta = extract_portion(self.xml.encode('utf-8'), 'chp_2', component='!schedule1')
+        self.assertEqual('Schedule 2', elem.num.text)
+        self.assertEqual('/akn/za/act/2009/1/!schedule1', meta.identification.FRBRWork.FRBRthis.get('value'))
+
+        elem, meta = extract_portion(self.xml.encode('utf-8'), 'chp_2', component='main')
+        self.assertEqual('2', elem.num.text)
+
+    def test_range(self):
+        elems, meta = extract_portion(self.xml.encode('utf-8'), 'chp_2->chp_3')
+        self.assertEqual(['chp_2', 'chp_3'], [e.get('eId') for e in elems])
+        self.assertEqual((None, None), extract_portion(self.xml.encode('utf-8'), 'chp_2->chp_99'))
+
+    def test_stops_early(self):
+        # parsing must stop once the portion has been read, so a broken tail isn't noticed
+        xml = self.xml.split('<chapter eId="chp_3">')[0].encode('utf-8') + b'<broken'
+        elem, meta = extract_portion(xml, 'chp_2')
+        self.assertEqual('2', elem.num.text)
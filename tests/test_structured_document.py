@@ -1,7 +1,11 @@
+from io import BytesIO
 from unittest import TestCase
-from datetime import date
+from datetime import date, datetime
+
+from lxml import etree
 
 from cobalt import Act, datestring
+from cobalt.akn import parsedate, NULL_DATE
 from cobalt.schemas import assert_validates
 
 
@@ -87,6 +91,26 @@ class StructuredDocumentTestCase(TestCase):
         self.assertEqual(datestring(a.manifestation_date), '2012-01-02')
         self.assertIsInstance(a.manifestation_date, date)
 
+    def test_parsedate(self):
+        self.assertEqual(date(2012, 1, 2), parsedate('2012-01-02'))
+        self.assertEqual(date(2012, 3, 1), parsedate('2012-03'))
+        self.assertEqual(date(2012, 1, 1), parsedate('2012'))
+        self.assertIsNone(parsedate(NULL_DATE))
+        # falls back to iso8601
+        self.assertEqual(date(2012, 1, 2), parsedate('2012-01-02T10:11:12Z'))
+        self.assertEqual(date(2012, 1, 2), parsedate('20120102'))
+        with self.assertRaises(ValueError):
+            parsedate('2012-02-31')
+        with self.assertRaises(ValueError):
+            parsedate('foo')
+
+    def test_datestring(self):
+        self.assertEqual('2012-01-02', datestring(date(2012, 1, 2)))
+        self.assertEqual('2012-01-02', datestring(datetime(2012, 1, 2, 10, 11)))
+        self.assertEqual('0900-01-02', datestring(date(900, 1, 2)))
+        self.assertEqual('2012', datestring('2012'))
+        self.assertEqual(NULL_DATE, datestring(None))
+
     def test_language(self):
         a = Act()
         a.language = 'fre'
@@ -229,6 +253,46 @@ class StructuredDocumentTestCase(TestCase):
           </act>
         </akomaNtoso>""")
 
+    def test_iter_xml(self):
+        a = Act("""<akomaNtoso xmlns="http://docs.oasis-open.org/legaldocml/ns/akn/3.0" xmlns:x="urn:x">
+  <!-- a comment -->
+  <act name="act">
+    <meta/>
+    <body>text <b>bold</b> tail &gt; <x:foo x:a="1"/>
+      <section eId="sec_1"><content><p>text &amp; <i>i</i> more</p></content></section>
+      <section eId="sec_2"><content xmlns:y="urn:y"><y:p>text &amp; <i>i</i> more 😀</y:p></content></section>
+    </body>
+  </act>
+</akomaNtoso>""")
+        for depth in range(6):
+            self.assertEqual(a.to_xml(), b''.join(a.iter_xml(depth=depth)))
+            self.assertEqual(a.to_xml(encoding='ascii', xml_declaration=True),
+                             b''.join(a.iter_xml(depth=depth, encoding='ascii', xml_declaration=True)))
+
+            indented = etree.fromstring(a.to_xml())
+            etree.indent(indented)
+            self.assertEqual(etree.tostring(indented, encoding='utf-8'), b''.join(a.iter_xml(depth=depth, pretty=True)))
+
+        chunks = list(a.iter_xml(chunk_size=10))
+        self.assertEqual({10}, set(len(c) for c in chunks[:-1]))
+        self.assertEqual(a.to_xml(), b''.join(chunks))
+
+    def test_write_to(self):
+        a = Act()
+        f = BytesIO()
+        a.write_to(f)
+        self.assertEqual(a.to_xml(), f.getvalue())
+
+    def test_memory_estimate(self):
+        a = Act()
+        estimate = a.memory_estimate()
+        self.assertGreater(estimate, len(a.to_xml()))
+
+        # each section adds an element, an attribute and a text node
+        for i in range(100):
+            a.body.append(a.maker.section('x' * 10, eId=f'sec_{i}'))
+        self.assertEqual(estimate + 100 * (128 + 264 + 136 + 10), a.memory_estimate())
+
     def test_add_number(self):
         """ When adding an FRBRnumber element to a document that doesn't already have one, it
         must come after subtype.
@@ -0,0 +1,84 @@
+from io import BytesIO
+from unittest import TestCase
+
+from lxml import etree
+
+from cobalt import Act, CollectionBuilder, OfficialGazette
+from cobalt.streaming import text_chunks_from_file
+
+from . import fixtures
+
+
+class TextChunksTestCase(TestCase):
+    maxDiff = None
+
+    def setUp(self):
+        self.act = Act()
+        self.act.frbr_uri = '/akn/za/act/2009/1'
+        for child in self.act.body.getchildren():
+            self.act.body.remove(child)
+        self.act.main.insert(1, etree.fromstring(
+            '<preamble xmlns="http://docs.oasis-open.org/legaldocml/ns/akn/3.0"><p>WHEREAS   things</p></preamble>'))
+        self.act.body.append(etree.fromstring("""
+<chapter xmlns="http://docs.oasis-open.org/legaldocml/ns/akn/3.0" eId="chp_1">
+  <num>1</num>
+  <heading>Introduction<authorialNote marker="1" eId="chp_1__authorialNote_1"><p>A note</p></authorialNote></heading>
+  <section eId="chp_1__sec_1">
+    <num>1.</num>
+    <heading>Definitions with <i>emphasis</i></heading>
+    <content>
+      <p>In this Act:<remark status="editorial">[a remark]</remark> <!-- comment -->words</p>
+      <blockContainer eId="chp_1__sec_1__blockContainer_1">
+        <p>Insert the following:</p>
+        <embeddedStructure>
+          <section eId="chp_1__sec_1__quoted_sec_1"><num>99.</num></section>
+        </embeddedStructure>
+      </blockContainer>
+    </content>
+  </section>
+  <section eId="chp_1__sec_2"><num>2.</num></section>
+</chapter>
+"""))
+
+    def test_text_chunks(self):
+        self.assertEqual([
+            ('main', 'chp_1__sec_1', '1. Definitions with emphasis In this Act: words Insert the following: 99.'),
+            ('main', 'chp_1__sec_2', '2.'),
+            ('main', 'chp_1', '1 Introduction'),
+            ('main', None, 'WHEREAS things'),
+        ], list(self.act.text_chunks()))
+
+    def test_options(self):
+        chunks = list(self.act.text_chunks(normalize=False, exclude=['meta']))
+        self.assertEqual(('main', 'chp_1__sec_2', '2.'), chunks[1])
+        self.assertEqual('\n  1\n  IntroductionA note\n  \n  \n', chunks[2][2])
+
+        chunks = list(self.act.text_chunks(normalize=str.upper))
+        self.assertEqual(('main', None, 'WHEREAS   THINGS'), chunks[3])
+
+    def test_text_chunks_from_file(self):
+        self.assertEqual(list(self.act.text_chunks()), list(text_chunks_from_file(self.act.to_xml())))
+        self.assertEqual(list(self.act.text_chunks(normalize=False)),
+                         list(text_chunks_from_file(self.act.to_xml(), normalize=False)))
+
+    def test_components(self):
+        act = fixtures.attachments_act()
+        chunks = list(act.text_chunks())
+
+        self.assertEqual([
+            ('main', 'section_1', ''),
+            ('schedule-A', 'paragraph_1', 'This is the content of the Schedule!'),
+            ('schedule-XXX', 'paragraph_1', 'This is the content of the Schedule!'),
+        ], chunks)
+        self.assertEqual(sorted(chunks), sorted(text_chunks_from_file(act.to_xml())))
+
+    def test_nested_attachments(self):
+        # the attachments of an act embedded in a gazette aren't components of the gazette
+        f = BytesIO()
+        with CollectionBuilder(f, '/akn/na/officialGazette/1977-01-01/1') as builder:
+            builder.add_component(fixtures.attachments_act(), name='act_1')
+        gazette = OfficialGazette(f.getvalue())
+
+        chunks = list(gazette.text_chunks())
+        self.assertEqual(sorted(chunks), sorted(text_chunks_from_file(gazette.to_xml())))
+        self.assertNotIn('paragraph_1', [eid for _, eid, _ in chunks])
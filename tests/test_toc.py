@@ -0,0 +1,90 @@
+from unittest import TestCase
+
+from lxml import etree
+
+from cobalt import Act, AmendmentEvent
+from cobalt.streaming import toc_from_file
+
+from . import fixtures
+
+
+class TOCTestCase(TestCase):
+    def setUp(self):
+        self.act = Act()
+        self.act.frbr_uri = '/akn/za/act/2009/1'
+        for child in self.act.body.getchildren():
+            self.act.body.remove(child)
+        self.act.body.append(etree.fromstring("""
+<chapter xmlns="http://docs.oasis-open.org/legaldocml/ns/akn/3.0" eId="chp_1">
+  <num>1</num>
+  <heading>Introduction<authorialNote marker="1" eId="chp_1__authorialNote_1"><p>A note</p></authorialNote></heading>
+  <section eId="chp_1__sec_1">
+    <num>1.</num>
+    <heading>Definitions with <i>emphasis</i></heading>
+    <content>
+      <p>In this Act:</p>
+      <blockContainer eId="chp_1__sec_1__blockContainer_1">
+        <p>Insert the following:</p>
+        <embeddedStructure>
+          <section eId="chp_1__sec_1__quoted_sec_1"><num>99.</num></section>
+        </embeddedStructure>
+      </blockContainer>
+    </content>
+  </section>
+  <section eId="chp_1__sec_2"><num>2.</num></section>
+</chapter>
+"""))
+
+    def test_toc(self):
+        toc = self.act.toc()
+        self.assertEqual(['main'], list(toc))
+        self.assertEqual([{
+            'type': 'chapter', 'eid': 'chp_1', 'num': '1', 'heading': 'Introduction',
+            'children': [
+                {'type': 'section', 'eid': 'chp_1__sec_1', 'num': '1.', 'heading': 'Definitions with emphasis',
+                 'children': []},
+                {'type': 'section', 'eid': 'chp_1__sec_2', 'num': '2.', 'heading': None, 'children': []},
+            ],
+        }], [e.to_dict() for e in toc['main']])
+
+    def test_cache(self):
+        toc = self.act.toc()
+        self.assertIs(toc, self.act.toc())
+
+        self.act.body.chapter.section[1].num._setText('3.')
+        self.assertEqual('2.', self.act.toc()['main'][0].children[1].num)
+        self.act.invalidate_toc()
+        self.assertEqual('3.', self.act.toc()['main'][0].children[1].num)
+
+    def test_cache_invalidated_by_changes(self):
+        toc = self.act.toc()
+        self.act.frbr_uri = '/akn/za/act/2009/2'
+        self.assertIsNot(toc, self.act.toc())
+
+        toc = self.act.toc()
+        self.act.add_amendment(AmendmentEvent(date='2012-02-01', amending_uri='/akn/za/act/2012/1',
+                                                 amending_title='Amendment Act'))
+        self.assertIsNot(toc, self.act.toc())
+
+        toc = self.act.toc()
+        self.act.expression_date = '2012-02-01'
+        self.assertIsNot(toc, self.act.toc())
+
+    def test_toc_from_file(self):
+        xml = self.act.to_xml()
+        self.assertEqual(
+            {name: [e.to_dict() for e in entries] for name, entries in self.act.toc().items()},
+            {name: [e.to_dict() for e in entries] for name, entries in toc_from_file(xml).items()},
+        )
+
+    def test_components(self):
+        act = fixtures.attachments_act()
+        toc = act.toc()
+
+        self.assertEqual(['main', 'schedule-A', 'schedule-XXX'], list(toc))
+        self.assertEqual(['section_1'], [e.eid for e in toc['main']])
+        self.assertEqual(['paragraph_1'], [e.eid for e in toc['schedule-A']])
+        self.assertEqual(
+            {name: [e.to_dict() for e in entries] for name, entries in toc.items()},
+            {name: [e.to_dict() for e in entries] for name, entries in toc_from_file(act.to_xml()).items()},
+        )
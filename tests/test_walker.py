@@ -0,0 +1,78 @@
+from unittest import TestCase
+
+from lxml import etree
+
+from cobalt import Act, TreeConsumer, TreeWalker
+
+
+class Recorder(TreeConsumer):
+    def __init__(self, tags=None, skip=()):
+        self.tags = tags
+        self.skip = skip
+        self.events = []
+
+    def start(self, elem):
+        self.events.append(('start', elem.get('eId')))
+        if elem.get('eId') in self.skip:
+            return TreeWalker.SKIP
+
+    def end(self, elem):
+        self.events.append(('end', elem.get('eId')))
+
+
+class TreeWalkerTestCase(TestCase):
+    def setUp(self):
+        self.act = Act()
+        for child in self.act.body.getchildren():
+            self.act.body.remove(child)
+        self.act.body.append(etree.fromstring(
+            '<chapter xmlns="http://docs.oasis-open.org/legaldocml/ns/akn/3.0" eId="chp_1">'
+            '<section eId="chp_1__sec_1"><num>1</num><!-- comment --></section>'
+            '<section eId="chp_1__sec_2"><num>2</num></section>'
+            '</chapter>'))
+
+    def test_dispatch(self):
+        chapters = Recorder(tags=['chapter'])
+        sections = Recorder(tags=['section', 'chapter'])
+        everything = Recorder()
+        TreeWalker([chapters, sections, everything]).walk(self.act)
+
+        self.assertEqual([('start', 'chp_1'), ('end', 'chp_1')], chapters.events)
+        self.assertEqual([
+            ('start', 'chp_1'),
+            ('start', 'chp_1__sec_1'), ('end', 'chp_1__sec_1'),
+            ('start', 'chp_1__sec_2'), ('end', 'chp_1__sec_2'),
+            ('end', 'chp_1'),
+        ], sections.events)
+        # every element, but not the comment
+        self.assertEqual(len(list(self.act.root.iter(etree.Element))) * 2, len(everything.events))
+
+    def test_namespaced_tags(self):
+        other = Recorder(tags=['{http://example.com}section'])
+        qualified = Recorder(tags=['{http://docs.oasis-open.org/legaldocml/ns/akn/3.0}section'])
+        TreeWalker([other, qualified]).walk(self.act)
+
+        self.assertEqual([], other.events)
+        self.assertEqual(4, len(qualified.events))
+
+    def test_skip(self):
+        skipper = Recorder(tags=['chapter', 'section', 'num'], skip=['chp_1__sec_1'])
+        nums = Recorder(tags=['num'])
+        walker = TreeWalker()
+        walker.add(skipper)
+        walker.add(nums)
+        walker.walk(self.act.body)
+
+        self.assertEqual([
+            ('start', 'chp_1'),
+            ('start', 'chp_1__sec_1'), ('end', 'chp_1__sec_1'),
+            ('start', 'chp_1__sec_2'), ('start', None), ('end', None), ('end', 'chp_1__sec_2'),
+            ('end', 'chp_1'),
+        ], skipper.events)
+        # other consumers still see the skipped subtree
+        self.assertEqual(4, len(nums.events))
+
+    def test_skip_all(self):
+        skipper = Recorder(skip=['chp_1'])
+        TreeWalker([skipper]).walk(self.act.body)
+        self.assertEqual([('start', None), ('start', 'chp_1'), ('end', 'chp_1'), ('end', None)], skipper.events)